@@ -1,11 +1,25 @@
 import socket
 import json
 import time
+import os
+import random
+import sys
 from PyQt6.QtCore import QThread, pyqtSignal
 
+try:
+    from common import wire_protocol
+    from common.latency_trace import TRACE
+except ImportError:
+    # Running user_interface.py directly: the project root is not on sys.path
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from common import wire_protocol
+    from common.latency_trace import TRACE
+
 class TCPManager(QThread):
-    data_received = pyqtSignal(dict)
+    # one emit per received batch (list of packet dicts) instead of one per packet
+    batch_received = pyqtSignal(list)
     log_signal = pyqtSignal(str) 
+    RECV_SIZE = 65536  # bytes read per recv() call
 
     def __init__(self, host='127.0.0.1', port=5000):
         super().__init__()
@@ -15,11 +29,24 @@ class TCPManager(QThread):
         
         self.host = config['network']['host']
         self.port = config['network']['port']
+        # preferred wire protocol, the simulator falls back to JSON if it doesn't know it
+        self.protocol = config['network'].get('protocol', wire_protocol.PROTOCOL_JSON)
         self._socket = None
         self.running = True
+        # optional callable taking each decoded batch directly (a worker queue),
+        # used instead of the batch_received signal; called as packet_sink(batch, trace)
+        # where trace is the latency trace of a sampled batch (else None)
+        self.packet_sink = None
+        # reconnect backoff: doubles after every failed attempt, back to the start once data flows
+        self.reconnect_delay = float(config['network'].get('reconnect_delay', 0.5))
+        self.reconnect_max_delay = float(config['network'].get('reconnect_max_delay', 30.0))
+        # one decoder for the whole session: it holds the resume point (stream + last sequence number)
+        self.decoder = wire_protocol.StreamDecoder()
+        self.lost_packets = 0
 
     def run(self):
         """The background loop for receiving data"""
+        delay = self.reconnect_delay
         while self.running:
             try:
                 # check the flag before even trying to connect
@@ -30,27 +57,71 @@ class TCPManager(QThread):
                     self._socket = s 
                     s.connect((self.host, self.port))
                     self.log_signal.emit("Network: Connected to Simulator.")
-                    
-                    # Use a file-like object for easier line reading
-                    f = s.makefile('r')
+
+                    # the resume point asks the simulator to replay what was missed while disconnected
+                    decoder = self.decoder
+                    resume = decoder.resume_point()
+                    decoder.reconnect()
+                    protocols = list(dict.fromkeys([self.protocol, wire_protocol.PROTOCOL_JSON]))
+                    self.send_command("hello", {"protocols": protocols, "resume": resume})
+
+                    # Read raw chunks and decode everything complete in them together
+                    trace = None
                     while self.running:
-                        line = f.readline()
-                        if not line:
-                            break
-                        packet = json.loads(line)
-                        self.data_received.emit(packet)
+                        chunk = s.recv(self.RECV_SIZE)
+                        received = time.monotonic()
+                        if not chunk:
+                            raise ConnectionResetError("closed by simulator")
+                        batch, controls = decoder.feed(chunk)
+                        parsed = time.monotonic()
+                        for control in controls:
+                            if control.get("type") == "hello":
+                                delay = self.reconnect_delay
+                                self._log_hello(control, resume)
+                            elif control.get("type") == "gap":
+                                self._log_gap(control)
+                            elif control.get("type") == TRACE:
+                                # describes the batch that follows it
+                                trace = control
+                        if batch:
+                            if self.packet_sink is not None:
+                                if trace is not None:
+                                    trace["received"], trace["parsed"] = received, parsed
+                                self.packet_sink(batch, trace)
+                                trace = None
+                            else:
+                                self.batch_received.emit(batch)
 
             except Exception as e:
                 # if the connection lost and the system still be running, try to reconnect
                 if self.running:
-                    self.log_signal.emit(f"Connection lost: {e}. Retrying...")
-                    time.sleep(2)
+                    # exponential backoff with jitter, so dashboards don't reconnect in lockstep
+                    wait = delay * random.uniform(0.8, 1.2)
+                    self.log_signal.emit(f"Connection lost: {e}. Retrying in {wait:.1f}s...")
+                    deadline = time.monotonic() + wait
+                    while self.running and time.monotonic() < deadline:
+                        time.sleep(0.1)     # short steps so stop() doesn't wait out the backoff
+                    delay = min(delay * 2, self.reconnect_max_delay)
                 else:
                     break
             finally:
                 if self._socket:
                     self._socket.close()
 
+    def _log_hello(self, control, resume):
+        self.log_signal.emit(f"Network: Using '{control.get('protocol')}' protocol.")
+        if control.get("resumed"):
+            self.log_signal.emit(f"Network: Resumed after packet #{resume['seq']}, "
+                                 f"{control.get('replayed', 0)} missed packets replayed.")
+        elif resume and "stream" in control:
+            self.log_signal.emit("Network: Simulator restarted, resuming was not possible.")
+
+    def _log_gap(self, control):
+        missed = control["last"] - control["first"] + 1
+        self.lost_packets += missed
+        self.log_signal.emit(f"DATA GAP: {missed} packets lost (#{control['first']}-#{control['last']}), "
+                             f"{self.lost_packets} lost this session.")
+
     def send_command(self, action, params=None):
         """Method called by the GUI to send data back to the simulator (COMMANDS)"""
         if self._socket:
@@ -0,0 +1,321 @@
+"""Batch alarm evaluation for the dashboard.
+
+Holds the per-sensor alarm state (limits, previous state, leaky-bucket process
+counters, cumulative hardware counters and their notified flags) in flat arrays
+indexed by sensor, and evaluates whole batches of packets against them.
+
+The counters of one sensor depend on the order of its packets, so a batch is
+split into rounds by occurrence: round r holds the r-th packet of every sensor
+in the batch. Inside a round every sensor appears at most once, so the round is
+evaluated with NumPy fancy indexing over all its sensors at once. Batches that
+would give tiny rounds (few sensors, many packets each) take the scalar path,
+which is also the pure-Python fallback when NumPy is not installed. Both paths
+produce the same events, in packet order, as the original per-packet logic.
+
+With a DetectorPipeline (anomaly_detectors) a sample inside its limits can
+still get a process status from a detector (rate of change, z-score, stuck
+value). The detectors run over the whole batch before the rounds; a flagged
+sample then counts as a process alarm exactly like a limit violation; its
+process notification says which anomaly it was (ANOMALY_MESSAGE) instead of
+reporting a crossed limit.
+
+update_limits() switches the engine to a reloaded sensor list: sensors that
+are kept keep their counters, flags and detector state, new ones start clear.
+"""
+try:
+    import numpy as np
+except ImportError:     # pure-Python fallback
+    np = None
+
+# process status codes -> labels (high is checked before low, like the original logic,
+# then the anomaly detectors' statuses for samples inside the limits)
+PROCESS_STATUS = ("OK", "High Limit", "Low Limit", "Rate of Change", "Z-Score", "Stuck Value")
+
+# event kinds, in the order the original per-packet code raised them
+EVENT_ALARM = "alarm"         # detail: "HW:<status>/PR:<process status>" (new entry in the alarm log)
+EVENT_PROCESS = "process"     # leaky bucket reached PROC threshold
+EVENT_HARDWARE = "hardware"   # cumulative FAULTY count reached HW threshold
+_EVENT_ORDER = {EVENT_ALARM: 0, EVENT_PROCESS: 1, EVENT_HARDWARE: 2}
+
+PROCESS_MESSAGE = "CRITICAL: Process Limit Exceeded"
+# process notification raised by an anomaly detector (the value is inside its limits)
+ANOMALY_MESSAGE = "Anomaly: {status} on {sensor}"
+HARDWARE_MESSAGE = "MAINTENANCE: Low Sensor Reliability"
+_MESSAGES = {EVENT_PROCESS: PROCESS_MESSAGE, EVENT_HARDWARE: HARDWARE_MESSAGE}
+
+
+def process_message(sensor, status):
+    """Text of a process notification: limit violations are critical, detector findings are anomalies"""
+    if status in ("OK", "High Limit", "Low Limit"):
+        return PROCESS_MESSAGE
+    return ANOMALY_MESSAGE.format(status=status.lower(), sensor=sensor)
+
+# per-sensor state arrays (everything reset() clears)
+_STATE = ("alarmed", "proc_counters", "proc_notified", "hw_counters", "hw_notified")
+
+if np is not None:
+    # lookup tables so the vectorised path builds labels without a Python loop
+    _STATUS_LABELS = np.array(PROCESS_STATUS, dtype=object)
+    _KIND_NAMES = np.array([EVENT_ALARM, EVENT_PROCESS, EVENT_HARDWARE], dtype=object)
+    # alarm detail by faulty * len(PROCESS_STATUS) + process status code
+    _ALARM_TEXT = np.array([f"HW:{hw}/PR:{pr}" for hw in ("OK", "FAULTY") for pr in PROCESS_STATUS], dtype=object)
+    _N_STATUS = len(PROCESS_STATUS)
+
+
+class StateView:
+    """dict-like name -> value access to one state array (reads give plain Python values)"""
+
+    def __init__(self, engine, attr, to_python=int, from_python=None):
+        self._engine = engine
+        self._attr = attr
+        self._to_python = to_python
+        self._from_python = from_python or to_python
+
+    def __getitem__(self, name):
+        return self._to_python(getattr(self._engine, self._attr)[self._engine.index[name]])
+
+    def __setitem__(self, name, value):
+        getattr(self._engine, self._attr)[self._engine.index[name]] = self._from_python(value)
+
+    def __contains__(self, name):
+        return name in self._engine.index
+
+    def __iter__(self):
+        return iter(self._engine.names)
+
+    def __len__(self):
+        return len(self._engine.names)
+
+    def keys(self):
+        return list(self._engine.names)
+
+    def items(self):
+        return [(name, self[name]) for name in self._engine.names]
+
+
+class AlarmEngine:
+    """Per-sensor alarm state + batch evaluation (NumPy rounds or scalar fallback)"""
+
+    def __init__(self, limits, proc_threshold=5, hw_threshold=15, use_numpy=True, min_round=16, detectors=None):
+        self.names = list(limits)
+        self.index = {name: i for i, name in enumerate(self.names)}
+        self.proc_threshold = proc_threshold
+        self.hw_threshold = hw_threshold
+        self.use_numpy = use_numpy and np is not None
+        # average sensors per round below which the scalar path is cheaper than NumPy calls
+        self.min_round = min_round
+        # DetectorPipeline or None (the detectors need NumPy, whichever path evaluates the limits)
+        self.detectors = detectors if np is not None else None
+        n = len(self.names)
+        low = [limits[name]['low'] for name in self.names]
+        high = [limits[name]['high'] for name in self.names]
+        if self.use_numpy:
+            self._names_array = np.array(self.names, dtype=object)
+            self.low, self.high = np.array(low, dtype=float), np.array(high, dtype=float)
+            self.alarmed = np.zeros(n, dtype=bool)
+            self.proc_counters = np.zeros(n, dtype=np.int64)
+            self.proc_notified = np.zeros(n, dtype=bool)
+            self.hw_counters = np.zeros(n, dtype=np.int64)
+            self.hw_notified = np.zeros(n, dtype=bool)
+        else:
+            self.low, self.high = low, high
+            self.alarmed = [False] * n
+            self.proc_counters = [0] * n
+            self.proc_notified = [False] * n
+            self.hw_counters = [0] * n
+            self.hw_notified = [False] * n
+
+    def view(self, attr):
+        """dict-like access to a state array, e.g. view('proc_counters')['temp']"""
+        if attr == "alarmed":
+            # exposed as the dashboard's "OK"/"ALARM" previous_state
+            return StateView(self, attr, to_python=lambda a: "ALARM" if a else "OK",
+                             from_python=lambda s: s == "ALARM")
+        if attr.endswith("notified"):
+            return StateView(self, attr, to_python=bool)
+        return StateView(self, attr, to_python=int)
+
+    def reset(self):
+        """Clear every counter, flag and previous state"""
+        for attr in _STATE:
+            state = getattr(self, attr)
+            for i in range(len(state)):
+                state[i] = 0
+        if self.detectors is not None:
+            self.detectors.reset()
+
+    def clear_notified(self):
+        """Forget which sensors were notified, the counters keep running"""
+        for attr in ("proc_notified", "hw_notified"):
+            state = getattr(self, attr)
+            for i in range(len(state)):
+                state[i] = 0
+
+    def update_limits(self, limits, detectors=None):
+        """Switch to a new sensor list / new limits (config reload), with a DetectorPipeline built for it.
+
+        Kept sensors (by name) carry their state over, whatever their new position.
+        """
+        src = [self.index.get(name, -1) for name in limits]
+        self.names = list(limits)
+        self.index = {name: i for i, name in enumerate(self.names)}
+        low = [limits[name]['low'] for name in self.names]
+        high = [limits[name]['high'] for name in self.names]
+        if self.use_numpy:
+            self._names_array = np.array(self.names, dtype=object)
+            self.low, self.high = np.array(low, dtype=float), np.array(high, dtype=float)
+            src_array = np.array(src, dtype=np.intp)
+            kept = src_array >= 0
+            for attr in _STATE:
+                old = getattr(self, attr)
+                state = np.zeros(len(src), dtype=old.dtype)
+                state[kept] = old[src_array[kept]]
+                setattr(self, attr, state)
+        else:
+            self.low, self.high = low, high
+            for attr in _STATE:
+                old = getattr(self, attr)
+                setattr(self, attr, [old[j] if j >= 0 else 0 for j in src])
+        if np is None:
+            detectors = None
+        elif detectors is not None and self.detectors is not None:
+            detectors.adopt(self.detectors, src)
+        self.detectors = detectors
+
+    # ---------- evaluation ----------
+    def evaluate(self, packets):
+        """Evaluate packets of known sensors in order.
+
+        Returns (events, process_statuses): events are (kind, sensor, value, detail)
+        tuples in the order the per-packet logic would raise them, and
+        process_statuses holds the process status label of every packet.
+        """
+        index = self.index
+        idx = [index[p['sensor']] for p in packets]
+        values = [p['value'] for p in packets]
+        faulty = [p['status'] == "FAULTY" for p in packets]
+        timestamps = [p['timestamp'] for p in packets] if self.detectors is not None else None
+        return self.evaluate_columns(idx, values, faulty, timestamps)
+
+    def evaluate_columns(self, idx, values, faulty, timestamps=None):
+        """Same as evaluate() for column input: sensor indices, values, FAULTY flags (+ timestamps for the detectors)"""
+        n = len(idx)
+        if n == 0:
+            return [], []
+        anomaly = None
+        if self.detectors is not None:
+            anomaly = self.detectors.evaluate(idx, values, timestamps)
+        if self.use_numpy and n >= self.min_round:
+            idx = np.asarray(idx, dtype=np.intp)
+            rank, rounds = self._occurrence_rank(idx)
+            if n / rounds >= self.min_round:
+                return self._evaluate_numpy(idx, np.asarray(values, dtype=float),
+                                            np.asarray(faulty, dtype=bool), rank, rounds, anomaly)
+            idx = idx.tolist()
+        if self.use_numpy:
+            values = values.tolist() if hasattr(values, 'tolist') else values
+            faulty = faulty.tolist() if hasattr(faulty, 'tolist') else faulty
+        return self._evaluate_python(idx, values, faulty, None if anomaly is None else anomaly.tolist())
+
+    def _evaluate_python(self, idx, values, faulty, anomaly=None):
+        """Scalar reference path: the original per-packet logic over the state arrays"""
+        low, high = self.low, self.high
+        alarmed, proc, proc_n, hw, hw_n = (self.alarmed, self.proc_counters, self.proc_notified,
+                                           self.hw_counters, self.hw_notified)
+        names = self.names
+        events, statuses = [], []
+        for k, (i, val, bad) in enumerate(zip(idx, values, faulty)):
+            name = names[i]
+            status = ("High Limit" if val > high[i] else "Low Limit" if val < low[i] else
+                      "OK" if anomaly is None else PROCESS_STATUS[anomaly[k]])
+            statuses.append(status)
+            is_proc_alarm = status != "OK"
+            now_alarmed = bad or is_proc_alarm
+            if now_alarmed and not alarmed[i]:
+                events.append((EVENT_ALARM, name, val, f"HW:{'FAULTY' if bad else 'OK'}/PR:{status}"))
+            alarmed[i] = now_alarmed
+
+            if is_proc_alarm:
+                proc[i] += 1
+            else:
+                if proc[i] > 0:
+                    proc[i] -= 1
+                if proc[i] == 0:
+                    proc_n[i] = False
+            if proc[i] >= self.proc_threshold and not proc_n[i]:
+                events.append((EVENT_PROCESS, name, val, process_message(name, status)))
+                proc_n[i] = True
+
+            if bad:
+                hw[i] += 1
+            if hw[i] >= self.hw_threshold and not hw_n[i]:
+                events.append((EVENT_HARDWARE, name, val, HARDWARE_MESSAGE))
+                hw_n[i] = True
+                hw[i] = 0
+        return events, statuses
+
+    @staticmethod
+    def _occurrence_rank(idx):
+        """rank[k] = how many earlier packets of the same sensor precede packet k; plus the round count"""
+        order = np.argsort(idx, kind='stable')
+        sorted_idx = idx[order]
+        starts = np.flatnonzero(np.r_[True, sorted_idx[1:] != sorted_idx[:-1]])
+        group_start = np.repeat(starts, np.diff(np.r_[starts, len(idx)]))
+        rank = np.empty(len(idx), dtype=np.intp)
+        rank[order] = np.arange(len(idx)) - group_start
+        return rank, int(rank.max()) + 1
+
+    def _evaluate_numpy(self, idx, values, faulty, rank, rounds, anomaly=None):
+        codes = np.zeros(len(idx), dtype=np.int8)
+        found = []      # (positions, kind, details) per round and event kind
+        # positions grouped by round, each round in packet order
+        by_round = np.lexsort((np.arange(len(idx)), rank))
+        bounds = np.searchsorted(rank[by_round], np.arange(rounds + 1))
+        for r in range(rounds):
+            pos = by_round[bounds[r]:bounds[r + 1]]
+            s, v, bad = idx[pos], values[pos], faulty[pos]
+
+            high_hit = v > self.high[s]
+            low_hit = ~high_hit & (v < self.low[s])
+            code = np.where(high_hit, 1, np.where(low_hit, 2, 0 if anomaly is None else anomaly[pos])).astype(np.int8)
+            codes[pos] = code
+            is_proc_alarm = code != 0
+            now_alarmed = bad | is_proc_alarm
+
+            new_alarm = now_alarmed & ~self.alarmed[s]
+            if new_alarm.any():
+                found.append((pos[new_alarm], EVENT_ALARM, _ALARM_TEXT[bad[new_alarm] * _N_STATUS + code[new_alarm]]))
+            self.alarmed[s] = now_alarmed
+
+            pc = np.where(is_proc_alarm, self.proc_counters[s] + 1, np.maximum(self.proc_counters[s] - 1, 0))
+            self.proc_counters[s] = pc
+            pn = self.proc_notified[s] & ~(~is_proc_alarm & (pc == 0))
+            fire = (pc >= self.proc_threshold) & ~pn
+            if fire.any():
+                found.append((pos[fire], EVENT_PROCESS, np.array(
+                    [process_message(self.names[i], PROCESS_STATUS[c]) for i, c in zip(s[fire], code[fire])],
+                    dtype=object)))
+            self.proc_notified[s] = pn | fire
+
+            hc = self.hw_counters[s] + bad
+            fire = (hc >= self.hw_threshold) & ~self.hw_notified[s]
+            if fire.any():
+                found.append((pos[fire], EVENT_HARDWARE, None))
+                self.hw_notified[s] |= fire
+                hc = np.where(fire, 0, hc)
+            self.hw_counters[s] = hc
+
+        statuses = _STATUS_LABELS[codes].tolist()
+        if not found:
+            return [], statuses
+        positions = np.concatenate([f[0] for f in found])
+        kinds = np.concatenate([np.full(len(f[0]), _EVENT_ORDER[f[1]], dtype=np.int8) for f in found])
+        details = np.concatenate([f[2] if f[2] is not None else
+                                  np.full(len(f[0]), _MESSAGES[f[1]], dtype=object) for f in found])
+        # packet order first, then the order the per-packet logic raises events in
+        order = np.lexsort((kinds, positions))
+        positions = positions[order]
+        return list(zip(_KIND_NAMES[kinds[order]].tolist(),
+                        self._names_array[idx[positions]].tolist(),
+                        values[positions].tolist(),
+                        details[order].tolist())), statuses
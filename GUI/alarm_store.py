@@ -0,0 +1,157 @@
+"""Alarm history: recent alarms in memory, every alarm in an indexed SQLite file.
+
+add() is O(1): the alarm goes into a ring of the newest alarms and a pending
+list that is written to SQLite in one transaction (every flush_interval seconds,
+every flush_rows alarms, or before a query that needs the disk). Queries that
+the ring can answer completely (the newest pages of a recent time range) never
+touch the database; the rest use the (sensor, ts), (type, ts) and ts indexes.
+Several dashboards may share the file: before the ring answers anything, SQLite's
+data_version tells whether another connection committed alarms since the last
+look, and if so the ring is reloaded with the newest rows of the file.
+Everything here runs on the thread that owns the store (the Qt thread).
+"""
+import collections
+import sqlite3
+import time
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS alarms (
+    id     INTEGER PRIMARY KEY,
+    ts     REAL NOT NULL,
+    sensor TEXT NOT NULL,
+    value  REAL,
+    type   TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS alarms_ts ON alarms (ts);
+CREATE INDEX IF NOT EXISTS alarms_sensor_ts ON alarms (sensor, ts);
+CREATE INDEX IF NOT EXISTS alarms_type_ts ON alarms (type, ts);
+"""
+
+# row layout everywhere: (id, ts, sensor, value, type)
+ID, TS, SENSOR, VALUE, TYPE = range(5)
+
+
+class AlarmStore:
+    """Append-mostly alarm log with newest-first, filtered, paginated queries"""
+
+    def __init__(self, path, ring_size=1000, flush_interval=1.0, flush_rows=256, retention_days=None):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.flush_rows = flush_rows
+        self._db = sqlite3.connect(path)
+        # WAL + NORMAL: a commit is an append to the log, not an fsync of the whole file
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+        if retention_days:
+            self._db.execute("DELETE FROM alarms WHERE ts < ?", (time.time() - retention_days * 86400,))
+        self._db.commit()
+        self.recent = collections.deque(maxlen=ring_size)
+        # the ring holds every alarm ever stored until the disk had rows before it or it evicts one
+        self._ring_is_all = self._db.execute("SELECT 1 FROM alarms LIMIT 1").fetchone() is None
+        self._data_version = self._db.execute("PRAGMA data_version").fetchone()[0]
+        self.resyncs = 0        # times alarms written by another connection were picked up
+        self._pending = []
+        self._last_flush = time.monotonic()
+
+    # ---------- writing ----------
+    def add(self, sensor, value, alarm_type, ts=None):
+        # ids are assigned by SQLite on flush (another dashboard may share the file)
+        row = (None, time.time() if ts is None else ts, sensor, value, alarm_type)
+        if len(self.recent) == self.recent.maxlen:
+            self._ring_is_all = False
+        self.recent.append(row)
+        self._pending.append(row)
+        if len(self._pending) >= self.flush_rows or time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+        return row
+
+    def flush(self):
+        """Write the pending alarms in one transaction"""
+        self._last_flush = time.monotonic()
+        if not self._pending:
+            return
+        with self._db:
+            self._db.executemany("INSERT INTO alarms (ts, sensor, value, type) VALUES (?, ?, ?, ?)",
+                                 [row[TS:] for row in self._pending])
+        self._pending = []
+
+    def close(self):
+        self.flush()
+        self._db.close()
+
+    # ---------- reading ----------
+    def query(self, sensor=None, alarm_type=None, since=None, limit=100, offset=0):
+        """Matching alarms newest first, rows offset .. offset + limit"""
+        self._sync_ring()
+        rows = self._from_ring(sensor, alarm_type, since)
+        if rows is not None and (len(rows) >= offset + limit or self._ring_complete(since)):
+            return rows[offset:offset + limit]
+        where, args = self._where(sensor, alarm_type, since)
+        self.flush()
+        return self._db.execute(f"SELECT id, ts, sensor, value, type FROM alarms {where} "
+                                f"ORDER BY id DESC LIMIT ? OFFSET ?", (*args, limit, offset)).fetchall()
+
+    def count(self, sensor=None, alarm_type=None, since=None):
+        self._sync_ring()
+        if self._ring_complete(since):
+            return len(self._from_ring(sensor, alarm_type, since))
+        where, args = self._where(sensor, alarm_type, since)
+        self.flush()
+        return self._db.execute(f"SELECT COUNT(*) FROM alarms {where}", args).fetchone()[0]
+
+    def iter_rows(self, sensor=None, alarm_type=None, since=None, chunk=1000):
+        """Every matching alarm oldest first, fetched chunk by chunk (CSV export)"""
+        where, args = self._where(sensor, alarm_type, since)
+        self.flush()
+        cursor = self._db.execute(f"SELECT id, ts, sensor, value, type FROM alarms {where} ORDER BY id", args)
+        while True:
+            rows = cursor.fetchmany(chunk)
+            if not rows:
+                return
+            yield from rows
+
+    def types(self):
+        """Distinct alarm types on record"""
+        self.flush()
+        return [t for (t,) in self._db.execute("SELECT DISTINCT type FROM alarms ORDER BY type")]
+
+    def _sync_ring(self):
+        """Reload the ring if another connection (another dashboard) committed to the file"""
+        version = self._db.execute("PRAGMA data_version").fetchone()[0]
+        if version == self._data_version:
+            return
+        self._data_version = version
+        self.flush()
+        rows = self._db.execute("SELECT id, ts, sensor, value, type FROM alarms ORDER BY id DESC LIMIT ?",
+                                (self.recent.maxlen,)).fetchall()
+        self.recent.clear()
+        self.recent.extend(reversed(rows))
+        self._ring_is_all = len(rows) < self.recent.maxlen
+        self.resyncs += 1
+
+    def _from_ring(self, sensor, alarm_type, since):
+        return [row for row in reversed(self.recent)
+                if (sensor is None or row[SENSOR] == sensor)
+                and (alarm_type is None or row[TYPE] == alarm_type)
+                and (since is None or row[TS] >= since)]
+
+    def _ring_complete(self, since):
+        """True if no alarm newer than 'since' exists outside the ring"""
+        if self._ring_is_all:
+            return True
+        return since is not None and bool(self.recent) and self.recent[0][TS] < since
+
+    @staticmethod
+    def _where(sensor, alarm_type, since):
+        clauses, args = [], []
+        if sensor is not None:
+            clauses.append("sensor = ?")
+            args.append(sensor)
+        if alarm_type is not None:
+            clauses.append("type = ?")
+            args.append(alarm_type)
+        if since is not None:
+            clauses.append("ts >= ?")
+            args.append(since)
+        return ("WHERE " + " AND ".join(clauses)) if clauses else "", args
@@ -0,0 +1,109 @@
+"""Paginated view model over the AlarmStore.
+
+Holds one page of alarms (newest first) for the Alarm History view. The filter
+(sensor, alarm type, since) and the page select which rows; new alarms only
+mark the model stale, and refresh() reloads the page at most once per frame.
+The number of matching alarms is counted in the store when the filter changes
+and kept up to date from the new alarms after that, so a burst of alarms never
+runs a COUNT per frame.
+"""
+import time
+
+from PyQt6.QtCore import QAbstractTableModel, QModelIndex, Qt
+
+try:
+    from GUI.alarm_store import TS, SENSOR, VALUE, TYPE
+except ImportError:
+    from alarm_store import TS, SENSOR, VALUE, TYPE
+
+COLUMNS = ("Time", "Sensor", "Value", "Alarm Type")
+
+
+def format_time(ts):
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(ts))
+
+
+class AlarmPageModel(QAbstractTableModel):
+    """One page of the filtered alarm history"""
+
+    def __init__(self, store, page_size=200, parent=None):
+        super().__init__(parent)
+        self.store = store
+        self.page_size = page_size
+        self.page = 0
+        self.sensor = None
+        self.alarm_type = None
+        self.since = None
+        self.rows = []
+        self.stale = False
+        self._total = None      # matching alarms, None = count again
+        self._resyncs = store.resyncs   # another dashboard wrote alarms: count again
+
+    # ---------- paging / filtering ----------
+    def set_filter(self, sensor=None, alarm_type=None, since=None):
+        self.sensor, self.alarm_type, self.since = sensor, alarm_type, since
+        self._total = None
+        self.page = 0
+        self.refresh()
+
+    def set_page(self, page):
+        self.page = max(0, min(page, self.page_count() - 1))
+        self.refresh()
+
+    def total(self):
+        """Alarms matching the filter, over every page"""
+        if self._total is None or self._resyncs != self.store.resyncs:
+            self._resyncs = self.store.resyncs
+            self._total = self.store.count(self.sensor, self.alarm_type, self.since)
+        return self._total
+
+    def page_count(self, total=None):
+        return max(1, -(-(self.total() if total is None else total) // self.page_size))
+
+    def mark_stale(self, row=None):
+        """A new alarm was stored ('row' as returned by AlarmStore.add)"""
+        self.stale = True
+        if row is not None and self._total is not None and self._matches(row):
+            self._total += 1
+
+    def _matches(self, row):
+        return ((self.sensor is None or row[SENSOR] == self.sensor)
+                and (self.alarm_type is None or row[TYPE] == self.alarm_type)
+                and (self.since is None or row[TS] >= self.since))
+
+    def refresh(self):
+        """Reload the current page from the store"""
+        self.beginResetModel()
+        self.rows = self.store.query(self.sensor, self.alarm_type, self.since,
+                                     limit=self.page_size, offset=self.page * self.page_size)
+        self.stale = False
+        self.endResetModel()
+
+    def iter_filtered(self):
+        """Every alarm matching the filter, oldest first, streamed from the store"""
+        return self.store.iter_rows(self.sensor, self.alarm_type, self.since)
+
+    # ---------- Qt model interface ----------
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(COLUMNS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return COLUMNS[section]
+        return super().headerData(section, orientation, role)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or role != Qt.ItemDataRole.DisplayRole:
+            return None
+        row = self.rows[index.row()]
+        col = index.column()
+        if col == 0:
+            return format_time(row[TS])
+        if col == 1:
+            return row[SENSOR]
+        if col == 2:
+            return str(row[VALUE])
+        return row[TYPE]
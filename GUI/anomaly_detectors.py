@@ -0,0 +1,199 @@
+"""Anomaly detectors that run next to the static limits of the alarm engine.
+
+A detector flags samples that are inside [low, high] but still wrong:
+
+- RateOfChangeDetector: the value moved faster than max_rate units per second
+  (over at least the sensor's sampling interval, from a value inside the limits)
+- ZScoreDetector: the value is more than 'threshold' standard deviations away
+  from an exponentially weighted baseline (mean and mean square) of the sensor
+- StuckValueDetector: the same value (within 'tolerance') 'samples' times in a
+  row, like the zeros a sensor emits once its data file has run out
+
+Detectors are vectorised over a whole batch. The batch is grouped by sensor
+once (a stable sort, every sensor's samples stay in order); each detector
+compares every sample with its predecessor in the group, or with the state
+carried over from the previous batch for the first one, and keeps the last
+sample of every group as the new state. Per-sample work is O(1); nothing is
+recomputed over history.
+
+A flagged sample gets the detector's status as its process status (see
+PROCESS_STATUS in alarm_engine), so it goes through the same alarm log and
+leaky-bucket notification track as a limit violation. The z-score baseline is
+updated once per batch, after the batch was checked against it.
+
+Every detector lists its per-sensor state arrays in STATE, so a pipeline built
+for a reloaded sensor list can take over the state of the sensors it keeps
+(DetectorPipeline.adopt).
+"""
+import numpy as np
+
+
+class SensorGroups:
+    """The samples of one batch grouped by sensor, in arrival order inside each group"""
+
+    def __init__(self, idx, values, timestamps=None):
+        self.order = np.argsort(idx, kind='stable')
+        self.sensor = idx[self.order]
+        self.values = values[self.order]
+        self.timestamps = None if timestamps is None else timestamps[self.order]
+        n = len(idx)
+        self.first = np.r_[True, self.sensor[1:] != self.sensor[:-1]]
+        self.last = np.r_[self.first[1:], True]
+        starts = np.flatnonzero(self.first)
+        lengths = np.diff(np.r_[starts, n])
+        self.group = np.repeat(np.arange(len(starts)), lengths)     # group number of every sample
+        self.rank = np.arange(n) - starts[self.group]                # position inside the group
+        self.length = lengths[self.group]                            # size of the sample's group
+
+    def previous(self, column, state):
+        """Every sample's predecessor of the same sensor: the batch's previous one or the carried state"""
+        prev = np.empty_like(column)
+        prev[1:] = column[:-1]
+        prev[self.first] = state[self.sensor[self.first]]
+        return prev
+
+    def keep_last(self, state, column):
+        """Carry the newest sample of every sensor over to the next batch"""
+        state[self.sensor[self.last]] = column[self.last]
+
+
+class RateOfChangeDetector:
+    """|dv/dt| above max_rate (per sensor, units per second)"""
+    status = "Rate of Change"
+    STATE = ("last_value", "last_time")
+
+    def __init__(self, max_rate, min_interval, low, high):
+        self.max_rate = np.asarray(max_rate, dtype=np.float64)
+        # dt is at least the nominal sampling interval: bunched or jittery timestamps aren't a jump
+        self.min_interval = np.asarray(min_interval, dtype=np.float64)
+        # a step out of (or back from) a limit violation is the limit alarm's business
+        self.low = np.asarray(low, dtype=np.float64)
+        self.high = np.asarray(high, dtype=np.float64)
+        self.reset()
+
+    def reset(self):
+        self.last_value = np.full(len(self.max_rate), np.nan)
+        self.last_time = np.full(len(self.max_rate), np.nan)
+
+    def check(self, groups):
+        if groups.timestamps is None:
+            return None
+        s = groups.sensor
+        prev = groups.previous(groups.values, self.last_value)
+        dt = np.maximum(groups.timestamps - groups.previous(groups.timestamps, self.last_time),
+                        self.min_interval[s])
+        with np.errstate(invalid='ignore'):
+            hit = ((prev >= self.low[s]) & (prev <= self.high[s])
+                   & (np.abs(groups.values - prev) > self.max_rate[s] * dt))
+        groups.keep_last(self.last_value, groups.values)
+        groups.keep_last(self.last_time, groups.timestamps)
+        return hit
+
+
+class ZScoreDetector:
+    """|x - mean| above threshold * std, against an EWMA baseline of the sensor's earlier samples"""
+    status = "Z-Score"
+    STATE = ("mean", "mean_sq", "count")
+
+    def __init__(self, min_std, threshold=6.0, alpha=0.01, warmup=50):
+        self.min_std = np.asarray(min_std, dtype=np.float64)   # std floor: a flat signal isn't infinitely sensitive
+        self.threshold = threshold
+        self.alpha = alpha
+        self.warmup = warmup
+        self.reset()
+
+    def reset(self):
+        n = len(self.min_std)
+        self.mean = np.zeros(n)
+        self.mean_sq = np.zeros(n)
+        self.count = np.zeros(n, dtype=np.int64)
+
+    def check(self, groups):
+        s, x = groups.sensor, groups.values
+        mean = self.mean[s]
+        std = np.maximum(np.sqrt(np.maximum(self.mean_sq[s] - mean * mean, 0.0)), self.min_std[s])
+        with np.errstate(invalid='ignore'):
+            hit = (self.count[s] >= self.warmup) & (np.abs(x - mean) > self.threshold * std)
+
+        # fold the batch in: k EWMA steps m = (1 - a) m + a x per sensor at once
+        a = self.alpha
+        fresh = self.count[s] == 0
+        x = np.where(np.isfinite(x), x, np.where(fresh, 0.0, mean))
+        first = groups.first & fresh
+        # a sensor's very first sample starts the baseline instead of pulling it up from zero
+        self.mean[s[first]] = x[first]
+        self.mean_sq[s[first]] = x[first] * x[first]
+        weight = a * (1 - a) ** (groups.length - 1 - groups.rank)
+        ends = groups.last
+        decay = (1 - a) ** groups.length[ends]
+        sensors = s[ends]
+        self.mean[sensors] = decay * self.mean[sensors] + np.bincount(groups.group, weight * x)
+        self.mean_sq[sensors] = decay * self.mean_sq[sensors] + np.bincount(groups.group, weight * x * x)
+        self.count[sensors] += groups.length[ends]
+        return hit
+
+
+class StuckValueDetector:
+    """The same value (within tolerance) 'samples' times in a row"""
+    status = "Stuck Value"
+    STATE = ("last_value", "run")
+
+    def __init__(self, n_sensors, samples=20, tolerance=0.0):
+        self.n = n_sensors
+        self.samples = samples
+        self.tolerance = tolerance
+        self.reset()
+
+    def reset(self):
+        self.last_value = np.full(self.n, np.nan)
+        self.run = np.zeros(self.n, dtype=np.int64)     # length of the constant run ending at the last sample
+
+    def check(self, groups):
+        x = groups.values
+        with np.errstate(invalid='ignore'):
+            same = np.abs(x - groups.previous(x, self.last_value)) <= self.tolerance
+        # run length ending at every sample: count up from the last sample that started a run
+        pos = np.arange(len(x))
+        starts = ~same | groups.first
+        base = np.where(same & groups.first, self.run[groups.sensor] + 1, 1)
+        start = np.maximum.accumulate(np.where(starts, pos, 0))
+        run = base[start] + pos - start
+        groups.keep_last(self.last_value, x)
+        groups.keep_last(self.run, run)
+        return run >= self.samples
+
+
+class DetectorPipeline:
+    """Runs detectors over a batch; a sample takes the status of the first detector that flags it"""
+
+    def __init__(self, detectors, statuses):
+        self.detectors = list(detectors)
+        # status code of each detector (index in the engine's process status labels)
+        self.codes = [statuses.index(d.status) for d in self.detectors]
+
+    def evaluate(self, idx, values, timestamps=None):
+        """Status code per sample in batch order (0: no detector fired)"""
+        groups = SensorGroups(np.asarray(idx, dtype=np.intp), np.asarray(values, dtype=np.float64),
+                              None if timestamps is None else np.asarray(timestamps, dtype=np.float64))
+        codes = np.zeros(len(groups.order), dtype=np.int8)
+        # later detectors first, so the earlier ones overwrite them where both fire
+        for detector, code in zip(reversed(self.detectors), reversed(self.codes)):
+            hit = detector.check(groups)
+            if hit is not None:
+                codes[groups.order[hit]] = code
+        return codes
+
+    def reset(self):
+        for detector in self.detectors:
+            detector.reset()
+
+    def adopt(self, old, src):
+        """Take over the state of 'old' (config reload): src[i] is sensor i's index in 'old', -1 for a new sensor"""
+        src = np.asarray(src, dtype=np.intp)
+        kept = src >= 0
+        previous = {d.status: d for d in old.detectors}
+        for detector in self.detectors:
+            if detector.status not in previous:
+                continue
+            for attr in detector.STATE:
+                getattr(detector, attr)[kept] = getattr(previous[detector.status], attr)[src[kept]]
@@ -0,0 +1,293 @@
+import os
+import queue
+import threading
+import time
+import urllib.parse
+
+import numpy as np
+
+# status column codes (same mapping as the binary wire protocol)
+STATUS_CODES = {"OK": 0, "FAULTY": 1}
+STATUS_NAMES = ("OK", "FAULTY")
+
+# one file per column per chunk: <root>/<directory_name(sensor)>/<chunk>.ts|.val|.st
+COLUMNS = (("ts", np.float64), ("val", np.float64), ("st", np.uint8))
+
+_STOP = object()
+
+
+def directory_name(sensor):
+    """Sensor name -> one path component inside the store root (None for names that cannot be stored).
+
+    Names come from the network: '/', '\\', '%' and everything but letters,
+    digits and '_.-~' are percent-encoded, and so is a leading dot, so '..',
+    '../x' or '/etc' never leave the root or collide with it. Plain names
+    ('temp') are their own directory; sensor_name() reverses the mapping.
+    """
+    if not isinstance(sensor, str) or not sensor:
+        return None
+    name = urllib.parse.quote(sensor, safe='')
+    return "%2E" + name[1:] if name.startswith('.') else name
+
+
+def sensor_name(directory):
+    return urllib.parse.unquote(directory)
+
+
+class _SensorLog:
+    """Append state of one sensor: its chunk index and the open files of the newest chunk"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.chunks = []        # [chunk_no, first_ts, last_ts, count], oldest first
+        self.files = None       # open column files of chunks[-1]
+
+    def path(self, chunk_no, column):
+        return os.path.join(self.directory, f"{chunk_no:08d}.{column}")
+
+
+class HistoryStore:
+    """Append-only, chunked column store for received sensor samples.
+
+    Packets are handed over with append() (a queue put, safe to call from the Qt
+    thread); a background writer groups them per sensor and appends raw
+    little-endian columns to fixed-size chunk files that can be memory-mapped
+    directly. Files are fsync'ed every fsync_interval seconds. query() reads a
+    time range back as NumPy arrays.
+
+    A failed write (disk full, permissions...) never stops the writer: the
+    sensor's open chunk is re-read from disk, the error is counted and passed
+    to on_error (at most once per error_interval seconds). At most max_queued
+    batches wait for the writer; past that, or once the writer is gone, new
+    batches are dropped and counted.
+    """
+
+    def __init__(self, root, chunk_size=65536, fsync_interval=1.0, max_queued=4096, on_error=None,
+                 error_interval=10.0):
+        self.root = root
+        self.chunk_size = int(chunk_size)
+        self.fsync_interval = fsync_interval
+        self.max_queued = int(max_queued)
+        self.on_error = on_error
+        self.error_interval = error_interval
+        self.written = 0
+        self.errors = 0             # failed writes/fsyncs, never raised
+        self.dropped = 0            # packets refused because the queue was full or the writer gone
+        self._next_report = 0.0
+        self._logs = {}
+        self._lock = threading.Lock()        # guards _logs and the open files
+        self._queue = queue.SimpleQueue()
+        os.makedirs(root, exist_ok=True)
+        self._load_index()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    # ---------- producer side ----------
+    def append(self, packet):
+        """Non-blocking: queue one packet for the writer thread (False if it was dropped)"""
+        return self.append_batch([packet])
+
+    def append_batch(self, packets):
+        if not self._thread.is_alive() or self._queue.qsize() >= self.max_queued:
+            self.dropped += len(packets)
+            return False
+        self._queue.put(packets)
+        return True
+
+    def close(self):
+        """Write everything still queued, fsync and stop the writer"""
+        self._queue.put(_STOP)
+        self._thread.join(timeout=5)
+
+    # ---------- query side ----------
+    def sensors(self):
+        with self._lock:
+            return sorted(self._logs)
+
+    def query(self, sensor, start=None, end=None):
+        """(timestamps, values, statuses) of one sensor with start <= timestamp <= end"""
+        empty = tuple(np.empty(0, dtype=dtype) for _, dtype in COLUMNS)
+        with self._lock:
+            log = self._logs.get(sensor)
+            if log is None:
+                return empty
+            if log.files:
+                for f in log.files:
+                    f.flush()   # make the newest chunk's buffered tail visible to the maps
+            chunks = [list(c) for c in log.chunks if c[2] >= start] if start is not None else [list(c) for c in log.chunks]
+        if end is not None:
+            chunks = [c for c in chunks if c[1] <= end]
+
+        parts = [[], [], []]
+        for chunk_no, _, _, count in chunks:
+            if count == 0:
+                continue
+            columns = [np.memmap(log.path(chunk_no, name), dtype=dtype, mode='r', shape=(count,))
+                       for name, dtype in COLUMNS]
+            ts = columns[0]
+            lo = 0 if start is None else np.searchsorted(ts, start, side='left')
+            hi = count if end is None else np.searchsorted(ts, end, side='right')
+            for part, column in zip(parts, columns):
+                part.append(np.array(column[lo:hi]))
+        if not parts[0]:
+            return empty
+        return tuple(np.concatenate(part) for part in parts)
+
+    # ---------- writer side ----------
+    def _load_index(self):
+        """Rebuild the chunk index from the files of earlier sessions"""
+        for name in os.listdir(self.root):
+            directory = os.path.join(self.root, name)
+            if os.path.isdir(directory):
+                self._logs[sensor_name(name)] = self._load_log(directory)
+
+    @staticmethod
+    def _load_log(directory):
+        """Chunk index of one sensor directory"""
+        log = _SensorLog(directory)
+        numbers = sorted(int(f.split('.')[0]) for f in os.listdir(directory) if f.endswith('.ts'))
+        for chunk_no in numbers:
+            # a crash can leave columns of different lengths: trust the shortest
+            count = min(os.path.getsize(log.path(chunk_no, name)) // np.dtype(dtype).itemsize
+                        if os.path.exists(log.path(chunk_no, name)) else 0
+                        for name, dtype in COLUMNS)
+            # and cut the longer ones back, or appended rows would land at different offsets per column
+            for name, dtype in COLUMNS:
+                path = log.path(chunk_no, name)
+                if os.path.exists(path) and os.path.getsize(path) > count * np.dtype(dtype).itemsize:
+                    os.truncate(path, count * np.dtype(dtype).itemsize)
+            if count == 0:
+                continue
+            ts = np.memmap(log.path(chunk_no, "ts"), dtype=np.float64, mode='r', shape=(count,))
+            log.chunks.append([chunk_no, float(ts[0]), float(ts[-1]), count])
+        return log
+
+    def _run(self):
+        last_sync = time.monotonic()
+        running = True
+        while running:
+            try:
+                items = [self._queue.get(timeout=self.fsync_interval)]
+            except queue.Empty:
+                items = []
+            while True:
+                try:
+                    items.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if _STOP in items:
+                running = False
+                items = [item for item in items if item is not _STOP]
+            packets = []
+            for item in items:
+                if isinstance(item, list):
+                    packets.extend(item)
+                else:
+                    packets.append(item)
+            # the writer must outlive a bad batch or a full disk, or every later batch piles up in the queue
+            if packets:
+                try:
+                    self._write(packets)
+                except Exception as e:
+                    self._failed(f"batch of {len(packets)} packets not written: {e!r}")
+            if not running or time.monotonic() - last_sync >= self.fsync_interval:
+                self._sync()
+                last_sync = time.monotonic()
+        self._close_files()
+
+    def _failed(self, message):
+        self.errors += 1
+        now = time.monotonic()
+        if self.on_error is not None and now >= self._next_report:
+            self._next_report = now + self.error_interval
+            self.on_error(f"HISTORY STORE: {message} ({self.errors} errors so far)")
+
+    def _write(self, packets):
+        grouped, rejected = {}, 0
+        for p in packets:
+            if directory_name(p['sensor']) is None:
+                rejected += 1
+                continue
+            rows = grouped.setdefault(p['sensor'], ([], [], []))
+            rows[0].append(p['timestamp'])
+            rows[1].append(p['value'])
+            rows[2].append(STATUS_CODES.get(p['status'], 1))
+        if rejected:
+            self._failed(f"{rejected} samples without a valid sensor name not written")
+        with self._lock:
+            for sensor, rows in grouped.items():
+                columns = [np.asarray(r, dtype=dtype) for r, (_, dtype) in zip(rows, COLUMNS)]
+                try:
+                    self._append_columns(sensor, columns)
+                except OSError as e:
+                    self._failed(f"{len(columns[0])} samples of {sensor} not written: {e}")
+                    self._reload(sensor)
+                    continue
+                self.written += len(columns[0])
+
+    def _reload(self, sensor):
+        """After a failed append or fsync: drop the open files and re-read what actually reached the disk"""
+        log = self._logs.pop(sensor, None)
+        if log is None:
+            return
+        for f in log.files or ():
+            try:
+                f.close()
+            except OSError:
+                pass
+        try:
+            if os.path.isdir(log.directory):
+                self._logs[sensor] = self._load_log(log.directory)
+        except OSError:
+            pass    # rebuilt from scratch on the next append
+
+    def _append_columns(self, sensor, columns):
+        log = self._logs.get(sensor)
+        if log is None:
+            log = self._logs[sensor] = _SensorLog(os.path.join(self.root, directory_name(sensor)))
+            os.makedirs(log.directory, exist_ok=True)
+        offset, n = 0, len(columns[0])
+        while offset < n:
+            if not log.chunks or log.chunks[-1][3] >= self.chunk_size:
+                self._roll(log)
+            elif log.files is None:
+                log.files = [open(log.path(log.chunks[-1][0], name), 'ab') for name, _ in COLUMNS]
+            chunk = log.chunks[-1]
+            take = min(self.chunk_size - chunk[3], n - offset)
+            for f, column in zip(log.files, columns):
+                f.write(column[offset:offset + take].tobytes())
+            ts = columns[0]
+            if chunk[3] == 0:
+                chunk[1] = float(ts[offset])
+            chunk[2] = float(ts[offset + take - 1])
+            chunk[3] += take
+            offset += take
+
+    def _roll(self, log):
+        """Close the full chunk and start the next one"""
+        if log.files:
+            for f in log.files:
+                f.flush()
+                os.fsync(f.fileno())
+                f.close()
+        chunk_no = log.chunks[-1][0] + 1 if log.chunks else 0
+        log.chunks.append([chunk_no, 0.0, 0.0, 0])
+        log.files = [open(log.path(chunk_no, name), 'ab') for name, _ in COLUMNS]
+
+    def _sync(self):
+        with self._lock:
+            for sensor, log in list(self._logs.items()):
+                try:
+                    for f in log.files or ():
+                        f.flush()
+                        os.fsync(f.fileno())
+                except OSError as e:
+                    self._failed(f"{sensor} not synced: {e}")
+                    self._reload(sensor)
+
+    def _close_files(self):
+        with self._lock:
+            for log in self._logs.values():
+                for f in log.files or ():
+                    f.close()
+                log.files = None
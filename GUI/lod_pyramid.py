@@ -0,0 +1,107 @@
+import numpy as np
+
+
+class MinMaxPyramid:
+    """Multi-resolution min/max summary of a sliding sample window.
+
+    Level k summarises buckets of factor**k consecutive samples (by absolute
+    sample index) with their min and max, kept in small circular arrays. Levels
+    are updated incrementally as samples arrive, so asking for "what does this
+    x-range look like at N pixels" costs O(pixels) whatever the history length,
+    and a one-sample spike still shows up as the max of its bucket.
+    """
+
+    def __init__(self, window, factor=4, min_points=2048):
+        self.window = int(window)
+        self.factor = factor
+        self.min_points = min_points
+        # no levels at all when the raw window is already cheap to draw
+        self.bucket_sizes = []
+        if self.window > min_points:
+            # keep coarsening until even a narrow plot can show the whole window
+            size = factor
+            while True:
+                self.bucket_sizes.append(size)
+                if self.window // size <= min_points // 16:
+                    break
+                size *= factor
+        self._mins = [np.full(self.window // b + 2, np.nan) for b in self.bucket_sizes]
+        self._maxs = [np.full(self.window // b + 2, np.nan) for b in self.bucket_sizes]
+        self.total = 0
+
+    @property
+    def levels(self):
+        return len(self.bucket_sizes)
+
+    def clear(self):
+        for mins, maxs in zip(self._mins, self._maxs):
+            mins.fill(np.nan)
+            maxs.fill(np.nan)
+        self.total = 0
+
+    def skip(self, n):
+        """n samples went by unseen: move on and forget the half-filled bucket they leave behind"""
+        self.total += n
+        for b, mins, maxs in zip(self.bucket_sizes, self._mins, self._maxs):
+            if self.total % b:
+                slot = (self.total // b) % len(mins)
+                mins[slot] = maxs[slot] = np.nan
+
+    def append(self, value):
+        i = self.total
+        for b, mins, maxs in zip(self.bucket_sizes, self._mins, self._maxs):
+            slot = (i // b) % len(mins)
+            if i % b == 0:
+                # first sample of a new bucket overwrites whatever old bucket lived there
+                mins[slot] = maxs[slot] = value
+            else:
+                # (negated so a bucket emptied by skip() takes the value)
+                if not value >= mins[slot]: mins[slot] = value
+                if not value <= maxs[slot]: maxs[slot] = value
+        self.total += 1
+
+    def extend(self, values):
+        """Vectorised update for a block of samples"""
+        values = np.asarray(values, dtype=np.float64)
+        if len(values) > self.window:
+            # older samples would be evicted again before the block is even done
+            self.total += len(values) - self.window
+            values = values[-self.window:]
+        n = len(values)
+        if n == 0:
+            return
+        idx = self.total + np.arange(n)
+        for b, mins, maxs in zip(self.bucket_sizes, self._mins, self._maxs):
+            buckets = idx // b
+            # start of every run of equal bucket numbers inside the block
+            starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+            block_min = np.minimum.reduceat(values, starts)
+            block_max = np.maximum.reduceat(values, starts)
+            slots = buckets[starts] % len(mins)
+            # a bucket already open before this block merges with its old extremes
+            if self.total % b != 0:
+                block_min[0] = min(block_min[0], mins[slots[0]])
+                block_max[0] = max(block_max[0], maxs[slots[0]])
+            mins[slots] = block_min
+            maxs[slots] = block_max
+        self.total += n
+
+    def choose_level(self, count, max_points):
+        """Smallest level whose buckets over 'count' samples fit in max_points (0 = raw)"""
+        for level, b in enumerate(self.bucket_sizes, start=1):
+            if count / b <= max_points:
+                return level
+        return self.levels
+
+    def query(self, start, stop, level):
+        """(x, y) for sample range [start, stop) at a level >= 1: a min and a max point per bucket"""
+        b = self.bucket_sizes[level - 1]
+        mins, maxs = self._mins[level - 1], self._maxs[level - 1]
+        first, last = start // b, -(-stop // b)
+        buckets = np.arange(first, last)
+        slots = buckets % len(mins)
+        x = np.repeat(buckets * b, 2).astype(np.float64)
+        y = np.empty(2 * len(buckets))
+        y[0::2] = mins[slots]
+        y[1::2] = maxs[slots]
+        return x, y
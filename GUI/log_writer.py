@@ -0,0 +1,132 @@
+import os
+import queue
+import threading
+import time
+
+_STOP = object()
+
+
+class LogWriter:
+    """Buffered, size-rotated text log written from a background thread.
+
+    write() is a queue put, so logging never touches the disk on the Qt thread.
+    The writer keeps the file open and writes the queued lines out in one go
+    once flush_lines are pending or flush_interval seconds passed. When the file
+    grows over max_bytes it is rotated to <path>.1 ... <path>.<backups>. A log
+    file deleted or moved away while open is recreated on the next write.
+    """
+
+    def __init__(self, path, max_bytes=5 << 20, backups=3, flush_interval=0.5, flush_lines=256):
+        self.path = path
+        self.max_bytes = int(max_bytes)
+        self.backups = int(backups)
+        self.flush_interval = flush_interval
+        self.flush_lines = flush_lines
+        self.lines_written = 0
+        self.errors = 0             # failed writes (locked/read-only file...), never raised
+        self._file = None
+        self._size = 0
+        self._queue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    # ---------- producer side ----------
+    def write(self, line):
+        """Non-blocking: queue one line (without the newline) for the writer thread"""
+        self._queue.put(line)
+
+    def flush(self, timeout=2.0):
+        """Block until every line queued so far is on disk (tests, shutdown)"""
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def close(self):
+        """Write everything still queued and stop the writer"""
+        self._queue.put(_STOP)
+        self._thread.join(timeout=5)
+
+    # ---------- writer side ----------
+    def _run(self):
+        pending, waiters = [], []
+        next_flush = time.monotonic() + self.flush_interval
+        running = True
+        while running:
+            try:
+                item = self._queue.get(timeout=max(0.0, next_flush - time.monotonic()) if pending else None)
+            except queue.Empty:
+                item = None
+            if item is _STOP:
+                running = False
+            elif isinstance(item, threading.Event):
+                waiters.append(item)
+            elif item is not None:
+                pending.append(item)
+            now = time.monotonic()
+            if waiters or not running or len(pending) >= self.flush_lines or (pending and now >= next_flush):
+                if pending:
+                    self._write_out(pending)
+                    pending = []
+                for done in waiters:
+                    done.set()
+                waiters = []
+                next_flush = now + self.flush_interval
+        if self._file is not None:
+            self._file.close()
+
+    def _write_out(self, lines):
+        try:
+            self._ensure_open()
+            start = 0
+            size = self._size
+            for i, line in enumerate(lines):
+                size += len(line) + 1
+                if size > self.max_bytes and (i > start or self._size):
+                    # what fits goes into the current file, the rest starts the next one
+                    self._write_lines(lines[start:i])
+                    self._rotate()
+                    start, size = i, len(line) + 1
+            self._write_lines(lines[start:])
+            self._file.flush()
+        except OSError:
+            self.errors += 1
+            self._close_file()
+
+    def _write_lines(self, lines):
+        data = "".join(line + "\n" for line in lines)
+        self._file.write(data)
+        self._size += len(data)
+        self.lines_written += len(lines)
+
+    def _ensure_open(self):
+        """Open the log, or reopen it if the file we hold was deleted or rotated away"""
+        if self._file is not None:
+            try:
+                if os.stat(self.path).st_ino == os.fstat(self._file.fileno()).st_ino:
+                    return
+            except FileNotFoundError:
+                pass
+            self._close_file()
+        self._file = open(self.path, "a", encoding="utf-8")
+        self._size = self._file.tell()
+
+    def _rotate(self):
+        self._close_file()
+        if self.backups > 0:
+            for i in range(self.backups - 1, 0, -1):
+                older = f"{self.path}.{i}"
+                if os.path.exists(older):
+                    os.replace(older, f"{self.path}.{i + 1}")
+            os.replace(self.path, f"{self.path}.1")
+            self._file = open(self.path, "a", encoding="utf-8")
+        else:
+            self._file = open(self.path, "w", encoding="utf-8")
+        self._size = 0
+
+    def _close_file(self):
+        if self._file is not None:
+            try:
+                self._file.close()
+            except OSError:
+                pass
+            self._file = None
@@ -0,0 +1,254 @@
+"""Alert delivery off the GUI thread: per-channel rate limits, digests and retries.
+
+notify() only appends the alert to every channel's pending list. A dispatcher
+thread decides when each channel may send: after digest_window seconds of
+collecting, when its token bucket has a token and when no earlier message of the
+channel is still in flight or waiting to be retried. Everything pending at that
+moment goes out as one digest, on a small shared worker pool. An alarm storm
+therefore costs a channel at most its rate limit in messages, each one listing
+every alert that piled up since the previous one. A failed send is retried with
+exponential backoff (or after the server's Retry-After), merged with whatever
+arrived meanwhile.
+"""
+import collections
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class Alert:
+    __slots__ = ("sensor", "value", "alarm_type", "ts")
+
+    def __init__(self, sensor, value, alarm_type, ts=None):
+        self.sensor = sensor
+        self.value = value
+        self.alarm_type = alarm_type
+        self.ts = time.time() if ts is None else ts
+
+
+class RetryAfter(Exception):
+    """The channel asked us to wait (HTTP 429) before sending again"""
+
+    def __init__(self, seconds):
+        super().__init__(f"rate limited by server, retry after {seconds:.1f}s")
+        self.seconds = seconds
+
+
+class TokenBucket:
+    """'rate' messages per 'per' seconds, with bursts up to 'rate'"""
+
+    def __init__(self, rate, per):
+        self.capacity = max(1.0, float(rate))
+        self.refill = self.capacity / per
+        self.tokens = self.capacity
+        self.stamp = time.monotonic()
+
+    def _update(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.stamp) * self.refill)
+        self.stamp = now
+
+    def ready_at(self, now):
+        self._update(now)
+        return now if self.tokens >= 1 else now + (1 - self.tokens) / self.refill
+
+    def take(self, now):
+        self._update(now)
+        self.tokens -= 1
+
+
+# ---------- channels ----------
+class DesktopChannel:
+    """Desktop pop-up through plyer"""
+    name = "desktop"
+
+    def __init__(self, notify=None, rate=6, per=60.0):
+        if notify is None:
+            from plyer import notification
+            notify = notification.notify
+        self._notify = notify
+        self.rate, self.per = rate, per
+
+    def send(self, alerts):
+        if len(alerts) == 1:
+            a = alerts[0]
+            title = f"SENSOR ALERT: {a.sensor.upper()}"
+            message = f"Status: {a.alarm_type}\nValue: {a.value}\nAction Required!"
+        else:
+            sensors = sorted({a.sensor for a in alerts})
+            title = f"SENSOR ALERTS: {len(alerts)} on {len(sensors)} sensors"
+            message = f"{', '.join(sensors[:8])}{' ...' if len(sensors) > 8 else ''}\nAction Required!"
+        self._notify(title=title, message=message, app_name="Industrial Monitor", timeout=10)
+
+
+class WebhookChannel:
+    """Discord-style webhook over one pooled keep-alive HTTP session"""
+    MAX_LINES = 20      # alerts listed in a digest before "... and N more"
+
+    def __init__(self, url, session, rate=5, per=10.0, timeout=5.0, name="discord"):
+        self.name = name    # the channel's key under notifications.channels in config.json
+        self.url = url
+        self.session = session
+        self.rate, self.per = rate, per
+        self.timeout = timeout
+
+    def payload(self, alerts):
+        if len(alerts) == 1:
+            a = alerts[0]
+            # Use 'embeds' for a professional look with a colored side bar
+            return {"embeds": [{
+                "title": f"🚨 SENSOR ALERT: {a.sensor.upper()}",
+                "description": f"**Status:** {a.alarm_type}\n**Current Value:** `{a.value:.2f}`",
+                "color": 15158332 if "CRITICAL" in a.alarm_type else 15844367,   # Red vs Yellow
+                "footer": {"text": f"Logged at: {time.strftime('%H:%M:%S', time.localtime(a.ts))}"}
+            }]}
+        lines = [f"`{time.strftime('%H:%M:%S', time.localtime(a.ts))}` **{a.sensor}** {a.alarm_type} "
+                 f"(`{a.value:.2f}`)" for a in alerts[:self.MAX_LINES]]
+        if len(alerts) > self.MAX_LINES:
+            lines.append(f"... and {len(alerts) - self.MAX_LINES} more")
+        critical = any("CRITICAL" in a.alarm_type for a in alerts)
+        return {"embeds": [{
+            "title": f"🚨 {len(alerts)} SENSOR ALERTS ({len({a.sensor for a in alerts})} sensors)",
+            "description": "\n".join(lines),
+            "color": 15158332 if critical else 15844367,
+            "footer": {"text": f"Digest sent at: {time.strftime('%H:%M:%S')}"}
+        }]}
+
+    def send(self, alerts):
+        response = self.session.post(self.url, json=self.payload(alerts), timeout=self.timeout)
+        if response.status_code == 429:
+            try:
+                retry_after = float(response.headers.get("Retry-After", 1.0))
+            except ValueError:
+                retry_after = 1.0
+            raise RetryAfter(retry_after)
+        response.raise_for_status()
+
+
+def pooled_session(pool_size):
+    """requests session reusing up to pool_size keep-alive connections per host"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+# ---------- dispatcher ----------
+class _ChannelState:
+    def __init__(self, channel, max_pending):
+        self.channel = channel
+        self.bucket = TokenBucket(channel.rate, channel.per)
+        self.pending = collections.deque(maxlen=max_pending)
+        self.first_pending = None   # monotonic time the oldest pending alert arrived
+        self.in_flight = False
+        self.attempt = 0            # failed attempts of the alerts at the head of pending
+        self.retry_at = 0.0
+        self.dropped = 0            # alerts lost to the pending bound or exhausted retries
+        self.sent = 0               # messages delivered
+
+
+class NotificationDispatcher:
+    """Fans alerts out to channels with rate limiting, digests and retries on a bounded pool"""
+
+    def __init__(self, channels, workers=2, digest_window=1.0, retries=3, backoff=1.0,
+                 max_pending=1000, on_result=None):
+        self.digest_window = digest_window
+        self.retries = retries
+        self.backoff = backoff
+        # on_result(channel name, alerts, error or None); called from a worker thread
+        self.on_result = on_result
+        self._states = [_ChannelState(channel, max_pending) for channel in channels]
+        self._pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="notify")
+        self._cond = threading.Condition()
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def notify(self, sensor, value, alarm_type):
+        """Non-blocking: queue one alert for every channel"""
+        alert = Alert(sensor, value, alarm_type)
+        now = time.monotonic()
+        with self._cond:
+            for state in self._states:
+                if len(state.pending) == state.pending.maxlen:
+                    state.dropped += 1
+                state.pending.append(alert)
+                if state.first_pending is None:
+                    state.first_pending = now
+            self._cond.notify()
+
+    def stats(self):
+        with self._cond:
+            return {s.channel.name: {"sent": s.sent, "pending": len(s.pending), "dropped": s.dropped}
+                    for s in self._states}
+
+    def close(self, timeout=2.0):
+        """Stop dispatching; sends already running get 'timeout' seconds to finish"""
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+        self._thread.join(timeout)
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    # ---------- dispatcher thread ----------
+    def _run(self):
+        with self._cond:
+            while self._running:
+                now = time.monotonic()
+                wake = None
+                for state in self._states:
+                    if state.in_flight or not state.pending:
+                        continue
+                    ready = max(state.first_pending + self.digest_window, state.retry_at, state.bucket.ready_at(now))
+                    if ready <= now:
+                        self._dispatch(state, now)
+                    elif wake is None or ready < wake:
+                        wake = ready
+                self._cond.wait(None if wake is None else wake - now)
+
+    def _dispatch(self, state, now):
+        """Hand everything pending on this channel to the pool as one digest (lock held)"""
+        alerts = list(state.pending)
+        state.pending.clear()
+        state.first_pending = None
+        state.in_flight = True
+        state.bucket.take(now)
+        try:
+            self._pool.submit(self._send, state, alerts)
+        except RuntimeError:
+            # pool already shut down (interpreter exit without close()): stop dispatching
+            state.in_flight = False
+            state.dropped += len(alerts)
+            self._running = False
+
+    def _send(self, state, alerts):
+        error, report = None, True
+        try:
+            state.channel.send(alerts)
+        except Exception as e:
+            error = e
+        with self._cond:
+            state.in_flight = False
+            if error is None:
+                state.sent += 1
+                state.attempt = 0
+            elif state.attempt < self.retries:
+                # back to the head of the queue, merged with what arrived meanwhile
+                state.attempt += 1
+                delay = error.seconds if isinstance(error, RetryAfter) else self.backoff * 2 ** (state.attempt - 1)
+                state.retry_at = time.monotonic() + delay
+                # no room for all of them: the oldest alerts of the failed digest go, never newer ones
+                lost = max(0, len(state.pending) + len(alerts) - state.pending.maxlen)
+                state.dropped += lost
+                state.pending.extendleft(reversed(alerts[lost:]))
+                state.first_pending = time.monotonic() - self.digest_window
+                report = False      # report deliveries and final failures, not every retry
+            else:
+                state.attempt = 0
+                state.dropped += len(alerts)
+            self._cond.notify()
+        if self.on_result is not None and report:
+            self.on_result(state.channel.name, alerts, error)
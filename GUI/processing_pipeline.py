@@ -0,0 +1,180 @@
+"""Worker stage between the network thread and the GUI thread.
+
+The network thread hands every decoded batch to submit() (a queue put, no Qt
+event). A worker thread persists it, runs the alarm engine over it, feeds the
+rolling statistics and folds the result into one pending UiDelta: new plot samples per sensor, the latest
+row state per sensor and the alarm/notification events in order. At most
+delta_rate times per second, and only once the GUI has applied the previous
+one, the pending delta is handed to the GUI thread through delta_ready. A burst
+therefore costs the GUI one bounded update instead of one event per batch.
+
+A batch submitted with a latency trace (common.latency_trace) gets the worker's
+pickup and finish times stamped on it and travels to the GUI in the delta.
+"""
+import queue
+import threading
+import time
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+_STOP = object()
+
+
+class UiDelta:
+    """Everything the GUI has to apply since the previous delta"""
+
+    def __init__(self):
+        self.received = 0       # packets received (unknown sensors included: keeps the watchdog fed)
+        self.packets = 0        # packets of known sensors
+        self.samples = {}       # name -> [values, timestamps, skipped]
+        self.rows = {}          # name -> (value, timestamp, hw status, process status), latest only
+        self.events = []        # (kind, sensor, value, detail) from the alarm engine, in order
+        self.traces = []        # latency traces of the sampled batches folded in
+
+
+class ProcessingPipeline(QObject):
+    """Persistence + alarm evaluation off the GUI thread, emitting rate-limited UiDeltas"""
+    delta_ready = pyqtSignal(object)
+
+    def __init__(self, alarms, known_sensors, history=None, delta_rate=30, max_samples=None, stats=None):
+        super().__init__()
+        self.alarms = alarms
+        self.known = set(known_sensors)
+        self.history = history
+        self.stats = stats                  # StreamStats or None
+        self.interval = 1.0 / max(1, delta_rate)
+        # plot samples kept per sensor in one delta (older ones would be evicted anyway)
+        self.max_samples = max_samples
+        self.lock = threading.Lock()        # guards the alarm and statistics state and the pending delta
+        self._inbox = queue.SimpleQueue()
+        self._pending = UiDelta()
+        self._applied = threading.Event()   # the GUI has applied the last emitted delta
+        self._applied.set()
+        self._thread = None
+
+    # ---------- any thread ----------
+    def submit(self, batch, trace=None):
+        self._inbox.put((batch, trace))
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._inbox.put(_STOP)
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+
+    def delta_applied(self):
+        """Called by the GUI once it applied a delta: the next one may be sent"""
+        self._applied.set()
+
+    def reset(self):
+        """Forget queued work and clear the alarm state (master reset)"""
+        with self.lock:
+            while True:
+                try:
+                    item = self._inbox.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    self._inbox.put(_STOP)
+                    break
+            self._pending = UiDelta()
+            self.alarms.reset()
+            if self.stats is not None:
+                self.stats.reset()
+
+    def clear_notified(self):
+        """Re-arm both notification tracks of every sensor ("Clear Alarms")"""
+        with self.lock:
+            self.alarms.clear_notified()
+
+    def update_sensors(self, limits, detectors=None):
+        """Reloaded sensor list: alarm and statistics state follow it, removed sensors leave the pending delta"""
+        with self.lock:
+            self.alarms.update_limits(limits, detectors)
+            if self.stats is not None:
+                self.stats.update_limits(limits)
+            self.known = set(limits)
+            pending = self._pending
+            for name in [n for n in pending.samples if n not in self.known]:
+                del pending.samples[name]
+            for name in [n for n in pending.rows if n not in self.known]:
+                del pending.rows[name]
+
+    def process(self, batch):
+        """Synchronous path: process one batch in the caller's thread and return its delta"""
+        delta = UiDelta()
+        with self.lock:
+            self._fold(batch, delta)
+        return delta
+
+    # ---------- worker thread ----------
+    def _run(self):
+        next_emit = time.monotonic()
+        while True:
+            if self._pending.received:
+                timeout = max(0.0, next_emit - time.monotonic())
+            else:
+                timeout = None      # nothing to deliver: sleep until data arrives
+            try:
+                item = self._inbox.get(timeout=timeout)
+                if item is _STOP:
+                    return
+                batch, trace = item
+                with self.lock:
+                    if trace is None:
+                        self._fold(batch, self._pending)
+                    else:
+                        trace["process_start"] = time.monotonic()
+                        self._fold(batch, self._pending)
+                        trace["process_end"] = time.monotonic()
+                        self._pending.traces.append(trace)
+            except queue.Empty:
+                pass
+            now = time.monotonic()
+            if now >= next_emit and self._pending.received and self._applied.is_set():
+                with self.lock:
+                    delta, self._pending = self._pending, UiDelta()
+                self._applied.clear()
+                next_emit = now + self.interval
+                self.delta_ready.emit(delta)
+
+    def _fold(self, batch, delta):
+        """Persist a batch and merge its plot samples, row states and alarm events into 'delta'"""
+        delta.received += len(batch)
+        packets = [p for p in batch if p['sensor'] in self.known]
+        if not packets:
+            return
+        # only configured sensors reach the disk: a stray or removed sensor would get a directory forever
+        if self.history is not None:
+            self.history.append_batch(packets)
+        delta.packets += len(packets)
+
+        events, process_statuses = self.alarms.evaluate(packets)
+        delta.events.extend(events)
+        samples, rows, cap = delta.samples, delta.rows, self.max_samples
+        # where this batch starts in each sensor's sample list (the delta may hold earlier batches)
+        start = {name: len(entry[0]) for name, entry in samples.items()} if self.stats is not None else None
+        for packet, process_status in zip(packets, process_statuses):
+            name, val, ts = packet['sensor'], packet['value'], packet['timestamp']
+            entry = samples.get(name)
+            if entry is None:
+                entry = samples[name] = [[], [], 0]
+            entry[0].append(val)
+            entry[1].append(ts)
+            rows[name] = (val, ts, packet['status'], process_status)
+        if start is not None:
+            for name, entry in samples.items():
+                values = entry[0][start.get(name, 0):]
+                if values:
+                    self.stats.extend(name, values)
+        if cap:
+            for entry in samples.values():
+                # the GUI is behind: only the newest window can still be drawn
+                if len(entry[0]) > 2 * cap:
+                    excess = len(entry[0]) - cap
+                    del entry[0][:excess]
+                    del entry[1][:excess]
+                    entry[2] += excess
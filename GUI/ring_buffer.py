@@ -0,0 +1,69 @@
+import numpy as np
+
+
+class RingBuffer:
+    """Fixed-capacity sample history (values + timestamps) backed by preallocated NumPy arrays.
+
+    Every sample is written twice, at slot i and at slot i + capacity, so the
+    newest 'len' samples always sit contiguously in memory and values() /
+    timestamps() can hand out views without copying, whatever the window size.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = int(capacity)
+        self._values = np.zeros(2 * self.capacity, dtype=np.float64)
+        self._times = np.zeros(2 * self.capacity, dtype=np.float64)
+        self._head = 0      # slot the next sample goes to (0 .. capacity-1)
+        self._size = 0
+        self.total = 0      # samples ever appended (x position of the next sample)
+
+    def __len__(self):
+        return self._size
+
+    def append(self, value, timestamp=np.nan):
+        h = self._head
+        self._values[h] = self._values[h + self.capacity] = value
+        self._times[h] = self._times[h + self.capacity] = timestamp
+        self._head = (h + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+        self.total += 1
+
+    def extend(self, values, timestamps=None):
+        """Append a block of samples with vectorised writes"""
+        values = np.asarray(values, dtype=np.float64)
+        times = np.full(len(values), np.nan) if timestamps is None else np.asarray(timestamps, dtype=np.float64)
+        if len(values) > self.capacity:
+            # only the newest 'capacity' samples can survive anyway
+            self.total += len(values) - self.capacity
+            values, times = values[-self.capacity:], times[-self.capacity:]
+        n = len(values)
+        if n == 0:
+            return
+        slots = (self._head + np.arange(n)) % self.capacity
+        self._values[slots] = self._values[slots + self.capacity] = values
+        self._times[slots] = self._times[slots + self.capacity] = times
+        self._head = (self._head + n) % self.capacity
+        self._size = min(self._size + n, self.capacity)
+        self.total += n
+
+    def skip(self, n):
+        """n samples went by without being stored: the kept window is no longer contiguous, drop it"""
+        self._size = 0
+        self.total += n
+
+    def clear(self):
+        self._head = 0
+        self._size = 0
+        self.total = 0
+
+    def _window(self):
+        start = self._head + self.capacity - self._size
+        return slice(start, start + self._size)
+
+    def values(self):
+        """Oldest-to-newest values as a zero-copy view (valid until the next write)"""
+        return self._values[self._window()]
+
+    def timestamps(self):
+        """Oldest-to-newest timestamps as a zero-copy view (valid until the next write)"""
+        return self._times[self._window()]
@@ -0,0 +1,61 @@
+"""Per-sensor alarm level with running totals for the overall system status.
+
+Every sensor is in one of three levels, from the latest packet shown in its
+row: HARDWARE (status FAULTY), PROCESS (value outside its limits) or OK. The
+model keeps how many sensors are in each level, so the worst level of the
+whole plant is known in O(1) after each update instead of by scanning every
+table row.
+"""
+LEVEL_OK = "OK"
+LEVEL_PROCESS = "PROCESS"
+LEVEL_HARDWARE = "HARDWARE"
+
+
+def row_level(hw_status, process_status):
+    """Level of one row: a hardware fault outranks a process alarm"""
+    if hw_status == "FAULTY":
+        return LEVEL_HARDWARE
+    if process_status != "OK":
+        return LEVEL_PROCESS
+    return LEVEL_OK
+
+
+class SensorStateModel:
+    """Latest level per sensor + count of sensors per level"""
+
+    def __init__(self, names):
+        # sensors without data yet count as OK, like an empty table row
+        self.levels = {name: LEVEL_OK for name in names}
+        self.counts = {LEVEL_OK: len(self.levels), LEVEL_PROCESS: 0, LEVEL_HARDWARE: 0}
+
+    def update(self, name, hw_status, process_status):
+        """Record a sensor's latest row state; returns True if its level changed"""
+        level = row_level(hw_status, process_status)
+        old = self.levels.get(name)
+        if old == level:
+            return False
+        if old is not None:
+            self.counts[old] -= 1
+        self.levels[name] = level
+        self.counts[level] += 1
+        return True
+
+    def add(self, name):
+        """A new sensor (config reload), OK until its first packet"""
+        if name not in self.levels:
+            self.levels[name] = LEVEL_OK
+            self.counts[LEVEL_OK] += 1
+
+    def remove(self, name):
+        level = self.levels.pop(name, None)
+        if level is not None:
+            self.counts[level] -= 1
+
+    @property
+    def status(self):
+        """Worst level over all sensors"""
+        if self.counts[LEVEL_HARDWARE]:
+            return LEVEL_HARDWARE
+        if self.counts[LEVEL_PROCESS]:
+            return LEVEL_PROCESS
+        return LEVEL_OK
@@ -0,0 +1,69 @@
+"""Table model of the Statistics tab: one row per sensor, one column per statistic.
+
+Rows follow the config order (a reload removes rows and appends new ones at the
+end); set_snapshot() replaces the numbers of every row with a StreamStats
+snapshot and signals one dataChanged for the whole block.
+"""
+import math
+
+from PyQt6.QtCore import QAbstractTableModel, QModelIndex, Qt
+
+try:
+    from GUI.stream_stats import FIELDS
+except ImportError:
+    from stream_stats import FIELDS
+
+COLUMNS = ("Sensor", "Samples", "Mean", "Std Dev", "Min", "Max", "P50", "P95", "P99", "EWMA")
+
+
+class StatsTableModel(QAbstractTableModel):
+    """Rolling statistics of every sensor for the selected window"""
+
+    def __init__(self, names, parent=None):
+        super().__init__(parent)
+        self.names = list(names)
+        self.stats = {}
+
+    def set_snapshot(self, snapshot):
+        self.stats = snapshot
+        if self.names:
+            self.dataChanged.emit(self.index(0, 1), self.index(len(self.names) - 1, len(COLUMNS) - 1))
+
+    def add_sensors(self, names):
+        if not names:
+            return
+        self.beginInsertRows(QModelIndex(), len(self.names), len(self.names) + len(names) - 1)
+        self.names.extend(names)
+        self.endInsertRows()
+
+    def remove_sensors(self, names):
+        for name in names:
+            row = self.names.index(name)
+            self.beginRemoveRows(QModelIndex(), row, row)
+            del self.names[row]
+            self.endRemoveRows()
+
+    # ---------- Qt model interface ----------
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.names)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(COLUMNS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return COLUMNS[section]
+        return super().headerData(section, orientation, role)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or role != Qt.ItemDataRole.DisplayRole:
+            return None
+        name = self.names[index.row()]
+        if index.column() == 0:
+            return name
+        value = self.stats.get(name, {}).get(FIELDS[index.column() - 1])
+        if value is None or (isinstance(value, float) and math.isnan(value)):
+            return "-"
+        if index.column() == 1:
+            return str(value)
+        return f"{value:.2f}"
@@ -0,0 +1,212 @@
+"""Model/view backing of the Live Status table.
+
+StatusTableModel keeps the latest state of every sensor in flat NumPy columns
+(value, timestamp, hardware and process status codes) instead of one widget
+item per cell. Cell text and colours are produced on demand by data(), so the
+view only ever formats the rows that are on screen, and update_rows() emits
+dataChanged for the changed cells only, grouped into runs of adjacent rows.
+A config reload removes rows in place and appends new sensors at the end.
+
+StatusFilterProxy adds sorting (numeric on value/timestamp, by severity on the
+status columns) and filtering by alarm level and sensor name.
+"""
+import time
+
+import numpy as np
+from PyQt6.QtCore import QAbstractTableModel, QModelIndex, QSortFilterProxyModel, Qt
+from PyQt6.QtGui import QColor
+
+try:
+    from GUI.alarm_engine import PROCESS_STATUS
+    from GUI.sensor_state_model import LEVEL_OK, LEVEL_PROCESS, LEVEL_HARDWARE
+except ImportError:
+    from alarm_engine import PROCESS_STATUS
+    from sensor_state_model import LEVEL_OK, LEVEL_PROCESS, LEVEL_HARDWARE
+
+COLUMNS = ("Sensor", "Value", "Timestamp", "HW Status", "Process Status")
+COL_NAME, COL_VALUE, COL_TIME, COL_HW, COL_PROCESS = range(len(COLUMNS))
+
+HW_STATUS = ("OK", "FAULTY")
+_HW_CODES = {name: code for code, name in enumerate(HW_STATUS)}
+_PROCESS_CODES = {name: code for code, name in enumerate(PROCESS_STATUS)}
+
+# level codes, in severity order (also the sort key of the status columns)
+LEVELS = (LEVEL_OK, LEVEL_PROCESS, LEVEL_HARDWARE)
+_NO_DATA = -1
+
+# row colours per level, created once (data() is called for every visible cell)
+_BACKGROUND = (QColor("#27ae60"), QColor("#c0392b"), QColor("#f1c40f"))     # green, red, yellow
+_FOREGROUND = (QColor("white"), QColor("white"), QColor("black"))
+
+SORT_ROLE = Qt.ItemDataRole.UserRole
+LEVEL_ROLE = Qt.ItemDataRole.UserRole + 1
+
+
+class StatusTableModel(QAbstractTableModel):
+    """Latest value/timestamp/status of every sensor, one row per sensor in config order"""
+
+    def __init__(self, names, parent=None):
+        super().__init__(parent)
+        self.names = list(names)
+        self.row_of = {name: row for row, name in enumerate(self.names)}
+        n = len(self.names)
+        self.values = np.full(n, np.nan)
+        self.timestamps = np.full(n, np.nan)
+        self.hw = np.zeros(n, dtype=np.int8)
+        self.process = np.zeros(n, dtype=np.int8)
+        self.levels = np.full(n, _NO_DATA, dtype=np.int8)     # no packet yet: empty row
+
+    # ---------- updates ----------
+    def update_rows(self, rows):
+        """Apply {name: (value, timestamp, hw status, process status)}; signal only the cells that changed"""
+        if not rows:
+            return
+        idx = np.fromiter((self.row_of[name] for name in rows), dtype=np.intp, count=len(rows))
+        states = list(rows.values())
+        values = np.fromiter((s[0] for s in states), dtype=np.float64, count=len(states))
+        timestamps = np.fromiter((s[1] for s in states), dtype=np.float64, count=len(states))
+        hw = np.fromiter((_HW_CODES.get(s[2], 1) for s in states), dtype=np.int8, count=len(states))
+        process = np.fromiter((_PROCESS_CODES.get(s[3], 0) for s in states), dtype=np.int8, count=len(states))
+        levels = np.where(hw == 1, 2, np.where(process != 0, 1, 0)).astype(np.int8)
+
+        # per row: first and last changed column (a level change recolours the whole row)
+        changed = np.stack([
+            levels != self.levels[idx],
+            (values != self.values[idx]) & ~(np.isnan(values) & np.isnan(self.values[idx])),
+            timestamps != self.timestamps[idx],
+            hw != self.hw[idx],
+            process != self.process[idx],
+        ], axis=1)
+        self.values[idx], self.timestamps[idx] = values, timestamps
+        self.hw[idx], self.process[idx], self.levels[idx] = hw, process, levels
+
+        rows_changed = changed.any(axis=1)
+        if not rows_changed.any():
+            return
+        recolour = changed[:, 0]
+        first = np.where(recolour, COL_NAME, np.argmax(changed[:, 1:], axis=1) + COL_VALUE)
+        last = np.where(recolour, COL_PROCESS, len(COLUMNS) - 1 - np.argmax(changed[:, :0:-1], axis=1))
+        order = np.argsort(idx[rows_changed], kind='stable')
+        self._emit_runs(idx[rows_changed][order], first[rows_changed][order], last[rows_changed][order])
+
+    def _emit_runs(self, rows, first, last):
+        """One dataChanged per run of adjacent rows, spanning the union of their changed columns"""
+        start = 0
+        for k in range(1, len(rows) + 1):
+            if k == len(rows) or rows[k] != rows[k - 1] + 1:
+                self.dataChanged.emit(self.index(int(rows[start]), int(first[start:k].min())),
+                                      self.index(int(rows[k - 1]), int(last[start:k].max())))
+                start = k
+
+    def add_sensors(self, names):
+        """New sensors (config reload): empty rows at the end"""
+        if not names:
+            return
+        n, k = len(self.names), len(names)
+        self.beginInsertRows(QModelIndex(), n, n + k - 1)
+        self.names.extend(names)
+        self.row_of.update((name, n + i) for i, name in enumerate(names))
+        self.values = np.concatenate([self.values, np.full(k, np.nan)])
+        self.timestamps = np.concatenate([self.timestamps, np.full(k, np.nan)])
+        self.hw = np.concatenate([self.hw, np.zeros(k, dtype=np.int8)])
+        self.process = np.concatenate([self.process, np.zeros(k, dtype=np.int8)])
+        self.levels = np.concatenate([self.levels, np.full(k, _NO_DATA, dtype=np.int8)])
+        self.endInsertRows()
+
+    def remove_sensors(self, names):
+        """Removed sensors (config reload): the rows below move up"""
+        for name in names:
+            row = self.row_of[name]
+            self.beginRemoveRows(QModelIndex(), row, row)
+            del self.names[row]
+            for attr in ("values", "timestamps", "hw", "process", "levels"):
+                setattr(self, attr, np.delete(getattr(self, attr), row))
+            self.row_of = {name: row for row, name in enumerate(self.names)}
+            self.endRemoveRows()
+
+    def clear(self):
+        self.beginResetModel()
+        self.values[:] = np.nan
+        self.timestamps[:] = np.nan
+        self.hw[:] = 0
+        self.process[:] = 0
+        self.levels[:] = _NO_DATA
+        self.endResetModel()
+
+    # ---------- Qt model interface ----------
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.names)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(COLUMNS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return COLUMNS[section]
+        return super().headerData(section, orientation, role)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        row, col = index.row(), index.column()
+        level = int(self.levels[row])
+        if role == Qt.ItemDataRole.DisplayRole:
+            if col == COL_NAME:
+                return self.names[row]
+            if level == _NO_DATA:
+                return None
+            return self.display_text(row, col)
+        if role == SORT_ROLE:
+            if col == COL_NAME:
+                return self.names[row]
+            if col == COL_VALUE:
+                return float(self.values[row])
+            if col == COL_TIME:
+                return float(self.timestamps[row])
+            return level
+        if role == LEVEL_ROLE:
+            return level
+        if level == _NO_DATA:
+            return None
+        if role == Qt.ItemDataRole.BackgroundRole:
+            return _BACKGROUND[level]
+        if role == Qt.ItemDataRole.ForegroundRole:
+            return _FOREGROUND[level]
+        return None
+
+    def display_text(self, row, col):
+        """Cell text as the table shows it"""
+        if col == COL_NAME:
+            return self.names[row]
+        if col == COL_VALUE:
+            return str(float(self.values[row]))
+        if col == COL_TIME:
+            return time.strftime("%H:%M:%S", time.localtime(float(self.timestamps[row])))
+        if col == COL_HW:
+            return HW_STATUS[self.hw[row]]
+        return PROCESS_STATUS[self.process[row]]
+
+
+class StatusFilterProxy(QSortFilterProxyModel):
+    """Sorts the status table and filters it by alarm level and sensor name"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.level = None       # None = every row, else one of LEVELS
+        self.setSortRole(SORT_ROLE)
+        self.setFilterKeyColumn(COL_NAME)
+        self.setFilterCaseSensitivity(Qt.CaseSensitivity.CaseInsensitive)
+
+    def set_level_filter(self, level):
+        self.level = level
+        self.invalidateFilter()
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        if self.level is not None:
+            source = self.sourceModel()
+            level = source.data(source.index(source_row, COL_NAME, source_parent), LEVEL_ROLE)
+            if level == _NO_DATA:
+                level = LEVELS.index(LEVEL_OK)     # not in alarm: counted as OK by the summary too
+            if level != LEVELS.index(self.level):
+                return False
+        return super().filterAcceptsRow(source_row, source_parent)
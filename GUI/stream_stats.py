@@ -0,0 +1,205 @@
+"""Incremental per-sensor statistics over sliding windows.
+
+Every sensor gets one WindowStats per configured window (the newest N samples)
+and an exponentially weighted moving average. A block of k new samples costs
+O(k) vectorised work whatever the window size: the samples entering the window
+and the ones falling out of it are merged into / removed from the running
+count, mean and M2 (Welford, block-wise as in Chan et al.) and into / from a
+fixed-bin histogram that answers the quantile queries. Nothing is recomputed
+over the stored history per sample; only snapshot() (once per refresh of the
+statistics view) reduces the window for its min/max and walks the histogram.
+"""
+import numpy as np
+
+QUANTILES = (0.5, 0.95, 0.99)
+# snapshot fields, in the order the statistics table shows them
+FIELDS = ("count", "mean", "std", "min", "max", "p50", "p95", "p99", "ewma")
+
+
+class WindowStats:
+    """Count/mean/variance/min/max/quantiles of the newest 'size' samples of one sensor"""
+
+    def __init__(self, size, low, high, bins=256):
+        self.size = max(1, int(size))
+        self._values = np.zeros(self.size)     # circular; slots 0..count-1 until the window is full
+        self._head = 0
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self._since_exact = 0                  # samples merged since the mean/M2 were last recomputed
+        # histogram over the sensor limits widened by half a span on each side;
+        # values beyond land in the edge bins (quantiles are clamped to the window min/max)
+        span = float(high - low) or 1.0
+        self._lo = float(low) - span / 2
+        self._width = 2 * span / bins
+        self._bins = np.zeros(bins, dtype=np.int64)
+
+    def _bin_of(self, values):
+        return np.clip((values - self._lo) / self._width, 0, len(self._bins) - 1).astype(np.intp)
+
+    def extend(self, values):
+        """Slide the window over a block of finite samples (oldest first)"""
+        if len(values) >= self.size:
+            self.clear()
+            values = values[-self.size:]
+        k = len(values)
+        if not k:
+            return
+        evicted = self.count + k - self.size
+        if evicted > 0:
+            oldest = (self._head - self.count) % self.size
+            out = self._values[(oldest + np.arange(evicted)) % self.size]
+            self._remove(out)
+            np.subtract.at(self._bins, self._bin_of(out), 1)
+        slots = (self._head + np.arange(k)) % self.size
+        self._values[slots] = values
+        self._head = (self._head + k) % self.size
+        self._add(values)
+        np.add.at(self._bins, self._bin_of(values), 1)
+
+        self._since_exact += k
+        if self._since_exact >= self.size:
+            # add/remove rounding drifts over a long run: once per window length
+            # (amortised O(1) per sample) restart from the exact window moments
+            window = self._window()
+            self.mean = float(window.mean())
+            self._m2 = float(((window - self.mean) ** 2).sum())
+            self._since_exact = 0
+
+    def _add(self, values):
+        k = len(values)
+        mean_b = float(values.mean())
+        m2_b = float(((values - mean_b) ** 2).sum())
+        n = self.count + k
+        delta = mean_b - self.mean
+        self.mean += delta * k / n
+        self._m2 += m2_b + delta * delta * self.count * k / n
+        self.count = n
+
+    def _remove(self, values):
+        k = len(values)
+        n = self.count - k
+        if n <= 0:
+            self.count, self.mean, self._m2 = 0, 0.0, 0.0
+            return
+        mean_b = float(values.mean())
+        m2_b = float(((values - mean_b) ** 2).sum())
+        mean_a = (self.count * self.mean - k * mean_b) / n
+        delta = mean_b - mean_a
+        self._m2 = max(0.0, self._m2 - m2_b - delta * delta * n * k / self.count)
+        self.mean = mean_a
+        self.count = n
+
+    def _window(self):
+        return self._values if self.count == self.size else self._values[:self.count]
+
+    def clear(self):
+        self._head = 0
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self._since_exact = 0
+        self._bins[:] = 0
+
+    @property
+    def std(self):
+        """Sample standard deviation"""
+        return (self._m2 / (self.count - 1)) ** 0.5 if self.count > 1 else 0.0
+
+    def quantiles(self, qs=QUANTILES, lo=None, hi=None):
+        """Approximate quantiles from the histogram (error below one bin width inside the range)"""
+        if not self.count:
+            return [np.nan] * len(qs)
+        cum = np.cumsum(self._bins)
+        ranks = np.asarray(qs, dtype=np.float64) * (self.count - 1)
+        idx = np.searchsorted(cum, ranks, side='right')
+        inside = self._bins[idx]
+        # spread the samples of a bin evenly over its width
+        frac = (ranks - (cum[idx] - inside) + 0.5) / inside
+        result = self._lo + (idx + frac) * self._width
+        if lo is not None:
+            result = np.clip(result, lo, hi)
+        return [float(v) for v in result]
+
+    def snapshot(self):
+        if not self.count:
+            return {"count": 0}
+        window = self._window()
+        lo, hi = float(window.min()), float(window.max())
+        p50, p95, p99 = self.quantiles(QUANTILES, lo, hi)
+        return {"count": self.count, "mean": self.mean, "std": self.std, "min": lo, "max": hi,
+                "p50": p50, "p95": p95, "p99": p99}
+
+
+class SensorStats:
+    """All windows + the EWMA of one sensor"""
+
+    def __init__(self, windows, low, high, alpha=0.1, bins=256):
+        self.windows = [WindowStats(size, low, high, bins) for size in windows]
+        self.alpha = alpha
+        self.ewma = None
+
+    def extend(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        values = values[np.isfinite(values)]
+        if not len(values):
+            return
+        for window in self.windows:
+            window.extend(values)
+        self._extend_ewma(values)
+
+    def _extend_ewma(self, values):
+        a = self.alpha
+        if self.ewma is None:
+            self.ewma, values = float(values[0]), values[1:]
+        k = len(values)
+        if k:
+            # k recursive steps e = (1 - a) e + a x at once
+            weights = (1 - a) ** np.arange(k - 1, -1, -1)
+            self.ewma = (1 - a) ** k * self.ewma + a * float(np.dot(weights, values))
+
+    def clear(self):
+        for window in self.windows:
+            window.clear()
+        self.ewma = None
+
+
+class StreamStats:
+    """Rolling statistics of every sensor, updated one block of samples at a time"""
+
+    def __init__(self, limits, windows=(100, 1000), alpha=0.1, bins=256):
+        self.windows = tuple(int(w) for w in windows)
+        self.alpha, self.bins = alpha, bins
+        self.limits = {}
+        self.sensors = {}
+        self.update_limits(limits)
+
+    def update_limits(self, limits):
+        """New sensor list (config reload): sensors with unchanged limits keep their windows,
+        the others start over (the histogram bins span the limits)"""
+        sensors = {}
+        for name, lim in limits.items():
+            bounds = (lim['low'], lim['high'])
+            if self.limits.get(name) == bounds:
+                sensors[name] = self.sensors[name]
+            else:
+                sensors[name] = SensorStats(self.windows, bounds[0], bounds[1], self.alpha, self.bins)
+        self.sensors = sensors
+        self.limits = {name: (lim['low'], lim['high']) for name, lim in limits.items()}
+
+    def extend(self, name, values):
+        """New samples of one sensor, oldest first"""
+        self.sensors[name].extend(values)
+
+    def snapshot(self, window=0):
+        """{name: {field: value}} for the window at index 'window' (see FIELDS)"""
+        result = {}
+        for name, sensor in self.sensors.items():
+            stats = sensor.windows[window].snapshot()
+            stats["ewma"] = sensor.ewma
+            result[name] = stats
+        return result
+
+    def reset(self):
+        for sensor in self.sensors.values():
+            sensor.clear()
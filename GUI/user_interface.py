@@ -1,20 +1,52 @@
 import sys, socket, json, time
-from collections import deque
 from PyQt6.QtWidgets import *
 from PyQt6.QtCore import *
 from PyQt6.QtGui import *
 import pyqtgraph as pg
-from plyer import notification
-import requests
-import threading
+import numpy as np
 import csv
 
 try:
     from GUI import TCP_Manager  # When running from root (main/test_suit)
+    from GUI.ring_buffer import RingBuffer
+    from GUI.lod_pyramid import MinMaxPyramid
+    from GUI.history_store import HistoryStore
+    from GUI.alarm_engine import AlarmEngine, EVENT_ALARM, PROCESS_STATUS
+    from GUI.processing_pipeline import ProcessingPipeline
+    from GUI.log_writer import LogWriter
+    from GUI.sensor_state_model import SensorStateModel, LEVEL_HARDWARE, LEVEL_PROCESS, LEVEL_OK
+    from GUI.status_table_model import StatusTableModel, StatusFilterProxy, COL_NAME, COL_VALUE
+    from GUI.alarm_store import AlarmStore, TS, SENSOR, VALUE, TYPE
+    from GUI.alarm_table_model import AlarmPageModel, format_time
+    from GUI.notifier import NotificationDispatcher, DesktopChannel, WebhookChannel, pooled_session
+    from GUI.stream_stats import StreamStats
+    from GUI.stats_table_model import StatsTableModel
+    from GUI.anomaly_detectors import DetectorPipeline, RateOfChangeDetector, ZScoreDetector, StuckValueDetector
+    from common.config_watcher import ConfigWatcher, ConfigError, diff_sensors, other_sections_changed
+    from common.latency_trace import LatencyTracker
 except ImportError:
     import TCP_Manager           # When running user_interface.py directly
+    from ring_buffer import RingBuffer
+    from lod_pyramid import MinMaxPyramid
+    from history_store import HistoryStore
+    from alarm_engine import AlarmEngine, EVENT_ALARM, PROCESS_STATUS
+    from processing_pipeline import ProcessingPipeline
+    from log_writer import LogWriter
+    from sensor_state_model import SensorStateModel, LEVEL_HARDWARE, LEVEL_PROCESS, LEVEL_OK
+    from status_table_model import StatusTableModel, StatusFilterProxy, COL_NAME, COL_VALUE
+    from alarm_store import AlarmStore, TS, SENSOR, VALUE, TYPE
+    from alarm_table_model import AlarmPageModel, format_time
+    from notifier import NotificationDispatcher, DesktopChannel, WebhookChannel, pooled_session
+    from stream_stats import StreamStats
+    from stats_table_model import StatsTableModel
+    from anomaly_detectors import DetectorPipeline, RateOfChangeDetector, ZScoreDetector, StuckValueDetector
+    from common.config_watcher import ConfigWatcher, ConfigError, diff_sensors, other_sections_changed  # root added by TCP_Manager
+    from common.latency_trace import LatencyTracker
 
 class SensorDashboard(QMainWindow):
+    # maintenance log lines from background threads: notifier, history writer (delivered on the GUI thread)
+    notification_log = pyqtSignal(str)
+
     def __init__(self):
         super().__init__()
         # set up the Top window of the dashboard
@@ -23,23 +55,49 @@ class SensorDashboard(QMainWindow):
         
         self.load_config()
 
+        # Maintenance log file: lines are queued here and written in batches by a background thread
+        self.log_writer = LogWriter(self.logging.get('path', 'industrial_monitor.log'),
+                                    max_bytes=self.logging.get('max_bytes', 5 << 20),
+                                    backups=self.logging.get('backups', 3),
+                                    flush_interval=self.logging.get('flush_interval', 0.5))
+
+        # Alarm history: newest alarms in memory, all of them in an indexed SQLite file
+        self.alarm_store = AlarmStore(self.alarm_conf.get('path', 'alarm_history.db'),
+                                      ring_size=self.alarm_conf.get('ring_size', 1000),
+                                      retention_days=self.alarm_conf.get('retention_days'))
+        # "This session" range of the alarm view starts here (and moves on "Clear Alarms")
+        self.alarm_session_start = time.time()
+
+        # Notifications: rate-limited digests per channel, sent by a small worker pool
+        self.notification_log.connect(self.update_maintenance_log)
+        self.notifier = self.create_notifier()
+
         # Dynamically build the mapping for table rows 
         self.sensor_to_row = {name: i for i, name in enumerate(self.limits.keys())}
-        self.previous_state = {name: "OK" for name in self.limits.keys()}
-
-        # Throttling Logic State
-        # create peocess, and HW counter and status for each sensor
-        # this makes it easy to track the process and hw status and 
-        # know when it is true positive alarm to notify for!
-        self.proc_counters = {name: 0 for name in self.limits.keys()}
-        self.proc_notified = {name: False for name in self.limits.keys()}
-        self.hw_counters = {name: 0 for name in self.limits.keys()}
-        self.hw_notified = {name: False for name in self.limits.keys()}
 
         # FIXED: Case-sensitivity standardization
         self.PROC_THRESHOLD = 5     # Urgent -> fast notification for the machine safety (need immediate engagment)
         self.HW_THRESHOLD = 15      # Slow notifications (filtering hangs), but need to be represented for future checking
 
+        # Throttling Logic State
+        # the alarm engine keeps process, and HW counter and status for each sensor in arrays
+        # and evaluates whole batches at once; this makes it easy to track the process and hw status and 
+        # know when it is true positive alarm to notify for!
+        # anomaly detectors (rate of change, z-score, stuck value) add process alarms inside the limits
+        self.alarms = AlarmEngine(self.limits, self.PROC_THRESHOLD, self.HW_THRESHOLD,
+                                  detectors=self.create_detectors())
+        # dict-like views (sensor name -> value) on the engine state
+        self.previous_state = self.alarms.view("alarmed")
+        self.proc_counters = self.alarms.view("proc_counters")
+        self.proc_notified = self.alarms.view("proc_notified")
+        self.hw_counters = self.alarms.view("hw_counters")
+        self.hw_notified = self.alarms.view("hw_notified")
+
+        # Rolling mean/std/min/max/quantiles/EWMA per sensor, fed block-wise by the worker stage
+        self.stream_stats = StreamStats(self.limits, windows=self.stats_conf.get('windows', [100, 1000]),
+                                        alpha=self.stats_conf.get('ewma_alpha', 0.1),
+                                        bins=self.stats_conf.get('histogram_bins', 256))
+
         # Connection Watchdog
         self.is_shutting_down = False
         self.watchdog_timer = QTimer()
@@ -51,25 +109,149 @@ class SensorDashboard(QMainWindow):
         self.setup_ui()
         self.apply_styles()
 
+        # Render loop: packets only mark sensors dirty, the timer draws them once per frame
+        self.dirty_plots, self.dirty_rows = set(), set()
+        self.row_state = {}
+        # per-sensor level + running HARDWARE/PROCESS/OK counts: the overall status in O(1)
+        self.sensor_states = SensorStateModel(self.limits.keys())
+        self.shown_status = None    # status currently painted on the label (None = something else is shown)
+        self.status_dirty = False
+        # sensor-to-pixel latency: traced batches wait here for the frame that draws them
+        self.pending_traces = []
+        self.latency = LatencyTracker()
+        self.render_timer = QTimer()
+        self.render_timer.setInterval(max(1, int(1000 / self.render_fps)))
+        self.render_timer.timeout.connect(self.render_frame)
+        self.render_timer.start()
+
+        # Ingest vs render rate report (once per second, in the status bar)
+        self.packets_ingested, self.frames_rendered = 0, 0
+        self.rate_timer = QTimer()
+        self.rate_timer.setInterval(1000)
+        self.rate_timer.timeout.connect(self.report_rates)
+        # alarms are written to disk in batches; at most a second late
+        self.rate_timer.timeout.connect(self.alarm_store.flush)
+        # the statistics view is refreshed at the same pace (and only while it is shown)
+        self.rate_timer.timeout.connect(self.refresh_stats)
+        self.rate_timer.start()
+
+        # Every received packet of a configured sensor is persisted; append is only a queue put
+        self.history = None
+        if self.storage.get('enabled', True):
+            self.history = HistoryStore(self.storage.get('path', 'history'),
+                                        chunk_size=self.storage.get('chunk_size', 65536),
+                                        fsync_interval=self.storage.get('fsync_interval', 1.0),
+                                        max_queued=self.storage.get('max_queued', 4096),
+                                        on_error=self.notification_log.emit)
+
+        # Worker stage: persistence + alarm evaluation off the GUI thread, bounded-rate UI deltas back
+        self.pipeline = ProcessingPipeline(self.alarms, self.limits.keys(), self.history,
+                                           delta_rate=self.delta_rate, max_samples=self.plot_window,
+                                           stats=self.stream_stats)
+        self.pipeline.delta_ready.connect(self.apply_delta)
+        self.pipeline.start()
+
         # the TCP connection functions
         self.receiver = TCP_Manager.TCPManager()
-        self.receiver.data_received.connect(self.process_packet)
+        # decoded batches go straight to the worker, no Qt event per batch
+        self.receiver.packet_sink = self.pipeline.submit
         self.receiver.log_signal.connect(self.update_maintenance_log)
         self.receiver.start()
 
+        # Live config reload: sensor limits and the sensor list follow config.json without a restart
+        self.config_watcher = ConfigWatcher('config.json', self.config)
+        self.config_timer = QTimer()
+        self.config_timer.setInterval(int(1000 * self.config_poll_interval))
+        self.config_timer.timeout.connect(self.check_config)
+        self.config_timer.start()
+
     def load_config(self):
         """ Load configuration data"""
         with open('config.json', 'r') as f:
             config = json.load(f)
-        
-        # Dynamically build the limits dictionary for the GUI
-        self.limits = {}
-        for s in config['sensors']:
-            self.limits[s['name']] = {"low": s['min'], "high": s['max']}
+        self.config = config
+        self.load_sensors(config['sensors'])
+
+        # Rendering is decoupled from ingestion: redraw at most render_fps times per second
+        self.render_fps = config.get('dashboard', {}).get('render_fps', 30)
+        # samples kept per trend plot (preallocated ring buffer, can go up to millions)
+        self.plot_window = config.get('dashboard', {}).get('plot_window', 40)
+        # max aggregated updates per second the processing worker sends to the GUI thread
+        self.delta_rate = config.get('dashboard', {}).get('delta_rate', 30)
+        # seconds between two checks of config.json for changes
+        self.config_poll_interval = config.get('dashboard', {}).get('config_poll_interval', 1.0)
+
+        # Durable sample history (append-only column files, written off the Qt thread)
+        self.storage = config.get('storage', {})
+        # Maintenance log file rotation/flushing and the size of the on-screen console
+        self.logging = config.get('logging', {})
+        # Alarm history database and the page size of the alarm view
+        self.alarm_conf = config.get('alarms', {})
+        # Notification channels, their rate limits and the digest/retry policy
+        self.notify_conf = config.get('notifications', {})
+        # Rolling statistics windows (in samples), EWMA smoothing and quantile histogram resolution
+        self.stats_conf = config.get('statistics', {})
+        # Anomaly detectors evaluated next to the static limits
+        self.detector_conf = config.get('detectors', {})
         
         # Dynamically build the mapping for table rows
         #self.sensor_to_row = {name: i for i, name in enumerate(self.limits.keys())}
         
+    def load_sensors(self, sensors):
+        """ per-sensor settings from the 'sensors' list of the config, in list order """
+        # Dynamically build the limits dictionary for the GUI
+        self.limits = {}
+        for s in sensors:
+            self.limits[s['name']] = {"low": s['min'], "high": s['max']}
+        # optional per-sensor max rate of change (units per second), overrides the detector default
+        self.max_rates = {s['name']: s['max_rate'] for s in sensors if 'max_rate' in s}
+        # nominal sampling interval per sensor (seconds)
+        self.intervals = {s['name']: s.get('interval', 1.0) for s in sensors}
+
+    def create_notifier(self):
+        """ build the notification channels from the config """
+        conf = self.notify_conf
+        channels_conf = conf.get('channels', {})
+        workers = conf.get('workers', 2)
+        channels = []
+        desktop = channels_conf.get('desktop', {})
+        if desktop.get('enabled', True):
+            channels.append(DesktopChannel(rate=desktop.get('rate', 6), per=desktop.get('per', 60.0)))
+        discord = channels_conf.get('discord', {})
+        if discord.get('enabled', True) and discord.get('url'):
+            channels.append(WebhookChannel(discord['url'], pooled_session(workers),
+                                           rate=discord.get('rate', 5), per=discord.get('per', 10.0)))
+        return NotificationDispatcher(channels, workers=workers,
+                                      digest_window=conf.get('digest_window', 1.0),
+                                      retries=conf.get('retries', 3), backoff=conf.get('retry_backoff', 1.0),
+                                      on_result=self.on_notification_result)
+
+    def create_detectors(self):
+        """ build the anomaly detector pipeline from the config (None if every detector is disabled);
+            the first detector that flags a sample names its status: rate of change, stuck value, z-score """
+        conf = self.detector_conf
+        spans = [lim['high'] - lim['low'] for lim in self.limits.values()]
+        detectors = []
+        rate = conf.get('rate_of_change', {})
+        if rate.get('enabled', True):
+            # default limit: a step of max_step times the min..max span per sampling interval
+            step = rate.get('max_step', 0.25)
+            intervals = [self.intervals[name] for name in self.limits]
+            detectors.append(RateOfChangeDetector(
+                [self.max_rates.get(name, step * span / dt) for name, span, dt in zip(self.limits, spans, intervals)],
+                intervals, [lim['low'] for lim in self.limits.values()], [lim['high'] for lim in self.limits.values()]))
+        stuck = conf.get('stuck', {})
+        # off by default: normal process data can hold a value for minutes (the shipped data files do)
+        if stuck.get('enabled', False):
+            detectors.append(StuckValueDetector(len(spans), samples=stuck.get('samples', 200),
+                                                tolerance=stuck.get('tolerance', 0.0)))
+        zscore = conf.get('zscore', {})
+        if zscore.get('enabled', True):
+            detectors.append(ZScoreDetector([zscore.get('min_std', 0.01) * span for span in spans],
+                                            threshold=zscore.get('threshold', 6.0),
+                                            alpha=zscore.get('alpha', 0.01), warmup=zscore.get('warmup', 50)))
+        return DetectorPipeline(detectors, PROCESS_STATUS) if detectors else None
+
     def setup_ui(self):
         """ prepare the dashboard and divide and organize the visual apperance of the windows and buttons """
 
@@ -92,32 +274,104 @@ class SensorDashboard(QMainWindow):
         # Tab 1: Live Status
         self.table_tab = QWidget()
         table_layout = QVBoxLayout(self.table_tab)
-        self.table = QTableWidget(len(self.limits), 5) 
-        self.table.setHorizontalHeaderLabels(["Sensor", "Value", "Timestamp", "HW Status", "Process Status"])
+        # filter bar: alarm level + sensor name
+        filter_h = QHBoxLayout()
+        self.status_filter = QComboBox()
+        for label, level in (("All sensors", None), ("OK", LEVEL_OK), ("Process alarm", LEVEL_PROCESS),
+                             ("Hardware fault", LEVEL_HARDWARE)):
+            self.status_filter.addItem(label, level)
+        self.name_filter = QLineEdit()
+        self.name_filter.setPlaceholderText("Filter sensors...")
+        filter_h.addWidget(self.status_filter)
+        filter_h.addWidget(self.name_filter)
+        table_layout.addLayout(filter_h)
+
+        # model/view table: per-sensor arrays behind it, only the visible rows are ever formatted
+        self.status_model = StatusTableModel(self.limits.keys())
+        self.status_proxy = StatusFilterProxy()
+        self.status_proxy.setSourceModel(self.status_model)
+        self.status_filter.currentIndexChanged.connect(
+            lambda _: self.status_proxy.set_level_filter(self.status_filter.currentData()))
+        self.name_filter.textChanged.connect(self.status_proxy.setFilterFixedString)
+        self.table = QTableView()
+        self.table.setModel(self.status_proxy)
+        self.table.setSortingEnabled(True)
+        self.table.sortByColumn(-1, Qt.SortOrder.AscendingOrder)    # config order until a header is clicked
         self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        # fixed row height: the view never measures rows it doesn't show
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
         table_layout.addWidget(self.table)
         self.tabs.addTab(self.table_tab, "Live Status")
 
         # Tab 2: Plots
         self.plot_tab = QWidget()
         self.plot_grid = QGridLayout(self.plot_tab)
-        self.plots, self.plot_data, self.curves = {}, {}, {}
-        for i, name in enumerate(self.limits.keys()):
-            p_widget = pg.PlotWidget(title=f"{name.upper()} Trend")
-            self.plot_grid.addWidget(p_widget, i // 2, i % 2)
-            self.plot_data[name] = deque([0.0] * 40, maxlen=40)
-            self.curves[name] = p_widget.plot(pen=pg.mkPen(color='g', width=2))
+        self.plots, self.plot_data, self.plot_lod, self.curves = {}, {}, {}, {}
+        for name in self.limits.keys():
+            self.add_plot(name)
+        self.layout_plots()
         self.tabs.addTab(self.plot_tab, "Real-Time Plots")
 
         # Tab 3: Alarms
         self.alarm_tab = QWidget()
         alarm_layout = QVBoxLayout(self.alarm_tab)
-        self.alarm_table = QTableWidget(0, 4)
-        self.alarm_table.setHorizontalHeaderLabels(["Time", "Sensor", "Value", "Alarm Type"])
+        # filters: time range, sensor, alarm type (all answered by the store's indexes)
+        alarm_filter_h = QHBoxLayout()
+        self.alarm_range = QComboBox()
+        for label, seconds in (("This session", None), ("Last 24 hours", 86400),
+                               ("Last 30 days", 30 * 86400), ("All history", 0)):
+            self.alarm_range.addItem(label, seconds)
+        self.alarm_sensor = QComboBox()
+        self.alarm_sensor.addItem("All sensors", None)
+        for name in self.limits.keys():
+            self.alarm_sensor.addItem(name, name)
+        self.alarm_type = QComboBox()
+        self.alarm_type.addItem("All types", None)
+        for alarm_type in self.alarm_store.types():
+            self.alarm_type.addItem(alarm_type, alarm_type)
+        for combo in (self.alarm_range, self.alarm_sensor, self.alarm_type):
+            combo.currentIndexChanged.connect(self.apply_alarm_filter)
+            alarm_filter_h.addWidget(combo)
+        alarm_layout.addLayout(alarm_filter_h)
+
+        # one page of the history at a time, newest first
+        self.alarm_model = AlarmPageModel(self.alarm_store, page_size=self.alarm_conf.get('page_size', 200))
+        self.alarm_table = QTableView()
+        self.alarm_table.setModel(self.alarm_model)
         self.alarm_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        self.alarm_table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
         alarm_layout.addWidget(self.alarm_table)
+
+        pager_h = QHBoxLayout()
+        self.btn_alarm_newer = QPushButton("< Newer")
+        self.btn_alarm_older = QPushButton("Older >")
+        self.alarm_page_label = QLabel()
+        self.btn_alarm_newer.clicked.connect(lambda: self.show_alarm_page(self.alarm_model.page - 1))
+        self.btn_alarm_older.clicked.connect(lambda: self.show_alarm_page(self.alarm_model.page + 1))
+        pager_h.addWidget(self.btn_alarm_newer)
+        pager_h.addWidget(self.alarm_page_label)
+        pager_h.addWidget(self.btn_alarm_older)
+        alarm_layout.addLayout(pager_h)
+        self.apply_alarm_filter()
         self.tabs.addTab(self.alarm_tab, "Alarm History")
 
+        # Tab 4: Statistics (rolling window per sensor, snapshot once per second while visible)
+        self.stats_tab = QWidget()
+        stats_layout = QVBoxLayout(self.stats_tab)
+        self.stats_window = QComboBox()
+        for i, size in enumerate(self.stream_stats.windows):
+            self.stats_window.addItem(f"Last {size} samples", i)
+        self.stats_window.currentIndexChanged.connect(lambda _: self.refresh_stats(force=True))
+        stats_layout.addWidget(self.stats_window)
+        self.stats_model = StatsTableModel(self.limits.keys())
+        self.stats_table = QTableView()
+        self.stats_table.setModel(self.stats_model)
+        self.stats_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        self.stats_table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        stats_layout.addWidget(self.stats_table)
+        self.tabs.addTab(self.stats_tab, "Statistics")
+        self.tabs.currentChanged.connect(lambda _: self.refresh_stats())
+
         # Maintenance Console (Bottom)
         self.console_panel = QWidget()
         console_layout = QVBoxLayout(self.console_panel)
@@ -146,6 +400,8 @@ class SensorDashboard(QMainWindow):
         
         self.live_log = QPlainTextEdit()
         self.live_log.setReadOnly(True)
+        # oldest lines scroll out instead of the console growing for the whole session
+        self.live_log.setMaximumBlockCount(self.logging.get('console_lines', 5000))
         # Terminal-style styling
         self.live_log.setStyleSheet("""
             background-color: #000; 
@@ -162,6 +418,8 @@ class SensorDashboard(QMainWindow):
         self.btn_test = QPushButton("Clear Alarms")
         self.btn_snap = QPushButton("Value Snapshot")
         self.btn_export = QPushButton("Export CSV")
+        self.btn_latency = QPushButton("Latency Report")
+        self.btn_latency_export = QPushButton("Export Latency")
         self.btn_shutdown = QPushButton("Shutdown Machine")
 
         # Set specific styling for the restart/action buttons
@@ -183,6 +441,8 @@ class SensorDashboard(QMainWindow):
         cmd_h.addWidget(self.btn_test)
         cmd_h.addWidget(self.btn_snap)
         cmd_h.addWidget(self.btn_export)
+        cmd_h.addWidget(self.btn_latency)
+        cmd_h.addWidget(self.btn_latency_export)
         cmd_h.addWidget(self.btn_shutdown) 
         content_layout.addLayout(cmd_h)
         
@@ -194,89 +454,169 @@ class SensorDashboard(QMainWindow):
         self.btn_test.clicked.connect(self.clear_alarm_log)
         self.btn_snap.clicked.connect(self.take_snapshot)
         self.btn_export.clicked.connect(self.export_to_csv)
+        self.btn_latency.clicked.connect(self.show_latency_report)
+        self.btn_latency_export.clicked.connect(self.export_latency_report)
         self.btn_shutdown.clicked.connect(self.request_shutdown)
 
+    def add_plot(self, name):
+        """ trend plot of one sensor with its sample ring buffer and detail pyramid """
+        p_widget = pg.PlotWidget(title=f"{name.upper()} Trend")
+        self.plots[name] = p_widget
+        self.plot_data[name] = RingBuffer(self.plot_window)
+        # min/max level-of-detail pyramid, only has levels for long windows
+        self.plot_lod[name] = MinMaxPyramid(self.plot_window)
+        self.curves[name] = p_widget.plot(pen=pg.mkPen(color='g', width=2))
+        # zoom/pan or resize needs a different detail level: redraw on the next frame
+        view = p_widget.getViewBox()
+        view.sigXRangeChanged.connect(lambda *_, n=name: self.on_plot_view_changed(n))
+        view.sigResized.connect(lambda *_, n=name: self.on_plot_view_changed(n))
+
+    def remove_plot(self, name):
+        p_widget = self.plots.pop(name)
+        self.plot_grid.removeWidget(p_widget)
+        p_widget.deleteLater()
+        del self.plot_data[name], self.plot_lod[name], self.curves[name]
+        self.dirty_plots.discard(name)
+
+    def layout_plots(self):
+        """ two plots per row, in sensor order """
+        for name in self.limits.keys():
+            self.plot_grid.removeWidget(self.plots[name])
+        for i, name in enumerate(self.limits.keys()):
+            self.plot_grid.addWidget(self.plots[name], i // 2, i % 2)
+
+    def process_batch(self, batch):
+        """ handle a batch of packets synchronously in the calling thread (same result as the worker path) """
+        if self.is_shutting_down:
+            # Drop any leftover packets during shutdown
+            return
+        self.apply_delta(self.pipeline.process(batch))
+
     def process_packet(self, packet):
-        # Reset watchdog as we just received data
-        if not self.is_shutting_down:
+        """ handle a single packet (same path as a one-packet batch) """
+        self.process_batch([packet])
+
+    def apply_delta(self, delta):
+        """ apply the aggregated result of one or more processed batches to the GUI state """
+        try:
+            if self.is_shutting_down:
+                # deltas still in flight when the shutdown started
+                return
+            # Reset watchdog as we just received data
             self.watchdog_timer.start()
-        else:
-            # Drop any leftover packets during shutdown
-            return 
-        
-        # extract the required information form the packet
-        name = packet['sensor']
-        val, hw_status = packet['value'], packet['status']
-        row = self.sensor_to_row.get(name)
-        if row is None: return
-
-        # add the value of this sensor to it's real time plot
-        self.plot_data[name].append(val)
-        self.curves[name].setData(list(self.plot_data[name]))
-
-        # get the limits of the current sensor, to start the alarm checking operation
-        limit = self.limits.get(name)
-        process_status = "OK"
-        if val > limit['high']: process_status = "High Limit"
-        elif val < limit['low']: process_status = "Low Limit"
-
-        is_currently_alarmed = (hw_status == "FAULTY" or process_status != "OK")
-        # determining the ALARM in case it is PROCESS or HW, and not alarmed before
-        if is_currently_alarmed and self.previous_state[name] == "OK":
-            self.add_to_alarm_log(name, val, f"HW:{hw_status}/PR:{process_status}")
-            self.previous_state[name] = "ALARM"
-        elif not is_currently_alarmed:
-            self.previous_state[name] = "OK"
-
-        # at this point we have two tracks to follow, HW ALARMS, and PROCESS ALARMS
-        # --- TRACK 1: PROCESS LIMITS (Leaky Bucket) ---
-        is_proc_alarm = (val > limit['high'] or val < limit['low'])
-        if is_proc_alarm:
-            self.proc_counters[name] += 1
-        else:
-            # Decrement slowly (minimum 0) - this is the "Leak"
-            if self.proc_counters[name] > 0:
-                self.proc_counters[name] -= 1
-            # If counter drops low enough, allow a new notification later
-            if self.proc_counters[name] == 0:
-                self.proc_notified[name] = False
-
-        # Trigger Process Notification
-        if self.proc_counters[name] >= self.PROC_THRESHOLD and not self.proc_notified[name]:
-            # pop up desktop notification
-            self.send_desktop_notification(name, val, "CRITICAL: Process Limit Exceeded")
-            # send webhook alert
-            self.send_discord_webhook(name, val, "CRITICAL: Process Limit Exceeded")
-            self.proc_notified[name] = True
-
-        # --- TRACK 2: HARDWARE RELIABILITY (Cumulative) ---
-        if hw_status == "FAULTY":
-            self.hw_counters[name] += 1
-        
-        # We DO NOT decrement hw_counters here. It stays high even if it fixes itself.
-        # considering it need to be checked by the engineers
-
-        # Trigger Reliability Notification
-        if self.hw_counters[name] >= self.HW_THRESHOLD and not self.hw_notified[name]:
-            self.send_desktop_notification(name, val, "MAINTENANCE: Low Sensor Reliability")
-            self.send_discord_webhook(name, val, "MAINTENANCE: Low Sensor Reliability")
-            self.hw_notified[name] = True
-            # After notifying, we reset so we can track the next 15 failures
-            self.hw_counters[name] = 0
-
-        row_color = QColor("#27ae60") # Green
-        if hw_status == "FAULTY": row_color = QColor("#f1c40f") # Yellow
-        elif process_status != "OK": row_color = QColor("#c0392b") # Red
-
-        ts = time.strftime("%H:%M:%S", time.localtime(packet['timestamp']))
-        data = [name, str(val), ts, hw_status, process_status]
-        for col, text in enumerate(data):
-            item = QTableWidgetItem(text)
-            item.setBackground(row_color)
-            item.setForeground(QColor("black") if hw_status == "FAULTY" else QColor("white"))
-            self.table.setItem(row, col, item)
-        
-        self.update_system_status()
+            if delta.traces:
+                applied = time.monotonic()
+                for trace in delta.traces:
+                    trace["applied"] = applied
+                self.pending_traces.extend(delta.traces)
+            if not delta.packets: return
+            self.packets_ingested += delta.packets
+
+            # add the new values of the sensors to their real time plots (drawn by the next frame)
+            for name, (values, timestamps, skipped) in delta.samples.items():
+                if name not in self.plot_data:
+                    continue    # removed by a config reload after the batch was processed
+                if skipped:
+                    # the worker dropped samples that could never be drawn anyway
+                    self.plot_data[name].skip(skipped)
+                    self.plot_lod[name].skip(skipped)
+                self.plot_data[name].extend(values, timestamps)
+                self.plot_lod[name].extend(values)
+                self.dirty_plots.add(name)
+
+            # alarm log entries and both notification tracks, in the order they were raised:
+            # TRACK 1 process limits (leaky bucket), TRACK 2 hardware reliability (cumulative)
+            for kind, name, val, detail in delta.events:
+                if kind == EVENT_ALARM:
+                    self.add_to_alarm_log(name, val, detail)
+                else:
+                    # pop up desktop notification and send webhook alert
+                    self.notify_alarm(name, val, detail)
+
+            # keep only the latest state of each row, the next frame paints it
+            rows = delta.rows
+            if not rows.keys() <= self.sensor_to_row.keys():
+                rows = {name: row for name, row in rows.items() if name in self.sensor_to_row}
+            self.row_state.update(rows)
+            self.dirty_rows.update(rows)
+            states = self.sensor_states
+            for name, (_, _, hw_status, process_status) in rows.items():
+                states.update(name, hw_status, process_status)
+            # the label is only repainted when the overall status changes
+            if states.status != self.shown_status:
+                self.status_dirty = True
+        finally:
+            self.pipeline.delta_applied()
+
+    def render_frame(self):
+        """ one render pass: redraw only the plots/rows that changed since the last frame """
+        if not (self.dirty_plots or self.dirty_rows or self.status_dirty):
+            return
+
+        for name in self.dirty_plots:
+            self.curves[name].setData(*self.plot_curve_data(name))
+        self.dirty_plots.clear()
+
+        if self.dirty_rows:
+            self.status_model.update_rows({name: self.row_state[name] for name in self.dirty_rows})
+        self.dirty_rows.clear()
+
+        if self.status_dirty:
+            self.update_system_status()
+            self.status_dirty = False
+
+        # new alarms: reload the visible page once per frame, not once per alarm
+        if self.alarm_model.stale:
+            self.alarm_model.refresh()
+            self.update_alarm_pager()
+        self.frames_rendered += 1
+
+        if self.pending_traces:
+            rendered = time.monotonic()
+            for trace in self.pending_traces:
+                trace["rendered"] = rendered
+                self.latency.record(trace)
+            self.pending_traces.clear()
+
+    def plot_curve_data(self, name):
+        """ (x, y) to draw for one trend: raw samples, or the min/max level matching the pixel width """
+        ring, lod = self.plot_data[name], self.plot_lod[name]
+        first = ring.total - len(ring)  # absolute index of the oldest sample still kept
+        view = self.plots[name].getViewBox()
+        start, stop = first, ring.total
+        if not view.autoRangeEnabled()[0]:
+            # user zoomed/panned: only the visible part of the history
+            x0, x1 = view.viewRange()[0]
+            start, stop = max(first, int(x0)), min(ring.total, int(x1) + 2)
+        if stop <= start:
+            return np.empty(0), np.empty(0)
+
+        pixels = max(1, int(view.width()))
+        if lod.levels == 0 or stop - start <= 2 * pixels:
+            # zero-copy view of the ring buffer, no per-frame list building
+            return np.arange(start, stop, dtype=np.float64), ring.values()[start - first:stop - first]
+        return lod.query(start, stop, lod.choose_level(stop - start, pixels))
+
+    def on_plot_view_changed(self, name):
+        """ a zoom/pan only needs a new detail level when the user controls the x range """
+        if not self.plots[name].getViewBox().autoRangeEnabled()[0]:
+            self.dirty_plots.add(name)
+
+    def report_rates(self):
+        """ show how many packets were ingested vs how many frames were drawn last second """
+        self.statusBar().showMessage(
+            f"Ingest: {self.packets_ingested} packets/s  |  Render: {self.frames_rendered} frames/s "
+            f"(limit {self.render_fps} fps)"
+        )
+        self.packets_ingested, self.frames_rendered = 0, 0
+
+    def refresh_stats(self, force=False):
+        """ copy the rolling statistics of the selected window into the Statistics tab """
+        if not force and self.tabs.currentWidget() is not self.stats_tab:
+            return
+        with self.pipeline.lock:
+            snapshot = self.stream_stats.snapshot(self.stats_window.currentData() or 0)
+        self.stats_model.set_snapshot(snapshot)
 
     def request_restart(self):
         """The Master Reset: Clears Simulator and GUI memory"""
@@ -289,42 +629,109 @@ class SensorDashboard(QMainWindow):
         # CLEAR PLOTS
         for name in self.plot_data:
             self.plot_data[name].clear()
+            self.plot_lod[name].clear()
             self.curves[name].setData([])
-            self.previous_state[name] = "OK"
-        # clear the notification alarms' counters
-        for name in self.limits.keys():
-            self.proc_counters[name] = 0
-            self.hw_counters[name] = 0
-            self.proc_notified[name] = False
-            self.hw_notified[name] = False
+        self.dirty_plots.clear()
+        # drop queued work, clear the previous states and the notification alarms' counters
+        self.pipeline.reset()
         self.update_maintenance_log("--- System Purged: All Reliability Counters Reset ---")
         
+    def check_config(self):
+        """ poll config.json: apply a valid change, log a rejected one (the running config stays in force) """
+        try:
+            change = self.config_watcher.poll()
+        except ConfigError as e:
+            self.update_maintenance_log(f"CONFIG REJECTED: {e}")
+            return
+        if change is not None:
+            self.apply_config(*change)
+
+    def apply_config(self, old, new):
+        """ apply a reloaded config: only the sensors that were added, removed or changed are rebuilt;
+            the kept sensors stay in their rows/plots, new ones are appended """
+        self.config = new
+        stale = other_sections_changed(old, new)
+        if stale:
+            self.update_maintenance_log(f"CONFIG: {', '.join(stale)} changed, applied after a restart")
+        changes = diff_sensors(old, new)
+        if not changes:
+            return
+        removed = set(changes.removed)
+        added = [s['name'] for s in changes.added]
+        by_name = {s['name']: s for s in new['sensors']}
+        self.load_sensors([by_name[name] for name in self.limits if name not in removed] + [by_name[name] for name in added])
+
+        # alarm state, detectors and statistics of the kept sensors carry over
+        self.pipeline.update_sensors(self.limits, self.create_detectors())
+
+        self.status_model.remove_sensors(changes.removed)
+        self.status_model.add_sensors(added)
+        self.stats_model.remove_sensors(changes.removed)
+        self.stats_model.add_sensors(added)
+        for name in changes.removed:
+            self.sensor_states.remove(name)
+            self.remove_plot(name)
+            self.row_state.pop(name, None)
+            self.dirty_rows.discard(name)
+            self.alarm_sensor.removeItem(self.alarm_sensor.findData(name))
+        for name in added:
+            self.sensor_states.add(name)
+            self.add_plot(name)
+            self.alarm_sensor.addItem(name, name)
+        self.layout_plots()
+        self.sensor_to_row = {name: i for i, name in enumerate(self.limits.keys())}
+        self.status_dirty = True
+        self.update_maintenance_log(f"CONFIG RELOADED: {changes}")
+
     def apply_styles(self):
         """ apply the style and colors to the dashboard """
-        self.setStyleSheet("QMainWindow { background-color: #121212; } QTableWidget { background-color: #1e1e1e; color: white; }")
+        self.setStyleSheet("QMainWindow { background-color: #121212; } QTableView { background-color: #1e1e1e; color: white; }")
 
     def clear_alarm_log(self):
-        """ Clear the alarm logs in the dashboard"""
-        self.alarm_table.setRowCount(0)
-        for name in self.limits.keys():
-            self.proc_notified[name] = False
-            self.hw_notified[name] = False
+        """ Clear the alarm logs in the dashboard (the stored history is kept, the session view starts over) """
+        self.alarm_session_start = time.time()
+        self.alarm_range.setCurrentIndex(0)
+        self.apply_alarm_filter()
+        # the worker thread updates the same flags: cleared under the pipeline lock
+        self.pipeline.clear_notified()
         self.update_maintenance_log("Alarm history purged.")
     
     def add_to_alarm_log(self, name, val, alarm_type):
-        """ the main logging function of the alarms """
-        self.alarm_table.insertRow(0)
-        self.alarm_table.setItem(0, 0, QTableWidgetItem(time.strftime("%H:%M:%S")))
-        self.alarm_table.setItem(0, 1, QTableWidgetItem(name))
-        self.alarm_table.setItem(0, 2, QTableWidgetItem(str(val)))
-        self.alarm_table.setItem(0, 3, QTableWidgetItem(alarm_type))
+        """ the main logging function of the alarms (O(1): the view reloads its page on the next frame) """
+        row = self.alarm_store.add(name, val, alarm_type)
+        if self.alarm_type.findData(alarm_type) < 0:
+            self.alarm_type.addItem(alarm_type, alarm_type)
+        self.alarm_model.mark_stale(row)
+
+    def apply_alarm_filter(self, *_):
+        """ show the first page of the alarms matching the range/sensor/type filters """
+        seconds = self.alarm_range.currentData()
+        if seconds is None:
+            since = self.alarm_session_start
+        else:
+            since = time.time() - seconds if seconds else None
+        self.alarm_model.set_filter(self.alarm_sensor.currentData(), self.alarm_type.currentData(), since)
+        self.update_alarm_pager()
+
+    def show_alarm_page(self, page):
+        self.alarm_model.set_page(page)
+        self.update_alarm_pager()
+
+    def update_alarm_pager(self):
+        total = self.alarm_model.total()
+        pages = self.alarm_model.page_count(total)
+        self.alarm_page_label.setText(f"Page {self.alarm_model.page + 1} of {pages} "
+                                      f"({total} alarms)")
+        self.btn_alarm_newer.setEnabled(self.alarm_model.page > 0)
+        self.btn_alarm_older.setEnabled(self.alarm_model.page + 1 < pages)
 
     def take_snapshot(self):
         """ Take snapshot of the current values on the table and log it to the real-time logs"""
         self.update_maintenance_log("--- SNAPSHOT ---")
-        for r in range(self.table.rowCount()):
-            n = self.table.item(r,0).text() if self.table.item(r,0) else "?"
-            v = self.table.item(r,1).text() if self.table.item(r,1) else "?"
+        model = self.status_model
+        for r in range(model.rowCount()):
+            n = model.data(model.index(r, COL_NAME)) or "?"
+            v = model.data(model.index(r, COL_VALUE)) or "?"
             self.update_maintenance_log(f"{n}: {v}")
 
     def export_to_csv(self):
@@ -336,29 +743,47 @@ class SensorDashboard(QMainWindow):
                     writer = csv.writer(f)
                     # Header row
                     writer.writerow(["Timestamp", "Sensor", "Value", "Alarm Type"])
-                    # Table data
-                    for r in range(self.alarm_table.rowCount()):
-                        row_data = [self.alarm_table.item(r, c).text() for c in range(4)]
-                        writer.writerow(row_data)
+                    # every alarm matching the view's filters, streamed from the store (not just this page)
+                    for row in self.alarm_model.iter_filtered():
+                        writer.writerow([format_time(row[TS]), row[SENSOR], row[VALUE], row[TYPE]])
                 self.update_maintenance_log(f"Data successfully exported to {path}")
                 QMessageBox.information(self, "Success", "Alarm log exported successfully.")
             except Exception as e:
                 QMessageBox.critical(self, "Error", f"Failed to export: {e}")
 
 
+    def show_latency_report(self):
+        """ per-stage sensor-to-pixel latency (p50/p99/max of the traced batches) in the maintenance console """
+        self.update_maintenance_log(f"--- LATENCY REPORT ({self.latency.histograms['total'].count} traced batches) ---")
+        for line in self.latency.format_report():
+            self.update_maintenance_log(line)
+
+    def export_latency_report(self):
+        """ Export the per-stage latency histograms' summary into a .csv file """
+        path, _ = QFileDialog.getSaveFileName(self, "Export Latency Report", "", "CSV Files (*.csv)")
+        if path:
+            try:
+                with open(path, 'w', newline='') as f:
+                    writer = csv.writer(f)
+                    writer.writerow(["Stage", "Count", "P50 (ms)", "P99 (ms)", "Max (ms)"])
+                    for stage, count, p50, p99, peak in self.latency.report():
+                        writer.writerow([stage, count, f"{p50 * 1e3:.3f}", f"{p99 * 1e3:.3f}", f"{peak * 1e3:.3f}"])
+                self.update_maintenance_log(f"Latency report exported to {path}")
+                QMessageBox.information(self, "Success", "Latency report exported successfully.")
+            except Exception as e:
+                QMessageBox.critical(self, "Error", f"Failed to export: {e}")
+
     def update_system_status(self):
-        """ Tracing and updating the system status """
-        worst = "OK"
-        for r in range(self.table.rowCount()):
-            hw = self.table.item(r, 3).text() if self.table.item(r,3) else "OK"
-            pr = self.table.item(r, 4).text() if self.table.item(r,4) else "OK"
-            if pr != "OK": worst = "PROCESS"
-            if hw == "FAULTY": worst = "HARDWARE"; break
-
-        if worst == "HARDWARE":
+        """ Tracing and updating the system status (the worst level, kept up to date by the state model) """
+        worst = self.sensor_states.status
+        if worst == self.shown_status:
+            return
+        self.shown_status = worst
+
+        if worst == LEVEL_HARDWARE:
             self.status_label.setText("!!! HARDWARE FAULT (YELLOW) !!!")
             self.status_label.setStyleSheet("background-color: #f1c40f; color: black; font-weight: bold;")
-        elif worst == "PROCESS":
+        elif worst == LEVEL_PROCESS:
             self.status_label.setText("!!! PROCESS ALARM (RED) !!!")
             self.status_label.setStyleSheet("background-color: #c0392b; color: white; font-weight: bold;")
         else:
@@ -384,63 +809,30 @@ class SensorDashboard(QMainWindow):
         
         # Update UI
         self.live_log.appendPlainText(formatted_text)
-        
-        # Write to permanent file (Append mode)
-        try:
-            with open("industrial_monitor.log", "a") as f:
-                f.write(formatted_text + "\n")
-        except:
-            pass # Prevent app crash if file is locked
 
+        # Write to permanent file (queued: the writer thread appends in batches, errors never reach the GUI)
+        self.log_writer.write(formatted_text)
 
-    def send_desktop_notification(self, sensor, value, alarm_type):
-        """Bonus B: Desktop Notification System"""
-        try:
-            # prepare the notification packet
-            notification.notify(
-                title=f"SENSOR ALERT: {sensor.upper()}",
-                message=f"Status: {alarm_type}\nValue: {value}\nAction Required!",
-                app_name="Industrial Monitor",
-                timeout=10 # Notification stays for 10 seconds
-            )
-            self.update_maintenance_log(f"NOTIFICATION SENT: {sensor} ({alarm_type})")
-        except Exception as e:
-            self.update_maintenance_log(f"Notification Error: {e}")
-
-    import requests # You might need to pip install requests
-
-    def send_discord_webhook(self, sensor, value, alarm_type):
-        """Bonus B: Discord Integration (Highly Reliable for Prototypes)"""
-        # the webhook URL from discord channel
-        webhook_url = "https://discordapp.com/api/webhooks/1455988477127557288/y0Q2ypbHXsdn8_OhFSfKCUD9tutYbHQPZjX-B1fEj3jwXlHF0cwpXqjFFOP-wEUH3461"
-        
-        # Use 'embeds' for a professional look with a colored side bar
-        color = 15158332 if "CRITICAL" in alarm_type else 15844367 # Red vs Yellow
-        
-        payload = {
-            "embeds": [{
-                "title": f"🚨 SENSOR ALERT: {sensor.upper()}",
-                "description": f"**Status:** {alarm_type}\n**Current Value:** `{value:.2f}`",
-                "color": color,
-                "footer": {"text": f"Logged at: {time.strftime('%H:%M:%S')}"}
-            }]
-        }
-
-        def post_request():
-            """ send the notification to the channel """
-            try:
-                # Send the data to Discord
-                requests.post(webhook_url, json=payload, timeout=5)
-            except Exception as e:
-                print(f"Discord Webhook Error: {e}")
 
-        # Run in background so the GUI doesn't flicker or freeze
-        threading.Thread(target=post_request, daemon=True).start()
+    def notify_alarm(self, sensor, value, alarm_type):
+        """Bonus B: desktop + Discord notification, queued for the notification dispatcher (never blocks) """
+        self.notifier.notify(sensor, value, alarm_type)
+
+    def on_notification_result(self, channel, alerts, error):
+        """ called from a notification worker: hand the outcome to the GUI thread """
+        sensors = ", ".join(sorted({a.sensor for a in alerts}))
+        if error is None:
+            what = f"{alerts[0].sensor} ({alerts[0].alarm_type})" if len(alerts) == 1 else f"digest of {len(alerts)} alerts: {sensors}"
+            self.notification_log.emit(f"NOTIFICATION SENT [{channel}]: {what}")
+        else:
+            self.notification_log.emit(f"Notification Error [{channel}]: {error} ({len(alerts)} alerts dropped)")
 
     def handle_connection_loss(self):
         """ Notify for connection loss by updating the system dashboard """
         self.status_label.setText("⚠️ SYSTEM OFFLINE - CONNECTION LOST")
         self.status_label.setStyleSheet("background-color: #7f8c8d; color: white; font-weight: bold;")
+        # the next data must repaint the sensor status over the offline banner
+        self.shown_status = None
         self.update_maintenance_log("CRITICAL: No data received for 3 seconds. Check Simulator.")
 
     def request_shutdown(self):
@@ -471,6 +863,23 @@ class SensorDashboard(QMainWindow):
             self.btn_shutdown.setEnabled(False)
             self.btn_restart.setEnabled(False)
 
+            # 5. Stop the worker and persist whatever sample history is still queued
+            self.pipeline.stop()
+            if self.history is not None:
+                self.history.close()
+            self.alarm_store.flush()
+            self.log_writer.flush()
+
+    def closeEvent(self, event):
+        """ stop the worker and flush the sample history and the log before the window goes away """
+        self.pipeline.stop()
+        if self.history is not None:
+            self.history.close()
+        self.alarm_store.close()
+        self.notifier.close()
+        self.log_writer.close()
+        super().closeEvent(event)
+
 
 if __name__ == "__main__":# this 
     app = QApplication(sys.argv)
@@ -0,0 +1,65 @@
+"""Throughput benchmark for the batch alarm engine.
+
+Builds an AlarmEngine for --sensors sensors and evaluates --batches batches of
+--batch packets (random sensors, ~5% over the limits, ~2% FAULTY) with the
+NumPy round path and with the pure-Python path, printing packets evaluated per
+second for each and checking that both raised the same events.
+
+    python benchmarks/alarm_engine_load.py --sensors 10000 --batch 10000 --batches 50
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from GUI.alarm_engine import AlarmEngine
+
+
+def make_batches(args):
+    rng = np.random.default_rng(1)
+    batches = []
+    for _ in range(args.batches):
+        idx = rng.integers(0, args.sensors, args.batch)
+        values = np.where(rng.random(args.batch) < 0.05, rng.uniform(100, 120, args.batch),
+                          rng.uniform(20, 80, args.batch))
+        faulty = rng.random(args.batch) < 0.02
+        batches.append((idx, values, faulty))
+    return batches
+
+
+def run(engine, batches, as_lists):
+    events = 0
+    start = time.perf_counter()
+    for idx, values, faulty in batches:
+        if as_lists:
+            idx, values, faulty = idx.tolist(), values.tolist(), faulty.tolist()
+        events += len(engine.evaluate_columns(idx, values, faulty)[0])
+    return time.perf_counter() - start, events
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sensors", type=int, default=10000)
+    parser.add_argument("--batch", type=int, default=10000)
+    parser.add_argument("--batches", type=int, default=50)
+    args = parser.parse_args()
+
+    limits = {f"s{i}": {"low": 10.0, "high": 90.0} for i in range(args.sensors)}
+    batches = make_batches(args)
+    total = args.batch * args.batches
+    print(f"sensors={args.sensors:,} batch={args.batch:,} batches={args.batches} packets={total:,}")
+    results = {}
+    for label, use_numpy, as_lists in (("numpy", True, False), ("python", False, True)):
+        engine = AlarmEngine(limits, use_numpy=use_numpy)
+        elapsed, events = run(engine, batches, as_lists)
+        results[label] = (events, engine.proc_counters.tolist() if use_numpy else list(engine.proc_counters))
+        print(f"{label:<7} {total / elapsed:>14,.0f} packets/s  ({elapsed:.3f} s, {events:,} events)")
+    print(f"same events and counters: {results['numpy'] == results['python']}")
+
+
+if __name__ == "__main__":
+    main()
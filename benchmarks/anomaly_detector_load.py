@@ -0,0 +1,111 @@
+"""Throughput benchmark for the anomaly detectors.
+
+Feeds --batches batches of --batch samples (random sensors out of --sensors, a
+noisy level with occasional jumps and stuck stretches, one sampling interval
+apart per sensor) through each detector alone, through the whole
+DetectorPipeline and through the AlarmEngine with and without the detectors,
+printing samples per second for each. The rate-of-change and stuck-value codes
+must not depend on how the stream is cut into batches, so the pipeline is run
+a second time with batches --split times smaller and the codes compared.
+
+    python benchmarks/anomaly_detector_load.py --sensors 10000 --batch 10000 --batches 50
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from GUI.alarm_engine import AlarmEngine, PROCESS_STATUS
+from GUI.anomaly_detectors import (DetectorPipeline, RateOfChangeDetector, ZScoreDetector,
+                                   StuckValueDetector, SensorGroups)
+
+
+def make_stream(args):
+    rng = np.random.default_rng(1)
+    total = args.batch * args.batches
+    idx = rng.integers(0, args.sensors, total)
+    values = 50 + rng.normal(0, 2, total)
+    values[rng.random(total) < 0.01] += 25                           # jumps
+    stuck = rng.random(total) < 0.3
+    values[stuck] = np.round(values[stuck] / 10) * 10                 # repeated values
+    # every sensor's samples one interval (1 s) apart, in stream order
+    order = np.argsort(idx, kind='stable')
+    rank = np.empty(total)
+    rank[order] = np.arange(total) - np.searchsorted(idx[order], idx[order])
+    faulty = rng.random(total) < 0.02
+    return idx, values, rank, faulty
+
+
+def make_detectors(n):
+    return {
+        "rate": RateOfChangeDetector([20.0] * n, [1.0] * n, [10.0] * n, [90.0] * n),
+        "stuck": StuckValueDetector(n, samples=5),
+        "zscore": ZScoreDetector([0.5] * n, threshold=6.0, alpha=0.01, warmup=50),
+    }
+
+
+def batches(stream, size):
+    idx, values, timestamps, faulty = stream
+    for k in range(0, len(idx), size):
+        yield idx[k:k + size], values[k:k + size], timestamps[k:k + size], faulty[k:k + size]
+
+
+def time_detector(detector, stream, size):
+    start = time.perf_counter()
+    hits = 0
+    for idx, values, timestamps, _ in batches(stream, size):
+        hits += int(detector.check(SensorGroups(idx, values, timestamps)).sum())
+    return time.perf_counter() - start, hits
+
+
+def run_pipeline(pipeline, stream, size):
+    codes = [pipeline.evaluate(idx, values, timestamps) for idx, values, timestamps, _ in batches(stream, size)]
+    return np.concatenate(codes)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sensors", type=int, default=10000)
+    parser.add_argument("--batch", type=int, default=10000)
+    parser.add_argument("--batches", type=int, default=50)
+    parser.add_argument("--split", type=int, default=7)
+    args = parser.parse_args()
+
+    stream = make_stream(args)
+    total = len(stream[0])
+    print(f"sensors={args.sensors:,} batch={args.batch:,} batches={args.batches} samples={total:,}")
+    for name, detector in make_detectors(args.sensors).items():
+        elapsed, hits = time_detector(detector, stream, args.batch)
+        print(f"{name:<10} {total / elapsed:>14,.0f} samples/s  ({elapsed:.3f} s, {hits:,} flagged)")
+
+    pipeline = DetectorPipeline(make_detectors(args.sensors).values(), PROCESS_STATUS)
+    start = time.perf_counter()
+    codes = run_pipeline(pipeline, stream, args.batch)
+    elapsed = time.perf_counter() - start
+    print(f"{'pipeline':<10} {total / elapsed:>14,.0f} samples/s  ({elapsed:.3f} s, "
+          f"{int((codes != 0).sum()):,} flagged)")
+
+    limits = {f"s{i}": {"low": 10.0, "high": 90.0} for i in range(args.sensors)}
+    for label, detectors in (("engine", None),
+                             ("engine+det", DetectorPipeline(make_detectors(args.sensors).values(), PROCESS_STATUS))):
+        engine = AlarmEngine(limits, detectors=detectors)
+        start = time.perf_counter()
+        events = sum(len(engine.evaluate_columns(idx, values, faulty, timestamps)[0])
+                     for idx, values, timestamps, faulty in batches(stream, args.batch))
+        elapsed = time.perf_counter() - start
+        print(f"{label:<10} {total / elapsed:>14,.0f} samples/s  ({elapsed:.3f} s, {events:,} events)")
+
+    # rate of change and stuck values only depend on each sensor's previous sample
+    sequential = lambda: DetectorPipeline([d for k, d in make_detectors(args.sensors).items() if k != "zscore"],
+                                          PROCESS_STATUS)
+    coarse = run_pipeline(sequential(), stream, args.batch)
+    fine = run_pipeline(sequential(), stream, max(1, args.batch // args.split))
+    print(f"same codes with {args.split}x smaller batches: {bool((coarse == fine).all())}")
+
+
+if __name__ == "__main__":
+    main()
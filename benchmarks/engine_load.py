@@ -0,0 +1,92 @@
+"""Load benchmark for the single-loop simulation engine.
+
+Clones the configured sensors until --sensors instances exist, runs them from
+one AsyncSimulationEngine for --seconds and compares what was emitted with what
+the configured intervals promise (drift), plus worst lateness and CPU used.
+
+    python benchmarks/engine_load.py --sensors 10000 --interval 0.5 --seconds 10
+"""
+import argparse
+import json
+import os
+import queue
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from sensors_simulator.sensors_simulator import SensorsSimulator, REPLICA_ID_STRIDE
+from sensors_simulator.async_engine import AsyncSimulationEngine
+
+
+def build_sensors(config, count, interval):
+    base = config['sensors']
+    sensors = []
+    for k in range(-(-count // len(base))):
+        for s_conf in base:
+            if len(sensors) == count:
+                return sensors
+            sensors.append(SensorsSimulator(
+                sensor_id=s_conf['id'] + k * REPLICA_ID_STRIDE,
+                name=f"{s_conf['name']}_{k}",
+                interval=interval or s_conf['interval'],
+                source=s_conf['name']
+            ))
+    return sensors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sensors", type=int, default=10000)
+    parser.add_argument("--interval", type=float, default=0.0, help="override every interval (0 = config values)")
+    parser.add_argument("--seconds", type=float, default=10.0)
+    args = parser.parse_args()
+
+    os.chdir(ROOT)   # data files are resolved relative to the project root
+    with open('config.json') as f:
+        config = json.load(f)
+    sensors = build_sensors(config, args.sensors, args.interval)
+
+    out_queue = queue.Queue()
+    running, reset = threading.Event(), threading.Event()
+    running.set()
+    engine = AsyncSimulationEngine(sensors, out_queue, running, reset)
+
+    consumed = [0]
+
+    def consume():
+        while running.is_set() or not out_queue.empty():
+            try:
+                out_queue.get(timeout=0.1)
+                consumed[0] += 1
+            except queue.Empty:
+                pass
+
+    consumer = threading.Thread(target=consume, daemon=True)
+    consumer.start()
+    cpu_start = time.process_time()
+    thread = threading.Thread(target=engine.run_forever, daemon=True)
+    start = time.monotonic()
+    thread.start()
+    time.sleep(args.seconds)
+    running.clear()
+    stopped = time.monotonic()
+    thread.join()
+    elapsed = stopped - start
+    cpu = time.process_time() - cpu_start
+    consumer.join()
+
+    # a drift-free schedule emits floor(run time / interval) + 1 packets per sensor
+    run_time = stopped - engine.started_at
+    expected = sum(int(run_time / s.interval) + 1 for s in engine.sensors)
+    print(f"sensors={len(engine.sensors)} seconds={elapsed:.2f}")
+    print(f"emitted      {engine.packets_emitted:>10,}  ({engine.packets_emitted / elapsed:,.0f} pkt/s)")
+    print(f"expected     {expected:>10,}  (difference {engine.packets_emitted - expected:+,})")
+    print(f"max lateness {engine.max_lateness * 1000:>10.2f} ms")
+    print(f"cpu          {cpu:>10.2f} s  ({100 * cpu / elapsed:.0f}% of one core, consumer thread included)")
+
+
+if __name__ == "__main__":
+    main()
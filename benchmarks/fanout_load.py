@@ -0,0 +1,168 @@
+"""Load benchmark for the simulator's fan-out server.
+
+Starts a BroadcastServer on a free local port, connects many dashboards (plus a
+few that never read, to play the slow client), publishes synthetic batches at a
+fixed rate and reports what every client actually received. The healthy clients
+should get everything while the stalled ones are dropped or downsampled.
+
+    python benchmarks/fanout_load.py --clients 50 --rate 50000 --protocol binary
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import selectors
+import socket
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from common import wire_protocol
+from sensors_simulator.broadcast_server import BroadcastServer
+
+
+def make_batch(size, sensors=500):
+    now = time.time()
+    return [
+        {"id": 1000 + i % sensors, "sensor": f"s{i % sensors}", "value": float(i), "timestamp": now, "status": "OK"}
+        for i in range(size)
+    ]
+
+
+class PacketCounter:
+    """Counts packets in a stream without building dicts (keeps the client side cheap)"""
+
+    def __init__(self):
+        self.binary = False
+        self.buffer = b""
+
+    def feed(self, data):
+        self.buffer += data
+        count = 0
+        if not self.binary:
+            end = self.buffer.rfind(b"\n")
+            if end < 0:
+                return 0
+            lines = self.buffer[:end].split(b"\n")
+            for i, line in enumerate(lines):
+                if line.startswith(wire_protocol.CONTROL_PREFIX):
+                    # the hello reply: whatever follows it is binary frames
+                    self.binary = json.loads(line)["protocol"] == wire_protocol.PROTOCOL_BINARY
+                    self.buffer = self.buffer[sum(len(l) + 1 for l in lines[:i + 1]):]
+                    return count + self.feed(b"")
+                count += 1
+            self.buffer = self.buffer[end + 1:]
+            return count
+        offset = 0
+        while len(self.buffer) - offset >= wire_protocol.FRAME_HEADER.size:
+            _, frame_type, length = wire_protocol.FRAME_HEADER.unpack_from(self.buffer, offset)
+            if len(self.buffer) - offset - wire_protocol.FRAME_HEADER.size < length:
+                break
+            if frame_type == wire_protocol.FRAME_RECORDS:
+                count += length // wire_protocol.RECORD.size
+            offset += wire_protocol.FRAME_HEADER.size + length
+        self.buffer = self.buffer[offset:]
+        return count
+
+
+def run_readers(socks, decoders, counts, stop):
+    """One selector thread drains every well-behaved client"""
+    sel = selectors.DefaultSelector()
+    for i, s in enumerate(socks):
+        s.setblocking(False)
+        sel.register(s, selectors.EVENT_READ, i)
+    while not stop.is_set():
+        for key, _ in sel.select(timeout=0.2):
+            try:
+                data = key.fileobj.recv(1 << 20)
+            except BlockingIOError:
+                continue
+            except OSError:
+                data = b""
+            if not data:
+                sel.unregister(key.fileobj)
+                continue
+            counts[key.data] += decoders[key.data].feed(data)
+    sel.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--stalled", type=int, default=2, help="clients that connect but never read")
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--rate", type=int, default=50000, help="packets per second published")
+    parser.add_argument("--batch", type=int, default=256)
+    parser.add_argument("--protocol", choices=wire_protocol.SUPPORTED_PROTOCOLS, default=wire_protocol.PROTOCOL_BINARY)
+    parser.add_argument("--policy", choices=("drop", "downsample"), default="drop")
+    parser.add_argument("--client-buffer", type=int, default=1 << 20)
+    args = parser.parse_args()
+
+    server_log = io.StringIO()
+    with contextlib.redirect_stdout(server_log):
+        run(args, server_log)
+
+
+def run(args, server_log):
+    server = BroadcastServer("127.0.0.1", 0, client_buffer=args.client_buffer,
+                             slow_client_policy=args.policy, max_clients=args.clients + args.stalled)
+    server.on_command = lambda line, session: session.negotiate(
+        json.loads(line)["params"]["protocols"], {})
+    port = server.start()
+
+    hello = (json.dumps({"action": "hello", "params": {"protocols": [args.protocol]}}) + "\n").encode()
+    readers, stalled = [], []
+    for i in range(args.clients + args.stalled):
+        s = socket.create_connection(("127.0.0.1", port))
+        s.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 64 * 1024)
+        if args.protocol != wire_protocol.PROTOCOL_JSON:
+            s.sendall(hello)
+        (readers if i < args.clients else stalled).append(s)
+    while len(server.clients) < len(readers) + len(stalled):
+        time.sleep(0.01)
+    time.sleep(0.2)   # let every hello be answered before data starts flowing
+
+    decoders = [PacketCounter() for _ in readers]
+    counts = [0] * len(readers)
+    stop = threading.Event()
+    reader_thread = threading.Thread(target=run_readers, args=(readers, decoders, counts, stop), daemon=True)
+    reader_thread.start()
+
+    batch = make_batch(args.batch)
+    published = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < args.seconds:
+        # pace the publisher at --rate packets per second
+        due = (time.perf_counter() - start) * args.rate
+        if published < due:
+            server.publish(batch)
+            published += len(batch)
+        else:
+            time.sleep(len(batch) / args.rate / 4)
+    elapsed = time.perf_counter() - start
+    time.sleep(0.5)
+    stop.set()
+    reader_thread.join()
+
+    delivered = sum(counts)
+    downsampled = sum(session.dropped_batches for session in server.clients.values())
+    out = sys.__stdout__
+    print(f"clients={args.clients} stalled={args.stalled} protocol={args.protocol} policy={args.policy} "
+          f"rate={args.rate:,}/s batch={args.batch} seconds={elapsed:.2f}", file=out)
+    print(f"published      {published:>12,} packets  ({published / elapsed:,.0f} pkt/s)", file=out)
+    print(f"delivered      {delivered:>12,} packets  ({delivered / elapsed:,.0f} pkt/s summed over clients)", file=out)
+    print(f"per client     min {min(counts):,}  max {max(counts):,}  "
+          f"complete {sum(c == published for c in counts)}/{len(counts)}", file=out)
+    print(f"slow clients   dropped {server.dropped_clients}  batches discarded by downsampling {downsampled}", file=out)
+    print(f"server log     {server_log.getvalue().count(chr(10))} lines", file=out)
+
+    server.stop()
+    for s in readers + stalled:
+        s.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""End-to-end load benchmark driven by the synthetic signal generator.
+
+Creates --sensors generator-backed sensors at --rate samples/s each, runs the
+real transmitter (queue drain + batching + fan-out server on a free port) and
+one binary dashboard connection, then compares generated, transmitted and
+received packet counts and the CPU the simulator side used.
+
+    python benchmarks/generator_load.py --sensors 50 --rate 1000 --seconds 5
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import socket
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from common import wire_protocol
+from fanout_load import PacketCounter
+import sensors_simulator.sensors_simulator as simulator
+from sensors_simulator.sensors_simulator import SensorsSimulator
+from sensors_simulator.signal_generator import SignalGenerator, GeneratorEngine, default_waveform
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sensors", type=int, default=50)
+    parser.add_argument("--rate", type=float, default=1000.0, help="samples per second per sensor")
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--tick", type=float, default=0.02)
+    parser.add_argument("--batch", type=int, default=256)
+    parser.add_argument("--flush", type=float, default=0.02)
+    args = parser.parse_args()
+
+    server_log = io.StringIO()
+    with contextlib.redirect_stdout(server_log):
+        run(args)
+
+
+def run(args):
+    out = sys.__stdout__
+    simulator.HOST, simulator.PORT = "127.0.0.1", 0      # tcp_transmitter reads the module globals
+    SensorsSimulator.batch_size, SensorsSimulator.flush_interval = args.batch, args.flush
+    SensorsSimulator.running_evt.set()
+
+    sensors = []
+    for i in range(args.sensors):
+        s = SensorsSimulator(10000 + i, f"gen_{i}", 1 / args.rate)
+        s.generator = SignalGenerator(default_waveform(0.0, 100.0), args.rate, seed=i)
+        sensors.append(s)
+
+    threading.Thread(target=SensorsSimulator.tcp_transmitter, daemon=True).start()
+    while SensorsSimulator.server is None:
+        time.sleep(0.01)
+    client = socket.create_connection(("127.0.0.1", SensorsSimulator.server.port))
+    hello = {"action": "hello", "params": {"protocols": [wire_protocol.PROTOCOL_BINARY]}}
+    client.sendall((json.dumps(hello) + "\n").encode())
+    time.sleep(0.2)
+
+    counter, received = PacketCounter(), [0]
+    stop = threading.Event()
+
+    def read():
+        client.settimeout(0.2)
+        while not stop.is_set():
+            try:
+                data = client.recv(1 << 20)
+            except socket.timeout:
+                continue
+            if not data:
+                break
+            received[0] += counter.feed(data)
+
+    reader = threading.Thread(target=read, daemon=True)
+    reader.start()
+
+    # own run flag: the transmitter keeps draining after the generators stop
+    generating = threading.Event()
+    generating.set()
+    engine = GeneratorEngine(sensors, SensorsSimulator.data_queue, generating,
+                             SensorsSimulator.reset_evt, tick=args.tick)
+    cpu_start = time.process_time()
+    thread = threading.Thread(target=engine.run_forever, daemon=True)
+    start = time.monotonic()
+    thread.start()
+    time.sleep(args.seconds)
+    generating.clear()
+    stopped = time.monotonic()
+    thread.join()
+    elapsed = stopped - start
+    time.sleep(1.0)     # let the transmitter and the socket drain
+    cpu = time.process_time() - cpu_start
+    stop.set()
+    reader.join()
+    SensorsSimulator.running_evt.clear()
+
+    # sample k is due at started_at + k / rate; the last tick may be up to one tick short of this
+    expected = args.sensors * (int((stopped - engine.started_at) * args.rate) + 1)
+    print(f"sensors={args.sensors} rate={args.rate:,.0f} Hz each tick={args.tick}s seconds={elapsed:.2f}", file=out)
+    print(f"generated {engine.packets_emitted:>12,}  ({engine.packets_emitted / elapsed:,.0f} pkt/s, "
+          f"{expected:,} due)", file=out)
+    print(f"received  {received[0]:>12,}  (binary dashboard connection)", file=out)
+    print(f"backlog   {SensorsSimulator.data_queue.qsize():>12,}  (left in the transmitter queue)", file=out)
+    print(f"cpu       {cpu:>12.2f} s  ({100 * cpu / elapsed:.0f}% of one core, all threads)", file=out)
+    client.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Replay benchmark for SensorDashboard.process_batch.
+
+Loads recorded data (sensors_data/*.txt and/or timestamp,sensor,value,status
+CSV files), then replays it straight into an offscreen dashboard at each speed
+multiplier, letting Qt run its render timers between batches. For every speed
+it prints the rate the dashboard kept up with and whether (and when) it fell
+more than --lag seconds behind the recording's timeline.
+
+    python benchmarks/replay_dashboard.py --speeds 1,10,100,max --seconds 5 --loop
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import threading
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtWidgets import QApplication
+
+from GUI.user_interface import SensorDashboard
+from sensors_simulator.replay_source import ReplaySource, load_recording, merge_recordings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", nargs="*", help="recordings (default: sensors_data/*_data.txt)")
+    parser.add_argument("--speeds", default="1,10,100,max")
+    parser.add_argument("--seconds", type=float, default=5.0, help="time limit per speed")
+    parser.add_argument("--lag", type=float, default=1.0, help="seconds behind schedule that count as falling behind")
+    parser.add_argument("--loop", action="store_true", help="restart the recording when it runs out")
+    args = parser.parse_args()
+
+    os.chdir(ROOT)   # config.json and data files are resolved relative to the project root
+    with open('config.json') as f:
+        config = json.load(f)
+    intervals = {s['name']: s['interval'] for s in config['sensors']}
+    ids = {s['name']: s['id'] for s in config['sensors']}
+    files = args.files or sorted(glob.glob("sensors_data/*_data.txt"))
+    records = merge_recordings([load_recording(path, intervals) for path in files])
+
+    app = QApplication.instance() or QApplication([])
+    gui = SensorDashboard()
+    gui.receiver.stop()
+    gui.receiver.wait()
+    # a replayed incident must not page anyone
+    gui.notify_alarm = lambda *a, **k: None
+
+    def sink(batch):
+        gui.process_batch(batch)
+        app.processEvents()     # lets the render/rate timers run like in the real event loop
+
+    print(f"{len(records):,} recorded samples from {len(files)} file(s)")
+    for speed in args.speeds.split(","):
+        running = threading.Event()
+        running.set()
+        timer = threading.Timer(args.seconds, running.clear)
+        source = ReplaySource(records, sink, ids=ids, speed=None if speed == "max" else float(speed),
+                              running_evt=running, lag_tolerance=args.lag, loop=args.loop)
+        timer.start()
+        r = source.run()
+        timer.cancel()
+        behind = f"after {r['fell_behind_after_s']:.1f}s at {r['fell_behind_rate']:,.0f}/s" if r['fell_behind'] else "no"
+        print(f"x{r['speed']:<6} emitted={r['emitted']:>9,} mean={r['mean_rate']:>10,.0f}/s "
+              f"max_sustained={r['max_sustained_rate']:>10,.0f}/s max_lag={r['max_lag_s']:.3f}s fell_behind={behind}")
+
+    if gui.history is not None:
+        gui.history.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""Live reload of config.json, shared by the dashboard and the simulator.
+
+ConfigWatcher polls the file's modification time, size and inode (one stat()
+per poll, no platform-specific notification API). When they change, the file is
+parsed and validated: a valid file becomes the current config, an invalid one
+(half written, bad JSON, a sensor with min >= max, ...) is reported once as a
+ConfigError and the previous config stays in force until the file changes again.
+
+diff_sensors() compares two configs by sensor name, so each process only
+rebuilds the sensors that were added, removed or changed.
+"""
+import json
+import numbers
+import os
+import time
+
+
+class ConfigError(ValueError):
+    """config.json can't be read or fails validation"""
+
+
+def load_config(path):
+    """Parse and validate a config file"""
+    try:
+        with open(path, 'r') as f:
+            config = json.load(f)
+    except OSError as e:
+        raise ConfigError(f"cannot read {path}: {e}") from e
+    except json.JSONDecodeError as e:
+        raise ConfigError(f"{path} is not valid JSON: {e}") from e
+    validate_config(config)
+    return config
+
+
+def _number(value):
+    return isinstance(value, numbers.Real) and not isinstance(value, bool)
+
+
+def validate_config(config):
+    """Raise ConfigError if the sensor list can't be applied"""
+    if not isinstance(config, dict):
+        raise ConfigError("top level must be an object")
+    sensors = config.get('sensors')
+    if not isinstance(sensors, list) or not sensors:
+        raise ConfigError("'sensors' must be a non-empty list")
+    ids, names = set(), set()
+    for i, s in enumerate(sensors):
+        if not isinstance(s, dict):
+            raise ConfigError(f"sensor #{i} must be an object")
+        for key in ('id', 'name', 'min', 'max', 'interval'):
+            if key not in s:
+                raise ConfigError(f"sensor #{i}: missing '{key}'")
+        name = s['name']
+        if not isinstance(name, str) or not name:
+            raise ConfigError(f"sensor #{i}: 'name' must be a non-empty string")
+        if not isinstance(s['id'], int) or isinstance(s['id'], bool):
+            raise ConfigError(f"sensor '{name}': 'id' must be an integer")
+        if name in names or s['id'] in ids:
+            raise ConfigError(f"sensor '{name}': duplicate name or id {s['id']}")
+        names.add(name)
+        ids.add(s['id'])
+        for key in ('min', 'max', 'interval'):
+            if not _number(s[key]):
+                raise ConfigError(f"sensor '{name}': '{key}' must be a number")
+        if s['min'] >= s['max']:
+            raise ConfigError(f"sensor '{name}': 'min' must be below 'max'")
+        if s['interval'] <= 0:
+            raise ConfigError(f"sensor '{name}': 'interval' must be positive")
+        if 'max_rate' in s and not (_number(s['max_rate']) and s['max_rate'] > 0):
+            raise ConfigError(f"sensor '{name}': 'max_rate' must be a positive number")
+
+
+class SensorChanges:
+    """What changed in the sensor list: added/changed sensor entries (new config) and removed names"""
+
+    def __init__(self, added, removed, changed):
+        self.added = added
+        self.removed = removed
+        self.changed = changed
+
+    def __bool__(self):
+        return bool(self.added or self.removed or self.changed)
+
+    def __str__(self):
+        parts = [f"+{s['name']}" for s in self.added] + [f"-{name}" for name in self.removed]
+        parts += [f"~{s['name']}" for s in self.changed]
+        return " ".join(parts) or "no sensor changes"
+
+
+def diff_sensors(old, new):
+    old_by_name = {s['name']: s for s in old['sensors']}
+    new_by_name = {s['name']: s for s in new['sensors']}
+    return SensorChanges(
+        added=[s for name, s in new_by_name.items() if name not in old_by_name],
+        removed=[name for name in old_by_name if name not in new_by_name],
+        changed=[s for name, s in new_by_name.items() if name in old_by_name and s != old_by_name[name]],
+    )
+
+
+def other_sections_changed(old, new):
+    """Top-level sections besides 'sensors' that differ (those still need a restart)"""
+    keys = (set(old) | set(new)) - {'sensors'}
+    return sorted(k for k in keys if old.get(k) != new.get(k))
+
+
+class ConfigWatcher:
+    """Polls a config file and hands out (old, new) whenever a valid new version appears"""
+
+    def __init__(self, path, config=None):
+        self.path = path
+        self._stamp = self._stat()
+        self.config = config if config is not None else load_config(path)
+
+    def _stat(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size, st.st_ino
+
+    def poll(self):
+        """(old, new) if the file changed into a valid config, None if it didn't change.
+
+        Raises ConfigError (once per change of the file) if the new version is invalid.
+        """
+        stamp = self._stat()
+        if stamp == self._stamp:
+            return None
+        self._stamp = stamp
+        if stamp is None:
+            raise ConfigError(f"{self.path} was removed, keeping the current config")
+        new = load_config(self.path)
+        old, self.config = self.config, new
+        return old, new
+
+    def run(self, on_change, on_error, running_evt, interval=1.0):
+        """Thread target: poll every 'interval' seconds while running_evt is set"""
+        while running_evt.is_set():
+            try:
+                change = self.poll()
+                if change is not None:
+                    on_change(*change)
+            except ConfigError as e:
+                on_error(e)
+            time.sleep(interval)
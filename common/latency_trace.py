@@ -0,0 +1,112 @@
+"""Sensor-to-pixel latency tracing, shared by the simulator and the dashboard.
+
+The simulator traces at most trace_rate batches per second: right before such
+a batch it sends a JSON control {"type": "trace", ...} holding the monotonic
+times the batch's first packet was enqueued (derived from its wall-clock
+timestamp), dequeued by the transmitter and published to the fan-out server.
+The dashboard adds its own stamps as the batch moves on: received from the
+socket, parsed, picked up and finished by the processing worker, applied on
+the GUI thread and drawn by a render frame. Both processes read the same
+time.monotonic() clock, so the cross-process stage is only meaningful with the
+simulator and the dashboard on one host.
+
+LatencyTracker turns complete traces into one histogram per stage (and one for
+the whole path) with p50/p99/max.
+"""
+import math
+import time
+
+TRACE = "trace"
+
+# stamps in pipeline order
+STAMPS = ("enqueued", "dequeued", "published", "received", "parsed",
+          "process_start", "process_end", "applied", "rendered")
+
+# stage -> (from stamp, to stamp)
+STAGES = (
+    ("queue", "enqueued", "dequeued"),              # simulator transmit queue
+    ("batching", "dequeued", "published"),          # flush window / batch assembly
+    ("network", "published", "received"),           # fan-out loop, socket send, TCP, recv
+    ("parse", "received", "parsed"),                # wire protocol decoding
+    ("handoff", "parsed", "process_start"),         # processing worker inbox
+    ("process", "process_start", "process_end"),    # persistence, alarms, statistics
+    ("deliver", "process_end", "applied"),          # pending delta until the GUI thread takes it
+    ("render", "applied", "rendered"),              # until the next frame draws it
+    ("total", "enqueued", "rendered"),
+)
+
+
+def make_trace(packet, dequeued, published):
+    """Trace control for a batch whose first packet is 'packet' (simulator side)"""
+    # the packet only carries its wall-clock creation time: move it onto the monotonic clock
+    enqueued = published - (time.time() - packet['timestamp'])
+    return {"type": TRACE, "enqueued": enqueued, "dequeued": dequeued, "published": published}
+
+
+class LatencyHistogram:
+    """Log-spaced latency histogram (BINS_PER_DECADE bins per decade from 1 us to 1000 s)"""
+    BINS_PER_DECADE = 20
+    MIN_SECONDS = 1e-6
+    DECADES = 9
+
+    def __init__(self):
+        self.counts = [0] * (self.BINS_PER_DECADE * self.DECADES + 1)
+        self.count = 0
+        self.max = 0.0
+
+    def add(self, seconds):
+        seconds = max(seconds, 0.0)
+        if seconds <= self.MIN_SECONDS:
+            k = 0
+        else:
+            k = min(len(self.counts) - 1,
+                    1 + int(math.log10(seconds / self.MIN_SECONDS) * self.BINS_PER_DECADE))
+        self.counts[k] += 1
+        self.count += 1
+        self.max = max(self.max, seconds)
+
+    def quantile(self, q):
+        """Upper edge of the bin holding the q-quantile (never above the largest value seen)"""
+        if not self.count:
+            return float('nan')
+        rank = q * self.count
+        seen = 0
+        for k, c in enumerate(self.counts):
+            seen += c
+            if seen >= rank and c:
+                return min(self.MIN_SECONDS * 10 ** (k / self.BINS_PER_DECADE), self.max)
+        return self.max
+
+
+class LatencyTracker:
+    """Per-stage latency histograms fed with complete traces"""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.histograms = {stage: LatencyHistogram() for stage, _, _ in STAGES}
+        self.incomplete = 0
+
+    def record(self, trace):
+        """Add one trace; a trace missing a stamp only feeds the stages it has both ends of"""
+        complete = True
+        for stage, start, end in STAGES:
+            if start in trace and end in trace:
+                self.histograms[stage].add(trace[end] - trace[start])
+            else:
+                complete = False
+        if not complete:
+            self.incomplete += 1
+
+    def report(self):
+        """[(stage, count, p50, p99, max)] in seconds, in pipeline order"""
+        return [(stage, h.count, h.quantile(0.5), h.quantile(0.99), h.max)
+                for stage, h in self.histograms.items()]
+
+    def format_report(self):
+        """Report lines for the maintenance console (milliseconds)"""
+        lines = [f"{'stage':<9} {'count':>7} {'p50 ms':>9} {'p99 ms':>9} {'max ms':>9}"]
+        for stage, count, p50, p99, peak in self.report():
+            lines.append(f"{stage:<9} {count:>7} {p50 * 1e3:>9.3f} {p99 * 1e3:>9.3f} {peak * 1e3:>9.3f}")
+        return lines
@@ -0,0 +1,216 @@
+"""Wire formats shared by the simulator (server) and the dashboard (client).
+
+Every connection starts in newline-delimited JSON. A client that understands
+the binary framing asks for it with a 'hello' command; the server answers with
+a 'hello' control message (still in JSON) and every byte after that answer is
+binary frames. Clients that never say hello simply keep getting JSON.
+
+A hello carrying a 'resume' parameter also opts into sequence numbers: every
+packet is numbered within the server's stream (a "seq" field in JSON, a first
+sequence number per binary frame). On reconnect the client passes its last
+sequence number back and the server replays what it missed; whatever can no
+longer be replayed is reported by the decoder as a 'gap' control message.
+"""
+import json
+import struct
+
+PROTOCOL_JSON = "json"
+PROTOCOL_BINARY = "binary"
+SUPPORTED_PROTOCOLS = (PROTOCOL_BINARY, PROTOCOL_JSON)
+
+# Frame = header + payload. The header carries the frame type and payload length
+FRAME_MAGIC = b"SP"
+FRAME_HEADER = struct.Struct("<2sBI")       # magic, frame type, payload length (bytes)
+FRAME_RECORDS = 1                           # payload: packed RECORDs
+FRAME_CONTROL = 2                           # payload: one UTF-8 JSON control message
+FRAME_SEQ_RECORDS = 3                       # payload: SEQ_HEADER + packed RECORDs
+SEQ_HEADER = struct.Struct("<Q")            # sequence number of the frame's first record
+
+# Fixed-width sample: sensor id, value, timestamp, status code (21 bytes, no padding)
+RECORD = struct.Struct("<IddB")
+
+STATUS_NAMES = ("OK", "FAULTY")
+STATUS_CODES = {name: code for code, name in enumerate(STATUS_NAMES)}
+
+# Control messages always carry "type" as their first key, data packets never do
+CONTROL_PREFIX = b'{"type"'
+
+
+class ProtocolError(Exception):
+    """Raised when the byte stream can't be framed (lost sync, wrong peer...)"""
+
+
+def choose_protocol(offered):
+    """Pick the first protocol from the client's preference list that we speak"""
+    for protocol in offered or ():
+        if protocol in SUPPORTED_PROTOCOLS:
+            return protocol
+    return PROTOCOL_JSON
+
+
+def encode_batch(batch, protocol, first_seq=None):
+    """Encode a list of packet dicts for the wire in the given protocol (numbered from first_seq if given)"""
+    if protocol == PROTOCOL_BINARY:
+        payload = b"".join([
+            RECORD.pack(p["id"], p["value"], p["timestamp"], STATUS_CODES.get(p["status"], 1))
+            for p in batch
+        ])
+        if first_seq is not None:
+            payload = SEQ_HEADER.pack(first_seq) + payload
+            return FRAME_HEADER.pack(FRAME_MAGIC, FRAME_SEQ_RECORDS, len(payload)) + payload
+        return FRAME_HEADER.pack(FRAME_MAGIC, FRAME_RECORDS, len(payload)) + payload
+    if first_seq is not None:
+        return "".join(json.dumps({**p, "seq": first_seq + k}) + "\n" for k, p in enumerate(batch)).encode('utf-8')
+    return "".join(json.dumps(p) + "\n" for p in batch).encode('utf-8')
+
+
+def encode_control(message, protocol):
+    """Encode a control message (a dict with a leading 'type' key)"""
+    body = json.dumps(message)
+    if protocol == PROTOCOL_BINARY:
+        payload = body.encode('utf-8')
+        return FRAME_HEADER.pack(FRAME_MAGIC, FRAME_CONTROL, len(payload)) + payload
+    return (body + "\n").encode('utf-8')
+
+
+def decode_json_lines(lines):
+    """Decode a batch of newline-delimited JSON packets with a single json.loads call"""
+    lines = [line for line in lines if line.strip()]
+    if not lines:
+        return []
+    try:
+        return json.loads(b"[" + b",".join(lines) + b"]")
+    except json.JSONDecodeError:
+        # one bad line spoils the bulk parse, fall back to line by line and skip the noise
+        batch = []
+        for line in lines:
+            try:
+                batch.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+        return batch
+
+
+def decode_records(payload, sensor_names):
+    """Unpack a whole records frame at once into packet dicts"""
+    return [
+        {"id": sensor_id, "sensor": sensor_names.get(sensor_id, str(sensor_id)), "value": value,
+         "timestamp": timestamp, "status": STATUS_NAMES[status] if status < len(STATUS_NAMES) else "FAULTY"}
+        for sensor_id, value, timestamp, status in RECORD.iter_unpack(payload)
+    ]
+
+
+class StreamDecoder:
+    """Incremental client-side decoder that follows the protocol switch mid-stream"""
+
+    def __init__(self):
+        self.protocol = PROTOCOL_JSON
+        self.sensor_names = {}
+        self._buffer = b""
+        # sequence tracking, kept across reconnects: it is the resume point
+        self.stream = None      # server stream id from the hello reply
+        self.last_seq = None    # sequence number of the last packet received
+        self._discard = False   # resuming: packets before the hello reply will be replayed
+
+    def reconnect(self):
+        """Start a new connection: back to JSON, and if resuming drop packets until the hello reply"""
+        self.protocol = PROTOCOL_JSON
+        self._buffer = b""
+        self._discard = self.stream is not None
+
+    def resume_point(self):
+        """'resume' parameter for the hello command ({} before the first hello reply)"""
+        if self.stream is None:
+            return {}
+        return {"stream": self.stream, "seq": self.last_seq}
+
+    def feed(self, data):
+        """Add received bytes, return (packets, control_messages) fully decoded so far"""
+        self._buffer += data
+        packets, controls = [], []
+        while True:
+            if self.protocol == PROTOCOL_BINARY:
+                self._feed_frames(packets, controls)
+                break
+            control = self._feed_lines(packets, controls)
+            if control is None:
+                break
+            controls.append(control)
+            self._apply_control(control)
+        return packets, controls
+
+    def _feed_lines(self, packets, controls):
+        """Decode complete JSON lines up to (and including) the first control line"""
+        end = self._buffer.rfind(b"\n")
+        if end < 0:
+            return None
+        lines = self._buffer[:end].split(b"\n")
+        for i, line in enumerate(lines):
+            if line.startswith(CONTROL_PREFIX):
+                self._take_json(decode_json_lines(lines[:i]), packets, controls)
+                consumed = sum(len(l) + 1 for l in lines[:i + 1])
+                self._buffer = self._buffer[consumed:]
+                try:
+                    return json.loads(line)
+                except json.JSONDecodeError:
+                    return {"type": "invalid"}
+        self._take_json(decode_json_lines(lines), packets, controls)
+        self._buffer = self._buffer[end + 1:]
+        return None
+
+    def _take_json(self, decoded, packets, controls):
+        if self._discard:
+            return
+        if decoded and self.stream is not None:
+            first, last = decoded[0].get("seq"), decoded[-1].get("seq")
+            if first is not None and last is not None and last - first == len(decoded) - 1:
+                self._track(first, last, controls)      # contiguous, the usual case
+            else:
+                for packet in decoded:
+                    if packet.get("seq") is not None:
+                        self._track(packet["seq"], packet["seq"], controls)
+        packets.extend(decoded)
+
+    def _track(self, first, last, controls):
+        """Advance the resume point, reporting any sequence numbers skipped on the way"""
+        if self.last_seq is not None and first > self.last_seq + 1:
+            controls.append({"type": "gap", "first": self.last_seq + 1, "last": first - 1})
+        self.last_seq = last
+
+    def _feed_frames(self, packets, controls):
+        """Decode every complete binary frame in the buffer"""
+        view, offset = memoryview(self._buffer), 0
+        while len(view) - offset >= FRAME_HEADER.size:
+            magic, frame_type, length = FRAME_HEADER.unpack_from(view, offset)
+            if magic != FRAME_MAGIC:
+                raise ProtocolError(f"bad frame magic {bytes(magic)!r}")
+            start = offset + FRAME_HEADER.size
+            if len(view) - start < length:
+                break
+            payload = view[start:start + length]
+            if frame_type == FRAME_RECORDS:
+                packets.extend(decode_records(payload, self.sensor_names))
+            elif frame_type == FRAME_SEQ_RECORDS:
+                first = SEQ_HEADER.unpack_from(payload)[0]
+                records = payload[SEQ_HEADER.size:]
+                self._track(first, first + len(records) // RECORD.size - 1, controls)
+                packets.extend(decode_records(records, self.sensor_names))
+            elif frame_type == FRAME_CONTROL:
+                control = json.loads(bytes(payload))
+                controls.append(control)
+                self._apply_control(control)
+            offset = start + length
+        self._buffer = bytes(view[offset:])
+
+    def _apply_control(self, control):
+        """Control messages that change how the rest of the stream is decoded"""
+        if control.get("type") == "hello":
+            self.protocol = control.get("protocol", PROTOCOL_JSON)
+            self.sensor_names = {int(k): v for k, v in control.get("sensors", {}).items()}
+            self._discard = False
+            if "stream" in control and not control.get("resumed"):
+                # new stream (first connect or simulator restart): numbering starts over
+                self.stream, self.last_seq = control["stream"], None
+        elif control.get("type") == "sensors":
+            # the simulator's sensor set changed (config reload): new id -> name map for binary records
+            self.sensor_names = {int(k): v for k, v in control.get("sensors", {}).items()}
@@ -0,0 +1,128 @@
+"""Single event-loop simulation engine (alternative to one OS thread per sensor).
+
+Every sensor sits in one heap keyed by its next absolute deadline on the
+monotonic clock (see deadline_schedule.py). The next deadline is computed from
+the previous deadline, not from "now", so sleep overshoot and packet-building
+time never accumulate into drift, and thousands of sensors cost one thread
+instead of thousands.
+"""
+import asyncio
+import heapq
+import queue
+import time
+
+try:
+    from deadline_schedule import DeadlineSchedule, POLICY_SKIP                     # When running sensors_simulator.py directly
+except ImportError:
+    from sensors_simulator.deadline_schedule import DeadlineSchedule, POLICY_SKIP   # When imported from root (main/test_suit)
+
+
+class AsyncSimulationEngine:
+    """Drives a list of SensorsSimulator instances from one asyncio loop"""
+
+    def __init__(self, sensors, data_queue, running_evt, reset_evt, poll_interval=0.1,
+                 overrun_policy=POLICY_SKIP):
+        self.sensors = sensors
+        self.data_queue = data_queue
+        self.running_evt = running_evt
+        self.reset_evt = reset_evt
+        # upper bound on a single sleep so reset/stop are noticed promptly
+        self.poll_interval = poll_interval
+        self.overrun_policy = overrun_policy
+        self.packets_emitted = 0
+        self.max_lateness = 0.0
+        self.started_at = None
+        self._heap = []
+        self._added = queue.SimpleQueue()   # sensors added by a config reload, picked up by the loop
+
+    def run_forever(self):
+        """Thread target: own event loop until running_evt is cleared"""
+        asyncio.run(self.run())
+
+    async def run(self):
+        self._load()
+        self.started_at = time.monotonic()
+        self._schedule(self.started_at)
+        while self.running_evt.is_set():
+            if self.reset_evt.is_set():
+                self._reset()
+            if not self._added.empty():
+                self._take_added()
+            if not self._heap:
+                await asyncio.sleep(self.poll_interval)
+                continue
+            now = time.monotonic()
+            wait = self._heap[0][0] - now
+            if wait > 0:
+                await asyncio.sleep(min(wait, self.poll_interval))
+                continue
+            self._emit_due(now)
+            # yield between bursts so other tasks on the loop get a turn
+            await asyncio.sleep(0)
+
+    def _load(self):
+        """Load every data file once; replicas of the same sensor share one value buffer"""
+        cache = {}
+        active = []
+        for sensor in self.sensors:
+            if sensor.source not in cache:
+                cache[sensor.source] = sensor.load_values()
+            sensor.values = cache[sensor.source]
+            sensor.cursor = 0
+            if sensor.values is None:
+                print(f"Simulator: {sensor.name} has no data, not scheduled.")
+                continue
+            active.append(sensor)
+        self.sensors = active
+
+    def add(self, sensor):
+        """Thread-safe: start driving one more sensor (config reload)"""
+        self._added.put(sensor)
+
+    def _take_added(self):
+        now = time.monotonic()
+        while not self._added.empty():
+            sensor = self._added.get()
+            sensor.values, sensor.cursor = sensor.load_values(), 0
+            if sensor.values is None:
+                print(f"Simulator: {sensor.name} has no data, not scheduled.")
+                continue
+            sensor.schedule = DeadlineSchedule(sensor.interval, self.overrun_policy, now)
+            self.sensors.append(sensor)
+            heapq.heappush(self._heap, (now, len(self.sensors) - 1))
+
+    def _schedule(self, start):
+        for sensor in self.sensors:
+            if sensor.schedule is None:
+                sensor.schedule = DeadlineSchedule(sensor.interval, self.overrun_policy, start)
+            else:
+                sensor.schedule.restart(start)
+        # (deadline, index) tuples: the index breaks ties so sensors are never compared
+        self._heap = [(start, i) for i in range(len(self.sensors))]
+        heapq.heapify(self._heap)
+
+    def _emit_due(self, now):
+        """Emit every sensor whose deadline has passed and book its next one"""
+        heap, sensors, put = self._heap, self.sensors, self.data_queue.put
+        while heap and heap[0][0] <= now:
+            deadline, index = heap[0]
+            sensor = sensors[index]
+            if not sensor.active:
+                heapq.heappop(heap)     # removed by a config reload
+                continue
+            put(sensor.next_packet())
+            self.packets_emitted += 1
+            if now - deadline > self.max_lateness:
+                self.max_lateness = now - deadline
+            # absolute deadline: drift-free no matter how late this emission was
+            heapq.heapreplace(heap, (sensor.schedule.advance(now), index))
+
+    def _reset(self):
+        """Restart every sensor from the top of its data file"""
+        self.sensors = [sensor for sensor in self.sensors if sensor.active]
+        for sensor in self.sensors:
+            sensor.cursor = 0
+        self._schedule(time.monotonic())
+        # single owner of the loop, so the engine (not 'sensor 100') flips the flag back
+        self.reset_evt.clear()
+        print(f"Simulator: {len(self.sensors)} sensors restarted!")
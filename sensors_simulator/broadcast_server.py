@@ -0,0 +1,341 @@
+"""Single-threaded fan-out server: every connected dashboard gets every packet.
+
+One selector loop owns all sockets. Batches handed to publish() are encoded once
+per wire protocol and appended to each client's bounded outbox, so a slow or
+stalled dashboard only ever fills its own buffer instead of blocking the others.
+Control messages (hello reply, sensor map, traces) share that outbox to stay in
+order with the data, but only data chunks are ever discarded to make room.
+
+Every published packet gets the next sequence number of the stream, and the
+newest replay_capacity packets are kept in a replay ring. A dashboard that opts
+in (a 'resume' parameter in its hello) receives the sequence numbers, and on
+reconnect gets everything it missed that is still in the ring.
+"""
+import collections
+import os
+import selectors
+import socket
+import sys
+import threading
+
+try:
+    from common import wire_protocol
+except ImportError:
+    # Running the simulator directly: the project root is not on sys.path
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from common import wire_protocol
+
+POLICY_DROP = "drop"                # disconnect a client whose outbox overflows
+POLICY_DOWNSAMPLE = "downsample"    # discard its oldest unsent batches instead
+
+
+class ClientSession:
+    """Per-dashboard connection state, only touched from the selector thread"""
+
+    def __init__(self, server, sock, addr):
+        self.server = server
+        self.sock = sock
+        self.addr = addr
+        self.protocol = wire_protocol.PROTOCOL_JSON   # until the client says hello
+        self.outbox = collections.deque()             # (encoded chunk, is control) waiting for the socket
+        self.buffered = 0                             # bytes in outbox
+        self.sent_offset = 0                          # bytes of outbox[0] already written
+        self.inbox = b""                              # partial command line
+        self.dropped_batches = 0
+        self.bytes_sent = 0
+        self.sequenced = False                        # sends sequence numbers (the client asked to resume)
+        self.negotiated = False                       # said hello: understands control messages
+        self.first_seq = server.next_seq              # first packet queued to this connection
+
+    def enqueue(self, chunk, control=False):
+        """Queue one encoded chunk, enforcing the per-client buffer bound"""
+        self.outbox.append((chunk, control))
+        self.buffered += len(chunk)
+        if self.buffered <= self.server.client_buffer:
+            return True
+        if self.server.slow_client_policy == POLICY_DOWNSAMPLE:
+            # keep the newest data; never cut the chunk that is half written, never lose a control
+            # message (a missed protocol switch or sensor map garbles everything after it)
+            index = 1 if self.sent_offset else 0
+            while self.buffered > self.server.client_buffer and index < len(self.outbox) - 1:
+                head, is_control = self.outbox[index]
+                if is_control:
+                    index += 1
+                    continue
+                self.buffered -= len(head)
+                del self.outbox[index]
+                self.dropped_batches += 1
+                self.server.dropped_batches += 1
+            return True
+        return False
+
+    def send_control(self, message):
+        """Queue a control message in the client's current protocol (False if that dropped the client)"""
+        if not self.enqueue(wire_protocol.encode_control(message, self.protocol), control=True):
+            self.server._drop_slow(self)
+            return False
+        self.server._want_write(self)
+        return True
+
+    def negotiate(self, offered, sensor_names, resume=None):
+        """Answer a 'hello': the reply goes out in the old protocol, the rest in the new one.
+
+        resume is the client's {"stream", "seq"} resume point ({} on a first
+        connect, None from clients that don't track sequence numbers). A client
+        that resumes discards what it got before the reply, so the replay
+        restarts after its last packet (same stream) or at this connection's
+        first packet (the simulator restarted in between).
+        """
+        protocol = wire_protocol.choose_protocol(offered)
+        reply = {
+            "type": "hello", "protocol": protocol,
+            "sensors": {str(k): v for k, v in sensor_names.items()}
+        }
+        chunks = []
+        if resume is not None:
+            self.sequenced = True
+            resumed = resume.get("stream") == self.server.stream_id and resume.get("seq") is not None
+            reply.update(stream=self.server.stream_id, resumed=resumed)
+            if resume.get("stream"):
+                after = resume["seq"] if resumed else self.first_seq - 1
+                chunks, reply["replayed"] = self.server.replay_chunks(after, protocol, self.server.client_buffer // 2)
+        if not self.send_control(reply):
+            return protocol
+        self.protocol = protocol
+        self.negotiated = True
+        for chunk in chunks:
+            if not self.enqueue(chunk):
+                self.server._drop_slow(self)
+                break
+        return protocol
+
+    def flush(self):
+        """Write as much of the outbox as the socket takes without blocking"""
+        while self.outbox:
+            head = self.outbox[0][0]
+            sent = self.sock.send(memoryview(head)[self.sent_offset:])
+            self.bytes_sent += sent
+            self.sent_offset += sent
+            if self.sent_offset < len(head):
+                return False    # kernel buffer full, wait for the next EVENT_WRITE
+            self.outbox.popleft()
+            self.buffered -= len(head)
+            self.sent_offset = 0
+        return True
+
+
+class BroadcastServer:
+    """Accepts any number of dashboards and broadcasts every published batch to all of them"""
+
+    def __init__(self, host, port, on_command=None, client_buffer=1 << 20,
+                 slow_client_policy=POLICY_DROP, max_clients=256, replay_capacity=100000):
+        self.host = host
+        self.port = port
+        self.on_command = on_command          # callable(line, session)
+        self.client_buffer = client_buffer
+        self.slow_client_policy = slow_client_policy
+        self.max_clients = max_clients
+        self.clients = {}                     # socket -> ClientSession
+        self.dropped_clients = 0
+        self.dropped_batches = 0              # batches discarded by the downsample policy, all clients
+        # sequence numbers restart with every server: the stream id tells a client which ones it holds
+        self.stream_id = os.urandom(4).hex()
+        self.next_seq = 0
+        self.replay_capacity = replay_capacity     # packets kept for reconnecting clients
+        self._ring = collections.deque()           # (first sequence number, batch), oldest first
+        self._ring_packets = 0
+        self._selector = selectors.DefaultSelector()
+        self._pending = collections.deque()   # batches from publish(), control messages from announce()
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._wake_pending = False
+        self._running = threading.Event()
+        self._listener = None
+        self._thread = None
+
+    def start(self):
+        """Bind, listen and run the selector loop on a background thread"""
+        self._listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        # Allow address reuse (prevents "Port already in use" errors on restart)
+        self._listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._listener.bind((self.host, self.port))
+        self._listener.listen(socket.SOMAXCONN)
+        self._listener.setblocking(False)
+        self.port = self._listener.getsockname()[1]   # resolves port 0 to the real one
+        self._wake_r.setblocking(False)
+        self._selector.register(self._listener, selectors.EVENT_READ, self._accept)
+        self._selector.register(self._wake_r, selectors.EVENT_READ, self._drain_wakeups)
+        self._running.set()
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+        return self.port
+
+    def publish(self, batch):
+        """Thread-safe: hand a batch of packets to every connected client"""
+        self._pending.append(batch)
+        if not self._wake_pending:
+            self._wake_pending = True
+            try:
+                self._wake_w.send(b"\0")
+            except (BlockingIOError, OSError):
+                pass
+
+    def announce(self, message):
+        """Thread-safe: send a control message to every client that said hello, in order with the data.
+
+        Legacy dashboards never negotiate and read every line as a packet, so
+        they only get the data.
+        """
+        self.publish(message)
+
+    def negotiated(self):
+        """True when some connected client said hello (and would receive controls); safe from any thread"""
+        return any(s.negotiated for s in list(self.clients.values()))
+
+    def backlog(self):
+        """(batches waiting for the loop, bytes queued for the slowest client); safe from any thread"""
+        sessions = list(self.clients.values())
+        return len(self._pending), max((s.buffered for s in sessions), default=0)
+
+    def replay_chunks(self, after, protocol, budget):
+        """Encode the ring's packets newer than sequence number 'after', newest first up to 'budget' bytes.
+
+        Returns (chunks in stream order, packet count). Whatever does not fit,
+        or already left the ring, shows up as a gap on the client.
+        """
+        chunks, packets, size = [], 0, 0
+        for first, batch in reversed(self._ring):
+            if first + len(batch) - 1 <= after:
+                break
+            if first <= after:
+                batch, first = batch[after + 1 - first:], after + 1
+            chunk = wire_protocol.encode_batch(batch, protocol, first)
+            size += len(chunk)
+            if size > budget:
+                break
+            chunks.append(chunk)
+            packets += len(batch)
+        chunks.reverse()
+        return chunks, packets
+
+    def stop(self):
+        """Stop the loop and close every socket"""
+        self._running.clear()
+        try:
+            self._wake_w.send(b"\0")
+        except OSError:
+            pass
+        if self._thread:
+            self._thread.join(timeout=2)
+
+    def _serve(self):
+        try:
+            while self._running.is_set():
+                for key, mask in self._selector.select(timeout=0.5):
+                    key.data(key.fileobj, mask)
+        finally:
+            for session in list(self.clients.values()):
+                self._close(session)
+            self._selector.close()
+            self._listener.close()
+            self._wake_r.close()
+            self._wake_w.close()
+
+    def _accept(self, listener, mask):
+        try:
+            sock, addr = listener.accept()
+        except BlockingIOError:
+            return
+        if len(self.clients) >= self.max_clients:
+            print(f"Simulator: Refusing {addr}, {self.max_clients} dashboards already connected.")
+            sock.close()
+            return
+        sock.setblocking(False)
+        session = ClientSession(self, sock, addr)
+        self.clients[sock] = session
+        self._selector.register(sock, selectors.EVENT_READ, self._on_client)
+        print(f"Simulator: Dashboard connected from {addr} ({len(self.clients)} connected)")
+
+    def _drain_wakeups(self, sock, mask):
+        try:
+            while sock.recv(4096):
+                pass
+        except BlockingIOError:
+            pass
+        self._wake_pending = False
+        while self._pending:
+            item = self._pending.popleft()
+            if isinstance(item, dict):
+                for session in list(self.clients.values()):
+                    if session.negotiated:
+                        session.send_control(item)
+            else:
+                self._fan_out(item)
+
+    def _fan_out(self, batch):
+        """Number the batch, keep it for replay, encode once per format in use and queue it on every client"""
+        first_seq = self.next_seq
+        self.next_seq += len(batch)
+        self._remember(first_seq, batch)
+        encoded = {}
+        for session in list(self.clients.values()):
+            key = (session.protocol, session.sequenced)
+            chunk = encoded.get(key)
+            if chunk is None:
+                chunk = encoded[key] = wire_protocol.encode_batch(
+                    batch, session.protocol, first_seq if session.sequenced else None)
+            if not session.enqueue(chunk):
+                self._drop_slow(session)
+                continue
+            self._want_write(session)
+
+    def _drop_slow(self, session):
+        """Disconnect a client whose outbox overflowed (drop policy)"""
+        if session.sock not in self.clients:
+            return
+        print(f"Simulator: Dropping slow dashboard {session.addr} (outbox over {self.client_buffer} bytes)")
+        self.dropped_clients += 1
+        self._close(session)
+
+    def _remember(self, first_seq, batch):
+        if self.replay_capacity <= 0:
+            return
+        self._ring.append((first_seq, batch))
+        self._ring_packets += len(batch)
+        # whole batches only: the newest one stays even if it alone is over capacity
+        while self._ring_packets > self.replay_capacity and len(self._ring) > 1:
+            self._ring_packets -= len(self._ring.popleft()[1])
+
+    def _want_write(self, session):
+        if session.sock in self.clients:
+            self._selector.modify(session.sock, selectors.EVENT_READ | selectors.EVENT_WRITE, self._on_client)
+
+    def _on_client(self, sock, mask):
+        session = self.clients.get(sock)
+        if session is None:
+            return
+        try:
+            if mask & selectors.EVENT_READ:
+                data = sock.recv(4096)
+                if not data:
+                    raise ConnectionResetError("peer closed")
+                session.inbox += data
+                *lines, session.inbox = session.inbox.split(b"\n")
+                for line in lines:
+                    line = line.decode('utf-8', errors='replace').strip()
+                    if line and self.on_command:
+                        self.on_command(line, session)
+            if mask & selectors.EVENT_WRITE and sock in self.clients:
+                if session.flush():
+                    self._selector.modify(sock, selectors.EVENT_READ, self._on_client)
+        except (ConnectionResetError, BrokenPipeError, OSError):
+            print(f"Simulator: Dashboard {session.addr} disconnected.")
+            self._close(session)
+
+    def _close(self, session):
+        if self.clients.pop(session.sock, None) is None:
+            return
+        try:
+            self._selector.unregister(session.sock)
+        except (KeyError, ValueError):
+            pass
+        session.sock.close()
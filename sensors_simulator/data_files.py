@@ -0,0 +1,116 @@
+"""Parse-once loader for the sensors_data/*.txt value files.
+
+A text file is parsed a block of lines at a time into a binary float64 cache
+next to it ({name}.bin). The cache header records the source's mtime and size,
+so the cache is rebuilt only when the text file changes. The cache is then
+memory-mapped read-only and the same mapping is handed to every sensor (and
+replica) reading that file, so the values cost one set of shared pages instead
+of a list of strings per thread and a float() per emission. Lines that are not
+a number are skipped (and reported once, when the cache is built), so one typo
+doesn't take the sensor, or the simulator, down.
+"""
+import os
+import struct
+import threading
+
+import numpy as np
+
+# magic, source mtime (ns), source size (bytes)
+CACHE_HEADER = struct.Struct("<8sqq")
+CACHE_MAGIC = b"SDVAL001"
+PARSE_BLOCK = 1 << 20     # lines parsed per numpy conversion
+
+_loaded = {}              # text path -> (mtime_ns, size, values)
+_lock = threading.Lock()
+
+
+def cache_path(path):
+    return os.path.splitext(path)[0] + ".bin"
+
+
+def load_values(path):
+    """float64 values of a data file (one number per line), shared and cached; OSError if missing, ValueError if not text"""
+    path = os.path.abspath(path)
+    st = os.stat(path)
+    with _lock:
+        entry = _loaded.get(path)
+        if entry is not None and entry[:2] == (st.st_mtime_ns, st.st_size):
+            return entry[2]
+        values = _open_cache(path, st)
+        if values is None:
+            values = _build_cache(path, st)
+        _loaded[path] = (st.st_mtime_ns, st.st_size, values)
+        return values
+
+
+def _open_cache(path, st):
+    """Map an existing cache if it was built from this exact version of the text file"""
+    try:
+        with open(cache_path(path), 'rb') as f:
+            magic, mtime_ns, size = CACHE_HEADER.unpack(f.read(CACHE_HEADER.size))
+    except (OSError, struct.error):
+        return None
+    if magic != CACHE_MAGIC or (mtime_ns, size) != (st.st_mtime_ns, st.st_size):
+        return None
+    return _map(cache_path(path))
+
+
+def _map(cache_file):
+    count = (os.path.getsize(cache_file) - CACHE_HEADER.size) // 8
+    if count == 0:
+        return np.empty(0, dtype=np.float64)
+    return np.memmap(cache_file, dtype='<f8', mode='r', offset=CACHE_HEADER.size, shape=(count,))
+
+
+def _parse_blocks(f, bad):
+    """float64 arrays of PARSE_BLOCK lines each, blank lines skipped, malformed ones appended to 'bad'"""
+    block = []
+    for line in f:
+        line = line.strip()
+        if line:
+            block.append(line)
+            if len(block) == PARSE_BLOCK:
+                yield _to_array(block, bad)
+                block = []
+    if block:
+        yield _to_array(block, bad)
+
+
+def _to_array(block, bad):
+    try:
+        return np.array(block, dtype=np.float64)
+    except ValueError:
+        # rare: convert line by line to find the culprits
+        values = []
+        for line in block:
+            try:
+                values.append(float(line))
+            except ValueError:
+                bad.append(line)
+        return np.array(values, dtype=np.float64)
+
+
+def _build_cache(path, st):
+    """Parse the text file into the binary cache; falls back to an in-memory array if it can't be written"""
+    target = cache_path(path)
+    tmp = f"{target}.{os.getpid()}.tmp"
+    bad = []
+    try:
+        with open(path) as src, open(tmp, 'wb') as out:
+            out.write(CACHE_HEADER.pack(CACHE_MAGIC, st.st_mtime_ns, st.st_size))
+            for block in _parse_blocks(src, bad):
+                out.write(block.astype('<f8').tobytes())
+        os.replace(tmp, target)   # readers never see a half-written cache
+        values = _map(target)
+    except OSError:
+        # read-only data directory: keep the parsed values in memory instead
+        bad = []
+        with open(path) as src:
+            blocks = list(_parse_blocks(src, bad))
+        values = np.concatenate(blocks) if blocks else np.empty(0, dtype=np.float64)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    if bad:
+        print(f"Simulator: Skipped {len(bad)} malformed lines in {path} (first: {bad[0]!r})")
+    return values
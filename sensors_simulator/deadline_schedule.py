@@ -0,0 +1,86 @@
+"""Absolute-deadline pacing for sensor emission.
+
+Deadlines sit on a fixed grid (start + k * interval) on the monotonic clock, so
+the time spent building and queueing a packet never shifts later samples. When a
+sensor falls a whole interval or more behind, the overrun policy decides whether
+the missed slots are emitted back to back ("catch_up") or dropped ("skip").
+"""
+import math
+import time
+
+POLICY_SKIP = "skip"
+POLICY_CATCH_UP = "catch_up"
+
+
+class ScheduleStats:
+    """Running jitter/overrun counters for one sensor (O(1) per emission)"""
+
+    def __init__(self):
+        self.emitted = 0
+        self.total_jitter = 0.0
+        self.total_jitter_sq = 0.0
+        self.max_jitter = 0.0
+        self.overruns = 0       # emissions that happened a full interval (or more) late
+        self.skipped = 0        # slots dropped by the skip policy
+        self.caught_up = 0      # late slots emitted back to back by the catch-up policy
+
+    def record(self, jitter):
+        self.emitted += 1
+        self.total_jitter += jitter
+        self.total_jitter_sq += jitter * jitter
+        if jitter > self.max_jitter:
+            self.max_jitter = jitter
+
+    def as_dict(self):
+        mean = self.total_jitter / self.emitted if self.emitted else 0.0
+        variance = self.total_jitter_sq / self.emitted - mean * mean if self.emitted else 0.0
+        return {
+            "emitted": self.emitted,
+            "mean_jitter_ms": mean * 1000,
+            "std_jitter_ms": math.sqrt(max(variance, 0.0)) * 1000,
+            "max_jitter_ms": self.max_jitter * 1000,
+            "overruns": self.overruns,
+            "skipped": self.skipped,
+            "caught_up": self.caught_up,
+        }
+
+
+class DeadlineSchedule:
+    """Per-sensor deadline grid with jitter/overrun accounting"""
+
+    def __init__(self, interval, policy=POLICY_SKIP, start=None):
+        self.interval = interval
+        self.policy = policy
+        self.next_deadline = time.monotonic() if start is None else start
+        self.stats = ScheduleStats()
+
+    def restart(self, now=None):
+        """Re-anchor the grid (after a reset the first sample goes out right away)"""
+        self.next_deadline = time.monotonic() if now is None else now
+
+    def wait(self):
+        """Sleep until the next deadline (threaded loop)"""
+        delay = self.next_deadline - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+    def advance(self, now=None):
+        """Account for an emission made at 'now' and book the next deadline, which is returned"""
+        if now is None:
+            now = time.monotonic()
+        deadline = self.next_deadline
+        jitter = now - deadline
+        self.stats.record(max(jitter, 0.0))
+
+        missed = int(jitter // self.interval) if jitter >= self.interval else 0
+        if missed:
+            self.stats.overruns += 1
+            if self.policy == POLICY_SKIP:
+                # drop the slots we can no longer honour, stay on the original grid
+                self.stats.skipped += missed
+                deadline += missed * self.interval
+            else:
+                # next deadline is already due: the caller emits it immediately
+                self.stats.caught_up += 1
+        self.next_deadline = deadline + self.interval
+        return self.next_deadline
@@ -0,0 +1,151 @@
+"""Bounded packet queue between the sensors and the transmitter.
+
+Drop-in for the queue.Queue the simulator used (put / get / get_nowait / empty /
+qsize), plus put_many() for block producers, but with a fixed capacity and an
+overflow policy applied when a packet arrives at a full queue:
+
+  * "block"        the producer waits for room (back-pressure on the sensors)
+  * "drop_oldest"  the oldest queued packet is discarded to make room
+  * "drop_newest"  the arriving packet is discarded
+  * "coalesce"     the arriving packet replaces the queued packet of the same
+                   sensor (latest value wins); if that sensor has none queued,
+                   the oldest packet is discarded
+
+Dropped and coalesced samples are counted per sensor and reported by stats(),
+which the simulator returns on the "stats" command.
+"""
+import collections
+import queue
+import threading
+
+POLICY_BLOCK = "block"
+POLICY_DROP_OLDEST = "drop_oldest"
+POLICY_DROP_NEWEST = "drop_newest"
+POLICY_COALESCE = "coalesce"
+OVERFLOW_POLICIES = (POLICY_BLOCK, POLICY_DROP_OLDEST, POLICY_DROP_NEWEST, POLICY_COALESCE)
+
+
+class BoundedPacketQueue:
+    """Fixed-capacity FIFO of packet dicts with an overflow policy and per-sensor drop accounting"""
+
+    def __init__(self, capacity=100000, policy=POLICY_DROP_OLDEST):
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        self._not_full = threading.Condition(self._lock)
+        # entries are [packet, queued] lists so coalescing can rewrite one in place
+        self._entries = collections.deque()
+        self._latest = {}       # sensor -> its newest queued entry (coalesce policy)
+        self.dropped = collections.Counter()
+        self.coalesced = collections.Counter()
+        self.blocked_puts = 0
+        self.max_depth = 0
+        self.configure(capacity, policy)
+
+    def configure(self, capacity, policy):
+        if policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy {policy!r}, expected one of {OVERFLOW_POLICIES}")
+        with self._lock:
+            self.capacity = max(1, int(capacity))
+            self.policy = policy
+
+    # ---------- producer side ----------
+    def put(self, packet, block=True, timeout=None):
+        """Queue a packet; only the block policy can wait (and raise queue.Full on timeout)"""
+        with self._not_full:
+            self._put(packet, block, timeout)
+
+    def put_many(self, packets, block=True, timeout=None):
+        """Queue a block of packets under one lock, each one going through the overflow policy"""
+        with self._not_full:
+            for packet in packets:
+                self._put(packet, block, timeout)
+
+    def _put(self, packet, block, timeout):
+        if len(self._entries) >= self.capacity:
+            if self.policy == POLICY_BLOCK:
+                if not block:
+                    raise queue.Full
+                self.blocked_puts += 1
+                if not self._not_full.wait_for(lambda: len(self._entries) < self.capacity, timeout):
+                    raise queue.Full
+            elif self.policy == POLICY_DROP_NEWEST:
+                self.dropped[packet.get('sensor')] += 1
+                return
+            elif self.policy == POLICY_COALESCE and self._coalesce(packet):
+                return
+            else:
+                self._drop_oldest()
+        self._append(packet)
+
+    def put_nowait(self, packet):
+        self.put(packet, block=False)
+
+    def _append(self, packet):
+        entry = [packet, True]
+        self._entries.append(entry)
+        if self.policy == POLICY_COALESCE:
+            self._latest[packet.get('sensor')] = entry
+        if len(self._entries) > self.max_depth:
+            self.max_depth = len(self._entries)
+        self._not_empty.notify()
+
+    def _coalesce(self, packet):
+        sensor = packet.get('sensor')
+        entry = self._latest.get(sensor)
+        if entry is None or not entry[1]:
+            return False
+        entry[0] = packet
+        self.coalesced[sensor] += 1
+        return True
+
+    def _drop_oldest(self):
+        entry = self._entries.popleft()
+        self._dequeued(entry)
+        self.dropped[entry[0].get('sensor')] += 1
+
+    def _dequeued(self, entry):
+        entry[1] = False
+        sensor = entry[0].get('sensor')
+        if self._latest.get(sensor) is entry:
+            del self._latest[sensor]
+
+    # ---------- consumer side ----------
+    def get(self, block=True, timeout=None):
+        with self._not_empty:
+            if not self._entries:
+                if not block:
+                    raise queue.Empty
+                if not self._not_empty.wait_for(lambda: self._entries, timeout):
+                    raise queue.Empty
+            entry = self._entries.popleft()
+            self._dequeued(entry)
+            self._not_full.notify()
+            return entry[0]
+
+    def get_nowait(self):
+        return self.get(block=False)
+
+    def clear(self):
+        """Discard everything queued (restart); not counted as drops"""
+        with self._lock:
+            self._entries.clear()
+            self._latest.clear()
+            self._not_full.notify_all()
+
+    def qsize(self):
+        return len(self._entries)
+
+    def empty(self):
+        return not self._entries
+
+    def stats(self):
+        with self._lock:
+            return {
+                "capacity": self.capacity,
+                "policy": self.policy,
+                "depth": len(self._entries),
+                "max_depth": self.max_depth,
+                "blocked_puts": self.blocked_puts,
+                "dropped": dict(self.dropped),
+                "coalesced": dict(self.coalesced),
+            }
@@ -0,0 +1,194 @@
+"""Replay of recorded sensor data at a chosen speed.
+
+Two recording formats are understood:
+  * the simulator's own ``sensors_data/{name}_data.txt`` files (one value per
+    line, samples spaced by the sensor's configured interval)
+  * timestamped CSV files with a ``timestamp,sensor,value,status`` header
+
+Records are played back on the monotonic clock with their original
+inter-arrival times divided by the speed multiplier (speed None = as fast as
+the consumer takes them). Every window the source checks whether it is still on
+schedule and whether the consumer reports a backlog; the best rate reached while
+keeping up is the maximum sustained rate of the run.
+"""
+import bisect
+import csv
+import os
+import time
+
+try:
+    from data_files import load_values                    # When running sensors_simulator.py directly
+except ImportError:
+    from sensors_simulator.data_files import load_values  # When imported from root (main/test_suit)
+
+# one record: (recorded time in seconds, sensor name, value, status)
+CSV_FIELDS = ("timestamp", "sensor", "value", "status")
+
+
+def load_text_recording(path, name, interval):
+    """Records of a sensors_data/{name}_data.txt file, one sample every 'interval' seconds"""
+    return [(k * interval, name, float(value), "OK") for k, value in enumerate(load_values(path))]
+
+
+def load_csv_recording(path):
+    """Records of a timestamp,sensor,value,status CSV file"""
+    with open(path, newline='') as f:
+        reader = csv.DictReader(f)
+        missing = set(CSV_FIELDS) - set(reader.fieldnames or ())
+        if missing:
+            raise ValueError(f"{path}: missing CSV columns {sorted(missing)}")
+        return [(float(row['timestamp']), row['sensor'], float(row['value']), row['status'] or "OK")
+                for row in reader]
+
+
+def load_recording(path, intervals):
+    """Load one recording file; 'intervals' maps sensor name -> seconds for the text format"""
+    if path.endswith('.csv'):
+        return load_csv_recording(path)
+    name = os.path.basename(path)
+    if name.endswith('_data.txt'):
+        name = name[:-len('_data.txt')]
+    if name not in intervals:
+        raise ValueError(f"{path}: no interval configured for sensor '{name}'")
+    return load_text_recording(path, name, intervals[name])
+
+
+def merge_recordings(recordings):
+    """One time-ordered record list out of several (each recording starts at its own offset 0)"""
+    merged = []
+    for records in recordings:
+        if records:
+            origin = min(r[0] for r in records)
+            merged.extend((t - origin, *rest) for t, *rest in records)
+    merged.sort(key=lambda r: r[0])
+    return merged
+
+
+class RateMonitor:
+    """Per-window throughput and lag; remembers the best rate reached while keeping up"""
+
+    def __init__(self, window=1.0, lag_tolerance=1.0):
+        self.window = window
+        self.lag_tolerance = lag_tolerance
+        self.started = None
+        self.finished = None
+        self.window_start = None
+        self.window_count = 0
+        self.emitted = 0
+        self.max_lag = 0.0
+        self.max_sustained_rate = 0.0
+        self.fell_behind_after = None   # seconds into the run of the first window that fell behind
+        self.fell_behind_rate = None    # rate reached in that window
+
+    def start(self, now):
+        self.started = self.window_start = now
+
+    def record(self, count, lag, now, behind=None):
+        """Account for 'count' records handed over, 'lag' seconds after the last one was due"""
+        self.emitted += count
+        self.window_count += count
+        self.max_lag = max(self.max_lag, lag)
+        if now - self.window_start >= self.window:
+            self._close_window(lag, now, behind)
+
+    def finish(self, lag, now, behind=None):
+        self.finished = now
+        # a short tail window says little about the sustained rate
+        if now - self.window_start >= self.window / 5:
+            self._close_window(lag, now, behind)
+
+    def _close_window(self, lag, now, behind):
+        rate = self.window_count / (now - self.window_start)
+        if lag > self.lag_tolerance or (behind is not None and behind()):
+            if self.fell_behind_after is None:
+                self.fell_behind_after = now - self.started
+                self.fell_behind_rate = rate
+        else:
+            self.max_sustained_rate = max(self.max_sustained_rate, rate)
+        self.window_start, self.window_count = now, 0
+
+    def as_dict(self):
+        if self.started is None:
+            elapsed = 0.0
+        else:
+            elapsed = (self.finished or time.monotonic()) - self.started
+        return {
+            "emitted": self.emitted,
+            "elapsed_s": elapsed,
+            "mean_rate": self.emitted / elapsed if elapsed > 0 else 0.0,
+            "max_sustained_rate": self.max_sustained_rate,
+            "max_lag_s": self.max_lag,
+            "fell_behind": self.fell_behind_after is not None,
+            "fell_behind_after_s": self.fell_behind_after,
+            "fell_behind_rate": self.fell_behind_rate,
+        }
+
+
+class ReplaySource:
+    """Streams recorded records into 'sink' (callable taking a list of packets)"""
+
+    def __init__(self, records, sink, ids=None, speed=1.0, running_evt=None, reset_evt=None,
+                 behind=None, max_batch=4096, window=1.0, lag_tolerance=1.0, loop=False):
+        self.times = [r[0] for r in records]
+        self.records = records
+        self.sink = sink
+        self.ids = ids or {}
+        self.speed = speed              # None / 0 = as fast as possible
+        self.running_evt = running_evt
+        self.reset_evt = reset_evt
+        self.behind = behind            # optional callable: True while the consumer has a backlog
+        self.max_batch = max_batch
+        self.loop = loop
+        self.monitor = RateMonitor(window, lag_tolerance)
+
+    def _packets(self, i, j):
+        now = time.time()
+        return [{"id": self.ids.get(name, 0), "sensor": name, "value": value,
+                 "timestamp": now, "status": status}
+                for _, name, value, status in self.records[i:j]]
+
+    def _running(self):
+        return self.running_evt is None or self.running_evt.is_set()
+
+    def run(self):
+        """Play the recording (repeatedly if loop=True); returns the rate report"""
+        n = len(self.records)
+        if n == 0:
+            return self.report()
+        origin = self.times[0]
+        start = time.monotonic()
+        self.monitor.start(start)
+        i, lag = 0, 0.0
+        while self._running():
+            if self.reset_evt is not None and self.reset_evt.is_set():
+                self.reset_evt.clear()
+                i, start = 0, time.monotonic()
+            if i >= n:
+                if not self.loop:
+                    break
+                # next lap starts over from the first record
+                i, start = 0, time.monotonic()
+                continue
+
+            now = time.monotonic()
+            if self.speed:
+                # everything recorded up to this point of the (scaled) timeline is due
+                reached = origin + (now - start) * self.speed
+                j = bisect.bisect_right(self.times, reached, i, min(n, i + self.max_batch))
+                if j == i:
+                    due = start + (self.times[i] - origin) / self.speed
+                    time.sleep(min(due - now, self.monitor.window))
+                    continue
+            else:
+                j = min(n, i + self.max_batch)
+
+            self.sink(self._packets(i, j))
+            now = time.monotonic()
+            lag = max(0.0, now - (start + (self.times[j - 1] - origin) / self.speed)) if self.speed else 0.0
+            self.monitor.record(j - i, lag, now, self.behind)
+            i = j
+        self.monitor.finish(lag, time.monotonic(), self.behind)
+        return self.report()
+
+    def report(self):
+        return {"speed": self.speed or "max", **self.monitor.as_dict()}
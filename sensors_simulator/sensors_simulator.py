@@ -4,161 +4,390 @@ import threading
 import time
 import queue
 import json
-import socket
 import os
+import sys
 
+try:
+    from broadcast_server import BroadcastServer                    # When running sensors_simulator.py directly
+except ImportError:
+    from sensors_simulator.broadcast_server import BroadcastServer  # When imported from root (main/test_suit)
+
+try:
+    from deadline_schedule import DeadlineSchedule, POLICY_SKIP                     # When running sensors_simulator.py directly
+except ImportError:
+    from sensors_simulator.deadline_schedule import DeadlineSchedule, POLICY_SKIP   # When imported from root (main/test_suit)
+
+try:
+    from packet_queue import BoundedPacketQueue, POLICY_DROP_OLDEST                    # When running sensors_simulator.py directly
+except ImportError:
+    from sensors_simulator.packet_queue import BoundedPacketQueue, POLICY_DROP_OLDEST  # When imported from root (main/test_suit)
+
+try:
+    from data_files import load_values                    # When running sensors_simulator.py directly
+except ImportError:
+    from sensors_simulator.data_files import load_values  # When imported from root (main/test_suit)
+
+try:
+    from signal_generator import SignalGenerator, GeneratorEngine, default_waveform                    # When running sensors_simulator.py directly
+except ImportError:
+    from sensors_simulator.signal_generator import SignalGenerator, GeneratorEngine, default_waveform  # When imported from root (main/test_suit)
+
+try:
+    from async_engine import AsyncSimulationEngine                    # When running sensors_simulator.py directly
+except ImportError:
+    from sensors_simulator.async_engine import AsyncSimulationEngine  # When imported from root (main/test_suit)
+
+try:
+    from replay_source import ReplaySource, load_recording, merge_recordings                    # When running sensors_simulator.py directly
+except ImportError:
+    from sensors_simulator.replay_source import ReplaySource, load_recording, merge_recordings  # When imported from root (main/test_suit)
+
+try:
+    from common.config_watcher import ConfigWatcher, diff_sensors, other_sections_changed
+    from common.latency_trace import make_trace
+except ImportError:
+    # Running the simulator directly: the project root is not on sys.path
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from common.config_watcher import ConfigWatcher, diff_sensors, other_sections_changed
+    from common.latency_trace import make_trace
 
 
 class SensorsSimulator:
     # Static variables shared by ALL instances
-    data_queue = queue.Queue()
+    # bounded: a slow or absent dashboard costs dropped/coalesced samples, not memory
+    # (capacity and overflow policy are overridden from config.json 'simulator' section)
+    data_queue = BoundedPacketQueue(100000, POLICY_DROP_OLDEST)
     fault_probability = 0.02
     # Use an Event for Reset (Thread-safe Traffic Light)
     reset_evt = threading.Event()
     # Use an Event for Global Running status
     running_evt = threading.Event()
+    # Transmitter batching (overridden from config.json 'network' section)
+    # batch_size = 1 keeps the legacy one-packet-per-sendall behaviour
+    batch_size = 1
+    flush_interval = 0.0
+    # id -> name of every created sensor (announced to binary clients in the hello reply)
+    sensor_names = {}
+    # every running sensor, for per-sensor statistics
+    registry = []
+    # config sensor name -> that sensor and its load-test replicas (what a config reload adds/removes)
+    groups = {}
+    # Emission pacing (overridden from config.json 'simulator' section)
+    # "sleep" = fixed sleep after each emission (legacy), "deadline" = absolute monotonic deadlines
+    scheduling = "sleep"
+    overrun_policy = POLICY_SKIP        # what a late sensor does with missed slots: "skip" or "catch_up"
+    # Fan-out server limits (overridden from config.json 'network' section)
+    max_clients = 256
+    client_buffer = 1 << 20             # bytes queued per dashboard before the slow-client policy kicks in
+    slow_client_policy = "drop"         # "drop" the client or "downsample" its backlog
+    replay_buffer = 100000              # packets kept so reconnecting dashboards can resume
+    # latency tracing: batches per second sent with a trace control (0 = off)
+    trace_rate = 0
+    batch_dequeued = None               # monotonic time the transmitter took the current batch's first packet
+    # the running fan-out server (set by tcp_transmitter)
+    server = None
+    # Replay mode: the active ReplaySource and the queue depth that counts as "falling behind"
+    replay = None
+    replay_backlog = 10000
+    _drops_seen = 0
 
 
-    def __init__(self, sensor_id: int, name: str, interval: float) -> None:
+    def __init__(self, sensor_id: int, name: str, interval: float, source: str = None) -> None:
         self.id = sensor_id
         self.name = name
         self.interval = interval
+        # data file stem, load-test replicas share the file of the sensor they copy
+        self.source = source or name
+        # read position for schedulers that drive the sensor step by step (async engine)
+        self.values = None
+        self.cursor = 0
+        # deadline grid + jitter/overrun stats, created by whoever drives the sensor
+        self.schedule = None
+        # synthetic signal source (generator mode only)
+        self.generator = None
+        # cleared when a config reload removes the sensor: its loop ends
+        self.active = True
+        SensorsSimulator.sensor_names[sensor_id] = name
+        SensorsSimulator.registry.append(self)
+
+    def set_interval(self, interval):
+        """New emission interval, effective from the next booked slot"""
+        self.interval = interval
+        if self.schedule is not None:
+            self.schedule.interval = interval
+
+    def stop(self):
+        """Retire the sensor: its loop (thread or engine slot) ends and it is no longer announced"""
+        self.active = False
+        SensorsSimulator.sensor_names.pop(self.id, None)
+        if self in SensorsSimulator.registry:
+            SensorsSimulator.registry.remove(self)
+
+    def load_values(self):
+        """Parsed values of the sensor's data file (shared, memory-mapped), None if it can't be read"""
+        file_path = f"./sensors_data/{self.source}_data.txt"
+        try:
+            return load_values(file_path)
+        except OSError:
+            print(f"File {file_path} not found.")
+            return None
+        except ValueError as e:
+            # malformed lines are skipped by the loader: this is a file that isn't text at all
+            print(f"File {file_path} unreadable: {e}")
+            return None
+
+    def make_packet(self, value, status):
+        """Build the API packet for one reading"""
+        return {
+            "id": self.id, "sensor": self.name, "value": value,
+            "timestamp": time.time(), "status": status
+        }
+
+    def next_packet(self):
+        """Emit the next reading, same data/fault/end-of-file behaviour as run_simulation"""
+        if self.cursor < len(self.values):
+            value = float(self.values[self.cursor])
+            status = "FAULTY" if random.random() < self.fault_probability else "OK"
+            self.cursor += 1
+        else:
+            # end of the test data: stuck at 0/FAULTY until reset, like the threaded loop
+            value, status = 0, "FAULTY"
+        return self.make_packet(value, status)
+
+    def _pace(self):
+        """Wait for the next emission slot: fixed sleep (legacy) or absolute deadline"""
+        if SensorsSimulator.scheduling == "deadline":
+            self.schedule.advance()
+            self.schedule.wait()
+        else:
+            time.sleep(self.interval)
 
     def run_simulation(self) -> None:
         """Logic loop with Restart Support"""
-        file_path = f"./sensors_data/{self.name}_data.txt"
-        try:
-            with open(file_path) as f:
-                lines = f.read().splitlines()
-        except:
-            print(f"File {file_path} not found. Thread ending.")
+        values = self.load_values()
+        if values is None:
+            print(f"{self.name}: Thread ending.")
             return
+        self.schedule = DeadlineSchedule(self.interval, SensorsSimulator.overrun_policy)
         
-        while SensorsSimulator.running_evt.is_set():
-            for line in lines:
+        while SensorsSimulator.running_evt.is_set() and self.active:
+            for value in values:
                 # CHECK FOR RESET
                 if SensorsSimulator.reset_evt.is_set():
                     break 
 
-                if not SensorsSimulator.running_evt.is_set():
-                    return # Exit thread entirely
+                if not (SensorsSimulator.running_evt.is_set() and self.active):
+                    return # Exit thread entirely (shutdown, or removed from the config)
                 
-                value = float(line.strip())
+                value = float(value)
                 status = "FAULTY" if random.random() < self.fault_probability else "OK"
-                packet = {
-                    "id": self.id, "sensor": self.name, "value": value,
-                    "timestamp": time.time(), "status": status
-                }
-                SensorsSimulator.data_queue.put(packet)
+                SensorsSimulator.data_queue.put(self.make_packet(value, status))
 
-                time.sleep(self.interval)
+                self._pace()
                     
 
             # ------ Handle the reset logic ----
             if SensorsSimulator.reset_evt.is_set():
-                if self.id == 100: # Only first sensor flips flag back
+                if SensorsSimulator.registry and SensorsSimulator.registry[0] is self: # Only first sensor flips flag back
                     SensorsSimulator.reset_evt.clear()
                 print(f"Simulator: {self.name} resetart!")
+                self.schedule.restart()
             
             else:
                 # in this case the reset event doesn't being sat, so this means reached the end of the test data 
                 # this could be treated to be FAULTY sensor where no data comming from
                 # the sensor will stuck into this case until being reset
-                while not SensorsSimulator.reset_evt.is_set() and SensorsSimulator.running_evt.is_set():
-                    value = 0
-                    status = "FAULTY"
-                    packet = {
-                        "id": self.id, "sensor": self.name, "value": value,
-                        "timestamp": time.time(), "status": status
-                    }
-                    SensorsSimulator.data_queue.put(packet)
-                    time.sleep(self.interval)
+                while not SensorsSimulator.reset_evt.is_set() and SensorsSimulator.running_evt.is_set() and self.active:
+                    SensorsSimulator.data_queue.put(self.make_packet(0, "FAULTY"))
+                    self._pace()
             
             
 
     @staticmethod
     def tcp_transmitter() -> None:
-        """Centralized transmitter for all instances"""
-        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-            # Allow address reuse (prevents "Port already in use" errors on restart)
-            s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-            s.bind((HOST, PORT))
-            s.listen(1)
-            print(f"Simulator: Server started. Waiting for Dashboard on {PORT}...")
-
-            conn, addr = s.accept()
-            print(f"Simulator: Dashboard connected from {addr}")
-
-            # start the tcp_receiver as thread inside the tcp_transmitter after accepting connection, 
-            # both threads share the same conn
-            # We pass the 'conn' object so it can listen on the same pipe
-            receiver_thread = threading.Thread(target=SensorsSimulator.tcp_receiver, args=(conn,), daemon=True)
-            receiver_thread.start()
-
-            with conn:
-                while SensorsSimulator.running_evt.is_set():
-                    try:
-                        data = SensorsSimulator.data_queue.get()
-                        message = json.dumps(data) + "\n"
-                        conn.sendall(message.encode('utf-8'))
-                    except queue.Empty:
-                        continue # Keep the loop alive if no sensor data is ready
-                    except (ConnectionResetError, BrokenPipeError):
-                        print("Dashboard disconnected.")
-                        break
+        """Centralized transmitter for all instances: one queue consumer, fanned out to every dashboard"""
+        server = BroadcastServer(
+            HOST, PORT, on_command=SensorsSimulator.handle_command,
+            client_buffer=SensorsSimulator.client_buffer,
+            slow_client_policy=SensorsSimulator.slow_client_policy,
+            max_clients=SensorsSimulator.max_clients,
+            replay_capacity=SensorsSimulator.replay_buffer
+        )
+        server.start()
+        SensorsSimulator.server = server
+        print(f"Simulator: Server started. Waiting for Dashboards on {PORT}...")
 
-    @staticmethod
-    def tcp_receiver(conn):
-        """Standardized Command Listener"""
-        print("Simulator: Command Listener Active.")
+        next_trace = 0.0
         while SensorsSimulator.running_evt.is_set():
             try:
-                raw_data = conn.recv(1024).decode('utf-8')
-                if not raw_data:
-                    break
-                
-                # Split by newline in case multiple commands arrived at once
-                for line in raw_data.strip().split('\n'):
-                    clean_line = line.strip()
-                    if not clean_line: continue
-
-                    # Check for PLAIN TEXT commands first (Simple/Fast)
-                    if clean_line == "shutdown":
-                        print("SHUTDOWN COMMAND RECEIVED. CLOSING PROCESS...")
-                        os._exit(0)
-                    
-                    if clean_line == "restart":
-                        # Handle plain string restart
-                        SensorsSimulator._trigger_restart()
-                        continue
-
-                    # Check for JSON commands (Robust/Flexible)
-                    try:
-                        cmd = json.loads(clean_line)
-                        action = cmd.get('action')
-                        
-                        if action == "restart":
-                            SensorsSimulator._trigger_restart()
-                        elif action == "shutdown":
-                            print("SHUTDOWN COMMAND RECEIVED via JSON.")
-                            os._exit(0)
-                    except json.JSONDecodeError:
-                        # If it's not JSON and wasn't caught by the strings above, ignore it
-                        print(f"Simulator: Received unknown noise: {clean_line}")
-
-            except Exception as e:
-                print(f"Receiver Error: {e}")
+                # one batch per drain, encoded once per protocol and shared by all clients
+                batch = SensorsSimulator._drain_batch()
+            except queue.Empty:
+                continue # Keep the loop alive if no sensor data is ready
+            # only negotiated dashboards take controls: don't build traces nobody gets
+            if SensorsSimulator.trace_rate and server.negotiated():
+                now = time.monotonic()
+                if now >= next_trace:
+                    # sampled latency trace, sent right before the batch it describes
+                    next_trace = now + 1.0 / SensorsSimulator.trace_rate
+                    server.announce(make_trace(batch[0], SensorsSimulator.batch_dequeued, now))
+            server.publish(batch)
+        server.stop()
+
+    @staticmethod
+    def _drain_batch(timeout=0.5):
+        """Wait for one packet, then drain whatever is pending up to the size/time budget"""
+        batch = [SensorsSimulator.data_queue.get(timeout=timeout)]
+        SensorsSimulator.batch_dequeued = time.monotonic()
+        deadline = SensorsSimulator.batch_dequeued + SensorsSimulator.flush_interval
+        while len(batch) < SensorsSimulator.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining > 0:
+                    # still inside the flush window, give the sensors a chance to add more
+                    batch.append(SensorsSimulator.data_queue.get(timeout=remaining))
+                else:
+                    # window elapsed, only take what is already waiting
+                    batch.append(SensorsSimulator.data_queue.get_nowait())
+            except queue.Empty:
                 break
+        return batch
+
+    @staticmethod
+    def handle_command(line, session):
+        """Standardized Command Listener (called by the server for every received line)"""
+        # Check for PLAIN TEXT commands first (Simple/Fast)
+        if line == "shutdown":
+            print("SHUTDOWN COMMAND RECEIVED. CLOSING PROCESS...")
+            os._exit(0)
+
+        if line == "restart":
+            # Handle plain string restart
+            SensorsSimulator._trigger_restart()
+            return
+
+        # Check for JSON commands (Robust/Flexible)
+        try:
+            cmd = json.loads(line)
+            action = cmd.get('action')
+            params = cmd.get('params') or {}
+
+            if action == "restart":
+                SensorsSimulator._trigger_restart()
+            elif action == "hello":
+                protocol = session.negotiate(params.get('protocols'), SensorsSimulator.sensor_names,
+                                             params.get('resume'))
+                print(f"Simulator: Dashboard {session.addr} negotiated '{protocol}' protocol.")
+            elif action == "stats":
+                session.send_control({"type": "stats", **SensorsSimulator.stats_report()})
+            elif action == "shutdown":
+                print("SHUTDOWN COMMAND RECEIVED via JSON.")
+                os._exit(0)
+        except (json.JSONDecodeError, AttributeError):
+            # If it's not JSON and wasn't caught by the strings above, ignore it
+            print(f"Simulator: Received unknown noise: {line}")
+
+    @staticmethod
+    def stats_report():
+        """Per-sensor scheduling statistics (jitter, overruns, skipped/caught-up slots)"""
+        report = {
+            "schedule": {s.name: s.schedule.stats.as_dict() for s in SensorsSimulator.registry if s.schedule}
+        }
+        if SensorsSimulator.replay is not None:
+            report["replay"] = SensorsSimulator.replay.report()
+        # per-sensor dropped/coalesced samples of the bounded transmit queue
+        report["queue"] = SensorsSimulator.data_queue.stats()
+        return report
+
+    @staticmethod
+    def consumers_behind():
+        """Replay back-pressure check: packets piling up somewhere between the source and the slowest dashboard"""
+        if SensorsSimulator.data_queue.qsize() > SensorsSimulator.replay_backlog:
+            return True
+        server = SensorsSimulator.server
+        if server is None:
+            return False
+        pending, slowest = server.backlog()
+        drops = server.dropped_batches + server.dropped_clients + sum(SensorsSimulator.data_queue.dropped.values())
+        dropped_since_last_check = drops > SensorsSimulator._drops_seen
+        SensorsSimulator._drops_seen = drops
+        return dropped_since_last_check or slowest > server.client_buffer // 2 or pending > 8
+
+    @staticmethod
+    def replay_to_queue(batch):
+        """ReplaySource sink: hand recorded packets to the transmitter like live sensors do"""
+        for packet in batch:
+            SensorsSimulator.data_queue.put(packet)
+
+    @staticmethod
+    def apply_sensor_changes(changes, create, start):
+        """Apply a reloaded sensor list: only the sensors that were added, removed or changed are touched.
+
+        create(sensor config) builds a sensor and its replicas, start(sensors) sets them running.
+        """
+        groups = SensorsSimulator.groups
+        added, removed = list(changes.added), list(changes.removed)
+        for s_conf in changes.changed:
+            group = groups.get(s_conf['name'], [])
+            if group and group[0].id != s_conf['id']:
+                # a new id is a different sensor for the dashboards: replace it
+                removed.append(s_conf['name'])
+                added.append(s_conf)
+                continue
+            for sensor in group:
+                sensor.set_interval(s_conf['interval'])
+        for name in removed:
+            for sensor in groups.pop(name, []):
+                sensor.stop()
+        new_groups = []
+        for s_conf in added:
+            group = groups[s_conf['name']] = create(s_conf)
+            new_groups.append(group)
+        # binary dashboards decode sensor ids with the map they got in their hello: send the new one
+        # before the new sensors' first packets
+        if SensorsSimulator.server is not None:
+            SensorsSimulator.server.announce({
+                "type": "sensors", "sensors": {str(k): v for k, v in SensorsSimulator.sensor_names.items()}
+            })
+        for group in new_groups:
+            start(group)
 
     @staticmethod
     def _trigger_restart():
         """Helper to clear queue and set event"""
         print("RESTARTING SENSORS...")
-        while not SensorsSimulator.data_queue.empty():
-            try: SensorsSimulator.data_queue.get_nowait()
-            except: break
+        SensorsSimulator.data_queue.clear()
         SensorsSimulator.reset_evt.set()
 
+# id offset between a configured sensor and its load-test replicas
+REPLICA_ID_STRIDE = 100000
+
+
+def create_sensor_group(s_conf, sim_conf):
+    """One configured sensor and its load-test replicas (with their signal generators in generator mode)"""
+    group = [SensorsSimulator(
+        sensor_id=s_conf['id'],
+        name=s_conf['name'],
+        interval=s_conf['interval']
+    )]
+    # Load testing: clone the sensor (same data file, distinct id/name)
+    for k in range(1, int(sim_conf.get('replicas', 1))):
+        group.append(SensorsSimulator(
+            sensor_id=s_conf['id'] + k * REPLICA_ID_STRIDE,
+            name=f"{s_conf['name']}_{k}",
+            interval=s_conf['interval'],
+            source=s_conf['name']
+        ))
+    if sim_conf.get('mode', 'live') == 'generator':
+        # synthetic signal instead of the data file, replicas get their own noise
+        gen_conf = sim_conf.get('generator', {})
+        waveform = s_conf.get('waveform') or default_waveform(s_conf['min'], s_conf['max'])
+        seed = gen_conf.get('seed')
+        for replica in group:
+            replica.generator = SignalGenerator(waveform, gen_conf.get('rate', 1000),
+                                                seed=None if seed is None else seed + replica.id)
+    return group
+
 if __name__ == "__main__":
     # Load config
     with open('config.json', 'r') as f:
@@ -168,28 +397,96 @@ if __name__ == "__main__":
     SensorsSimulator.reset_evt.clear()
 
     # Automatically create sensor instances from config
+    sim_conf = config.get('simulator', {})
+    SensorsSimulator.scheduling = sim_conf.get('scheduling', SensorsSimulator.scheduling)
+    SensorsSimulator.overrun_policy = sim_conf.get('overrun_policy', SensorsSimulator.overrun_policy)
+    SensorsSimulator.data_queue.configure(sim_conf.get('queue_capacity', SensorsSimulator.data_queue.capacity),
+                                          sim_conf.get('queue_policy', SensorsSimulator.data_queue.policy))
+    mode = sim_conf.get('mode', 'live')
+    gen_conf = sim_conf.get('generator', {})
     sensors = []
     for s_conf in config['sensors']:
-        s = SensorsSimulator(
-            sensor_id=s_conf['id'],
-            name=s_conf['name'],
-            interval=s_conf['interval']
-        )
-        sensors.append(s)
-
+        group = SensorsSimulator.groups[s_conf['name']] = create_sensor_group(s_conf, sim_conf)
+        sensors.extend(group)
 
     HOST = config['network']['host']
     PORT = config['network']['port']
+    SensorsSimulator.batch_size = max(1, int(config['network'].get('batch_size', 1)))
+    SensorsSimulator.flush_interval = float(config['network'].get('flush_interval', 0.0))
+    SensorsSimulator.max_clients = int(config['network'].get('max_clients', SensorsSimulator.max_clients))
+    SensorsSimulator.client_buffer = int(config['network'].get('client_buffer', SensorsSimulator.client_buffer))
+    SensorsSimulator.slow_client_policy = config['network'].get('slow_client_policy', SensorsSimulator.slow_client_policy)
+    SensorsSimulator.replay_buffer = int(config['network'].get('replay_buffer', SensorsSimulator.replay_buffer))
+    SensorsSimulator.trace_rate = float(config['network'].get('trace_rate', SensorsSimulator.trace_rate))
 
     # Start Transmitter
     threading.Thread(target=SensorsSimulator.tcp_transmitter, daemon=True).start()
 
     time.sleep(2)
 
-    # Start each sensor in its own thread
-    for s in sensors:
-        threading.Thread(target=s.run_simulation, daemon=True).start()
-        print(f"Thread started for {s.name}")
+    async_engine = None
+    if mode == 'generator':
+        # Synthetic kHz signals, one thread emits a vectorised block per sensor per tick
+        engine = GeneratorEngine(sensors, SensorsSimulator.data_queue,
+                                 SensorsSimulator.running_evt, SensorsSimulator.reset_evt,
+                                 tick=gen_conf.get('tick', 0.02))
+        threading.Thread(target=engine.run_forever, daemon=True).start()
+        print(f"Generator engine started for {len(sensors)} sensors at {gen_conf.get('rate', 1000)} Hz each")
+    elif mode == 'replay':
+        # Recorded data instead of live sensors, at replay.speed x the original timing
+        replay_conf = sim_conf.get('replay', {})
+        intervals = {s.name: s.interval for s in sensors}
+        records = merge_recordings([load_recording(path, intervals) for path in replay_conf.get('files', [])])
+        speed = replay_conf.get('speed', 1.0)
+        SensorsSimulator.replay = ReplaySource(
+            records, SensorsSimulator.replay_to_queue,
+            ids={name: sid for sid, name in SensorsSimulator.sensor_names.items()},
+            speed=None if speed == 'max' else float(speed),
+            running_evt=SensorsSimulator.running_evt, reset_evt=SensorsSimulator.reset_evt,
+            behind=SensorsSimulator.consumers_behind, loop=replay_conf.get('loop', False)
+        )
+        threading.Thread(target=SensorsSimulator.replay.run, daemon=True).start()
+        print(f"Replaying {len(records)} recorded samples at {speed}x")
+    elif sim_conf.get('engine', 'threads') == 'asyncio':
+        # One event loop drives every sensor
+        engine = async_engine = AsyncSimulationEngine(sensors, SensorsSimulator.data_queue,
+                                                      SensorsSimulator.running_evt, SensorsSimulator.reset_evt,
+                                                      overrun_policy=SensorsSimulator.overrun_policy)
+        threading.Thread(target=engine.run_forever, daemon=True).start()
+        print(f"Async engine started for {len(sensors)} sensors")
+    else:
+        # Start each sensor in its own thread
+        for s in sensors:
+            threading.Thread(target=s.run_simulation, daemon=True).start()
+            print(f"Thread started for {s.name}")
+
+    # Live reload of config.json: sensor intervals and the sensor set change without a restart
+    def start_group(group):
+        for s in group:
+            if async_engine is not None:
+                async_engine.add(s)
+            else:
+                threading.Thread(target=s.run_simulation, daemon=True).start()
+
+    def on_config_change(old, new):
+        changes = diff_sensors(old, new)
+        stale = other_sections_changed(old, new)
+        if stale:
+            print(f"Simulator: config changed in {', '.join(stale)}, applied after a restart")
+        if not changes:
+            return
+        if mode != 'live':
+            print(f"Simulator: sensor changes ({changes}) are applied after a restart in {mode} mode")
+            return
+        SensorsSimulator.apply_sensor_changes(changes, lambda s_conf: create_sensor_group(s_conf, sim_conf),
+                                              start_group)
+        print(f"Simulator: config reloaded ({changes})")
+
+    watcher = ConfigWatcher('config.json', config)
+    threading.Thread(target=watcher.run, daemon=True, args=(
+        on_config_change, lambda e: print(f"Simulator: config rejected: {e}"),
+        SensorsSimulator.running_evt, float(sim_conf.get('config_poll_interval', 1.0))
+    )).start()
 
     # Keep main thread alive
     try:
@@ -197,4 +494,14 @@ if __name__ == "__main__":
             time.sleep(1)
     except KeyboardInterrupt:
         SensorsSimulator.running_evt.clear() # Trigger shutdown
-        print("\nStopping simulator...")
\ No newline at end of file
+        print("\nStopping simulator...")
+        # Scheduling quality of this run (useful when benchmarking throughput/latency)
+        for name, stats in SensorsSimulator.stats_report()["schedule"].items():
+            print(f"  {name}: emitted={stats['emitted']} mean_jitter={stats['mean_jitter_ms']:.2f}ms "
+                  f"max_jitter={stats['max_jitter_ms']:.2f}ms overruns={stats['overruns']} "
+                  f"skipped={stats['skipped']} caught_up={stats['caught_up']}")
+        if SensorsSimulator.replay is not None:
+            r = SensorsSimulator.replay.report()
+            print(f"  replay x{r['speed']}: emitted={r['emitted']} mean_rate={r['mean_rate']:.0f}/s "
+                  f"max_sustained_rate={r['max_sustained_rate']:.0f}/s max_lag={r['max_lag_s']:.3f}s "
+                  f"fell_behind={r['fell_behind']}")
\ No newline at end of file
@@ -0,0 +1,134 @@
+"""Synthetic high-rate signals for load testing.
+
+A SignalGenerator turns a waveform description from config.json into blocks of
+samples computed with NumPy: one call produces every sample due since the last
+tick instead of one Python float at a time. Waveforms are a single component or
+a list of components that are summed:
+
+    {"type": "sine",  "amplitude": 20, "frequency": 0.5, "offset": 50, "phase": 0}
+    {"type": "noise", "sigma": 1.5, "offset": 0}
+    {"type": "step",  "amplitude": 10, "period": 4, "offset": 0}
+    {"type": "drift", "slope": 0.01, "offset": 0}
+
+Every sample is independently FAULTY with probability fault_probability, the
+same per-emission semantics as the file-driven sensors.
+
+GeneratorEngine drives all generator sensors from one thread: every tick it
+asks each generator for the samples whose time has come (sample k is due at
+start + k / rate), so the rate holds exactly no matter how late a tick runs,
+and hands the whole tick to the data queue in one put_many().
+"""
+import time
+
+import numpy as np
+
+try:
+    from deadline_schedule import DeadlineSchedule, POLICY_SKIP                     # When running sensors_simulator.py directly
+except ImportError:
+    from sensors_simulator.deadline_schedule import DeadlineSchedule, POLICY_SKIP   # When imported from root (main/test_suit)
+
+WAVEFORM_TYPES = ("sine", "noise", "step", "drift")
+
+
+def default_waveform(low, high):
+    """Sine between a sensor's limits (80% of the band) plus 2% noise, for sensors without a waveform"""
+    span = high - low
+    return [
+        {"type": "sine", "offset": (low + high) / 2, "amplitude": 0.4 * span, "frequency": 0.5},
+        {"type": "noise", "sigma": 0.02 * span},
+    ]
+
+
+class SignalGenerator:
+    """Block-wise sample source for one sensor"""
+
+    def __init__(self, waveform, rate, seed=None):
+        components = waveform if isinstance(waveform, list) else [waveform]
+        for c in components:
+            if c.get("type") not in WAVEFORM_TYPES:
+                raise ValueError(f"Unknown waveform type {c.get('type')!r}, expected one of {WAVEFORM_TYPES}")
+        self.components = components
+        self.rate = float(rate)
+        self.rng = np.random.default_rng(seed)
+        self.index = 0          # sample number of the next sample (phase continuity across blocks)
+
+    def restart(self):
+        self.index = 0
+
+    def block(self, n, fault_probability):
+        """(values, faulty) arrays for the next n samples"""
+        t = (self.index + np.arange(n)) / self.rate
+        values = np.zeros(n)
+        for c in self.components:
+            values += c.get("offset", 0.0)
+            kind = c["type"]
+            if kind == "sine":
+                values += c.get("amplitude", 1.0) * np.sin(2 * np.pi * c.get("frequency", 1.0) * t + c.get("phase", 0.0))
+            elif kind == "noise":
+                values += self.rng.normal(0.0, c.get("sigma", 1.0), n)
+            elif kind == "step":
+                values += c.get("amplitude", 1.0) * (np.floor(t / c.get("period", 1.0)) % 2)
+            elif kind == "drift":
+                values += c.get("slope", 1.0) * t
+        faulty = self.rng.random(n) < fault_probability
+        self.index += n
+        return values, faulty
+
+
+class GeneratorEngine:
+    """Emits the generator-backed sensors' samples into the data queue, one block per tick"""
+
+    def __init__(self, sensors, data_queue, running_evt, reset_evt, tick=0.02, fault_probability=None):
+        self.sensors = [s for s in sensors if s.generator is not None]
+        self.data_queue = data_queue
+        self.running_evt = running_evt
+        self.reset_evt = reset_evt
+        self.tick = tick
+        # None = read the sensors' (class level) fault_probability at every block
+        self.fault_probability = fault_probability
+        self.packets_emitted = 0
+        self.started_at = None
+        self._wall_origin = None
+
+    def run_forever(self):
+        """Thread target: emit until running_evt is cleared"""
+        # a late tick already emits everything due, so missed ticks are simply skipped
+        schedule = DeadlineSchedule(self.tick, POLICY_SKIP)
+        self._start(schedule)
+        while self.running_evt.is_set():
+            if self.reset_evt.is_set():
+                # single owner of the generators, so the engine flips the flag back
+                self.reset_evt.clear()
+                self._start(schedule)
+                print(f"Simulator: {len(self.sensors)} generators restarted!")
+            self.emit_due(time.monotonic())
+            schedule.advance()
+            schedule.wait()
+
+    def _start(self, schedule):
+        for sensor in self.sensors:
+            sensor.generator.restart()
+        self.started_at = time.monotonic()
+        self._wall_origin = time.time()
+        schedule.restart(self.started_at)
+
+    def emit_due(self, now):
+        """Generate and queue every sample due at 'now' (monotonic clock), one queue operation per tick"""
+        elapsed = now - self.started_at
+        packets = []
+        for sensor in self.sensors:
+            gen = sensor.generator
+            due = int(elapsed * gen.rate) + 1 - gen.index
+            if due <= 0:
+                continue
+            first = gen.index
+            p = sensor.fault_probability if self.fault_probability is None else self.fault_probability
+            values, faulty = gen.block(due, p)
+            stamps = self._wall_origin + (first + np.arange(due)) / gen.rate
+            sid, name = sensor.id, sensor.name
+            packets += [{"id": sid, "sensor": name, "value": value, "timestamp": ts,
+                         "status": "FAULTY" if bad else "OK"}
+                        for value, bad, ts in zip(values.tolist(), faulty.tolist(), stamps.tolist())]
+            self.packets_emitted += due
+        if packets:
+            self.data_queue.put_many(packets)
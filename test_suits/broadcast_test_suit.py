@@ -0,0 +1,183 @@
+import unittest
+import json
+import socket
+import time
+
+from common import wire_protocol
+from common.latency_trace import make_trace
+from sensors_simulator.broadcast_server import BroadcastServer, ClientSession
+
+
+class TestBroadcastServer(unittest.TestCase):
+    def setUp(self):
+        # Port 0 lets the OS pick a free port so tests never clash with a running simulator
+        self.server = BroadcastServer("127.0.0.1", 0)
+        self.port = self.server.start()
+
+    def tearDown(self):
+        self.server.stop()
+
+    def _connect(self, count):
+        clients = [socket.create_connection(("127.0.0.1", self.port)) for _ in range(count)]
+        deadline = time.time() + 2
+        while len(self.server.clients) < count and time.time() < deadline:
+            time.sleep(0.01)
+        return clients
+
+    def _receive(self, sock, expected):
+        sock.settimeout(2)
+        decoder, packets = wire_protocol.StreamDecoder(), []
+        while len(packets) < expected:
+            batch, _ = decoder.feed(sock.recv(65536))
+            packets.extend(batch)
+        return packets
+
+    def test_every_client_gets_every_packet(self):
+        """Two dashboards connected at once must both see the full stream (no packet stealing)"""
+        clients = self._connect(2)
+        batch = [{"id": 100, "sensor": "temp", "value": float(i), "timestamp": 0.0, "status": "OK"} for i in range(10)]
+        self.server.publish(batch)
+
+        for sock in clients:
+            self.assertEqual(self._receive(sock, 10), batch)
+            sock.close()
+
+    def test_slow_client_policies(self):
+        """A full outbox either drops the client or keeps only the newest batches"""
+        self.server.client_buffer = 100
+        session = ClientSession(self.server, None, ("test", 0))
+        self.assertTrue(session.enqueue(b"x" * 60))
+        self.assertFalse(session.enqueue(b"y" * 60), "drop policy must report the overflow")
+
+        self.server.slow_client_policy = "downsample"
+        session = ClientSession(self.server, None, ("test", 0))
+        session.enqueue(b"x" * 60)
+        self.assertTrue(session.enqueue(b"y" * 60))
+        self.assertEqual(list(session.outbox), [(b"y" * 60, False)])
+        self.assertEqual(session.dropped_batches, 1)
+
+    def test_downsampling_never_drops_control_messages(self):
+        """Only data makes room: the hello reply and sensor maps survive a slow client"""
+        self.server.client_buffer = 200
+        self.server.slow_client_policy = "downsample"
+        session = ClientSession(self.server, None, ("test", 0))
+        session.negotiate(["binary"], {100: "temp"})
+        for i in range(5):
+            session.enqueue(bytes([i]) * 60)
+            session.send_control({"type": "sensors", "sensors": {"100": f"temp{i}"}})
+        kinds = [control for _, control in session.outbox]
+        self.assertEqual(kinds.count(True), 6, "hello reply + 5 sensor maps")
+        self.assertLess(kinds.count(False), 5, "old data was discarded")
+        self.assertEqual(session.dropped_batches, 5 - kinds.count(False))
+        decoder = wire_protocol.StreamDecoder()
+        decoder.feed(b"".join(chunk for chunk, control in session.outbox if control))
+        self.assertEqual(decoder.sensor_names, {100: "temp4"})
+
+        # the drop policy disconnects instead, and says so
+        self.server.slow_client_policy = "drop"
+        session = ClientSession(self.server, None, ("test", 0))
+        session.enqueue(b"x" * 190)
+        self.assertFalse(session.send_control({"type": "sensors", "sensors": {}}))
+
+    def test_controls_only_reach_negotiated_clients(self):
+        """A dashboard that never said hello reads every line as a packet: announcements skip it"""
+        self.server.on_command = lambda line, session: session.negotiate(["json"], {100: "temp"})
+        legacy, modern = self._connect(2)
+        modern.sendall(b'{"action": "hello", "params": {"protocols": ["json"]}}\n')
+        deadline = time.time() + 2
+        while sum(s.negotiated for s in self.server.clients.values()) < 1 and time.time() < deadline:
+            time.sleep(0.01)
+        batch = [{"id": 100, "sensor": "temp", "value": float(i), "timestamp": 0.0, "status": "OK"} for i in range(10)]
+        self.server.announce({"type": "sensors", "sensors": {"100": "temp"}})
+        self.server.publish(batch)
+
+        legacy.settimeout(2)
+        lines = b""
+        while lines.count(b"\n") < len(batch):
+            lines += legacy.recv(65536)
+        self.assertEqual([json.loads(line) for line in lines.splitlines()], batch)
+
+        modern.settimeout(2)
+        decoder, packets, controls = wire_protocol.StreamDecoder(), [], []
+        while len(packets) < len(batch):
+            received, control = decoder.feed(modern.recv(65536))
+            packets.extend(received)
+            controls.extend(c["type"] for c in control)
+        self.assertEqual(packets, batch)
+        self.assertEqual(controls, ["hello", "sensors"])
+        legacy.close()
+        modern.close()
+
+    def test_traces_skip_legacy_clients(self):
+        """Latency traces are controls too: a client without hello gets only the batch"""
+        legacy = self._connect(1)[0]
+        self.assertFalse(self.server.negotiated())
+        batch = [{"id": 100, "sensor": "temp", "value": 1.0, "timestamp": time.time(), "status": "OK"}]
+        now = time.monotonic()
+        self.server.announce(make_trace(batch[0], now, now))
+        self.server.publish(batch)
+
+        legacy.settimeout(2)
+        line = b""
+        while not line.endswith(b"\n"):
+            line += legacy.recv(65536)
+        self.assertEqual(json.loads(line), batch[0])
+        legacy.close()
+
+    def test_reconnect_resumes_from_last_sequence_number(self):
+        """Packets published while a dashboard is away are replayed; what left the ring is a gap"""
+        def hello(line, session):
+            params = json.loads(line)["params"]
+            session.negotiate(params["protocols"], {100: "temp"}, params.get("resume"))
+        self.server.on_command = hello
+        self.server.replay_capacity = 10
+        batch = lambda start: [{"id": 100, "sensor": "temp", "value": float(i), "timestamp": 0.0, "status": "OK"}
+                               for i in range(start, start + 10)]
+        decoder = wire_protocol.StreamDecoder()
+
+        def connect():
+            sock = self._connect(1)[0]
+            resume = decoder.resume_point()
+            decoder.reconnect()
+            command = {"action": "hello", "params": {"protocols": ["binary"], "resume": resume}}
+            sock.sendall((json.dumps(command) + "\n").encode())
+            sock.settimeout(2)
+            return sock
+
+        def receive(sock, expected):
+            packets, gaps = [], []
+            while len(packets) < expected:
+                batch, controls = decoder.feed(sock.recv(65536))
+                packets.extend(batch)
+                gaps.extend(c for c in controls if c["type"] == "gap")
+            return [p["value"] for p in packets], gaps
+
+        sock = connect()
+        while decoder.stream is None:
+            decoder.feed(sock.recv(65536))
+        self.server.publish(batch(0))
+        self.assertEqual(receive(sock, 10), ([float(i) for i in range(10)], []))
+        sock.close()
+
+        # missed while away, still in the ring: replayed without a gap
+        while self.server.clients:
+            time.sleep(0.01)
+        self.server.publish(batch(10))
+        sock = connect()
+        self.assertEqual(receive(sock, 10), ([float(i) for i in range(10, 20)], []))
+        self.assertEqual(decoder.last_seq, 19)
+        sock.close()
+
+        # two batches missed but the ring only holds the newest one: #20-#29 are reported lost
+        while self.server.clients:
+            time.sleep(0.01)
+        self.server.publish(batch(20))
+        self.server.publish(batch(30))
+        sock = connect()
+        self.assertEqual(receive(sock, 10), ([float(i) for i in range(30, 40)],
+                                             [{"type": "gap", "first": 20, "last": 29}]))
+        sock.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,258 @@
+import unittest
+import os
+import queue
+import tempfile
+import threading
+import time
+from unittest.mock import patch
+
+import numpy as np
+
+from sensors_simulator.sensors_simulator import SensorsSimulator
+from sensors_simulator.async_engine import AsyncSimulationEngine
+from sensors_simulator.deadline_schedule import DeadlineSchedule
+from sensors_simulator.data_files import load_values, cache_path
+from sensors_simulator.signal_generator import SignalGenerator, GeneratorEngine
+from sensors_simulator.packet_queue import BoundedPacketQueue
+from sensors_simulator.replay_source import ReplaySource, load_recording, merge_recordings
+
+
+class TestAsyncEngine(unittest.TestCase):
+    def setUp(self):
+        self.out = queue.Queue()
+        self.running, self.reset = threading.Event(), threading.Event()
+        self.running.set()
+        self.sensor = SensorsSimulator(999, "test_sensor", 0.05)
+        # skip the file system: feed the parsed values directly
+        self.sensor.load_values = lambda: [1.0, 2.0, 3.0]
+        self.engine = AsyncSimulationEngine([self.sensor], self.out, self.running, self.reset, poll_interval=0.01)
+        self.thread = threading.Thread(target=self.engine.run_forever, daemon=True)
+
+    def tearDown(self):
+        self.running.clear()
+        self.thread.join(timeout=2)
+
+    def _run_for(self, seconds):
+        """Start the engine and sleep until 'seconds' after its schedule origin"""
+        self.thread.start()
+        while self.engine.started_at is None:
+            time.sleep(0.001)
+        time.sleep(max(0.0, self.engine.started_at + seconds - time.monotonic()))
+
+    def _drain(self):
+        packets = []
+        while not self.out.empty():
+            packets.append(self.out.get_nowait())
+        return packets
+
+    def test_emission_follows_data_then_faulty_zero(self):
+        """Data lines first, then the stuck 0/FAULTY end-of-file behaviour of the threaded loop"""
+        self._run_for(0.27)
+        values = [p["value"] for p in self._drain()]
+        self.assertEqual(values[:3], [1.0, 2.0, 3.0])
+        self.assertTrue(all(v == 0 for v in values[3:]))
+        # 0.27 s at 0.05 s intervals on absolute deadlines -> exactly 6 emissions
+        self.assertEqual(len(values), 6)
+
+    def test_reset_rewinds_and_clears_event(self):
+        """Reset restarts every sensor from the top and the engine clears the event"""
+        self._run_for(0.17)
+        self._drain()
+        self.reset.set()
+        time.sleep(0.03)
+        self.assertFalse(self.reset.is_set())
+        self.assertEqual(self._drain()[0]["value"], 1.0)
+
+    def test_config_reload_adds_and_stops_sensors(self):
+        """Sensors added while running are scheduled, stopped ones leave the loop"""
+        self._run_for(0.07)
+        added = SensorsSimulator(998, "added_sensor", 0.05)
+        added.load_values = lambda: [7.0, 8.0]
+        self.engine.add(added)
+        self.sensor.stop()
+        time.sleep(0.03)
+        self._drain()
+        time.sleep(0.12)
+        names = {p["sensor"] for p in self._drain()}
+        self.assertEqual(names, {"added_sensor"})
+        self.assertNotIn(999, SensorsSimulator.sensor_names)
+        added.stop()
+
+
+
+class TestDeadlineSchedule(unittest.TestCase):
+    def test_grid_does_not_drift(self):
+        """Late emissions don't push later deadlines: they stay on start + k * interval"""
+        sched = DeadlineSchedule(1.0, start=100.0)
+        for k, late in enumerate([0.3, 0.1, 0.9, 0.0]):
+            self.assertEqual(sched.advance(100.0 + k + late), 100.0 + k + 1)
+        self.assertEqual(sched.stats.overruns, 0)
+        self.assertAlmostEqual(sched.stats.max_jitter, 0.9)
+
+    def test_overrun_policies(self):
+        """Falling 2.5 intervals behind: skip drops the missed slots, catch-up keeps them"""
+        skip = DeadlineSchedule(1.0, policy="skip", start=0.0)
+        self.assertEqual(skip.advance(2.5), 3.0)
+        self.assertEqual((skip.stats.overruns, skip.stats.skipped), (1, 2))
+
+        catch_up = DeadlineSchedule(1.0, policy="catch_up", start=0.0)
+        self.assertEqual(catch_up.advance(2.5), 1.0)   # already due -> emitted back to back
+        self.assertEqual(catch_up.advance(2.5), 2.0)
+        self.assertEqual(catch_up.advance(2.5), 3.0)
+        self.assertEqual(catch_up.stats.skipped, 0)
+
+
+class TestDataFiles(unittest.TestCase):
+    def test_parse_once_shared_and_rebuilt_on_change(self):
+        """Values are parsed into a binary cache once, shared, and re-parsed only when the file changes"""
+        with tempfile.TemporaryDirectory() as d:
+            path = os.path.join(d, "temp_data.txt")
+            with open(path, "w") as f:
+                f.write("50.0\n 52.5 \n\n55.0\n")
+            first = load_values(path)
+            self.assertEqual(list(first), [50.0, 52.5, 55.0])
+            self.assertTrue(os.path.exists(cache_path(path)))
+            self.assertIs(load_values(path), first, "Sensors reading the same file must share one buffer")
+
+            with open(path, "a") as f:
+                f.write("60.0\n")
+            os.utime(path, ns=(time.time_ns(), time.time_ns() + 10**9))
+            self.assertEqual(list(load_values(path)), [50.0, 52.5, 55.0, 60.0])
+
+    def test_malformed_lines_are_skipped(self):
+        """A line that is not a number is skipped instead of failing the whole file"""
+        with tempfile.TemporaryDirectory() as d:
+            path = os.path.join(d, "temp_data.txt")
+            with open(path, "w") as f:
+                f.write("50.0\n5O.5\n52.5\n\n--\n55.0\n")
+            self.assertEqual(list(load_values(path)), [50.0, 52.5, 55.0])
+
+
+class TestPacketQueue(unittest.TestCase):
+    @staticmethod
+    def _packet(sensor, value):
+        return {"id": 1, "sensor": sensor, "value": value, "timestamp": 0.0, "status": "OK"}
+
+    def _fill(self, q, packets):
+        for sensor, value in packets:
+            q.put(self._packet(sensor, value))
+        drained = []
+        while not q.empty():
+            packet = q.get_nowait()
+            drained.append((packet["sensor"], packet["value"]))
+        return drained
+
+    def test_overflow_policies_bound_depth_and_count_drops(self):
+        """Full queue: drop the oldest, drop the newest, or keep each sensor's latest value"""
+        burst = [("temp", 1), ("press", 1), ("temp", 2), ("temp", 3), ("press", 2)]
+
+        q = BoundedPacketQueue(3, "drop_oldest")
+        self.assertEqual(self._fill(q, burst), [("temp", 2), ("temp", 3), ("press", 2)])
+        self.assertEqual(q.stats()["dropped"], {"temp": 1, "press": 1})
+
+        q = BoundedPacketQueue(3, "drop_newest")
+        self.assertEqual(self._fill(q, burst), [("temp", 1), ("press", 1), ("temp", 2)])
+        self.assertEqual(q.stats()["dropped"], {"temp": 1, "press": 1})
+
+        q = BoundedPacketQueue(3, "coalesce")
+        self.assertEqual(self._fill(q, burst), [("temp", 1), ("press", 2), ("temp", 3)])
+        self.assertEqual(q.stats()["coalesced"], {"temp": 1, "press": 1})
+        self.assertEqual(q.stats()["max_depth"], 3)
+
+        q = BoundedPacketQueue(1, "block")
+        q.put(self._packet("temp", 1))
+        with self.assertRaises(queue.Full):
+            q.put(self._packet("temp", 2), timeout=0.05)
+        threading.Timer(0.05, q.get).start()
+        q.put(self._packet("temp", 3), timeout=1)     # unblocks once the consumer makes room
+        self.assertEqual(q.get_nowait()["value"], 3)
+
+    def test_stats_command_reports_queue_counters(self):
+        """The per-sensor drop counters travel back over the command channel"""
+        class Session:
+            sent = []
+            def send_control(self, message):
+                self.sent.append(message)
+
+        session = Session()
+        SensorsSimulator.handle_command('{"action": "stats"}', session)
+        report = session.sent[-1]
+        self.assertEqual(report["type"], "stats")
+        self.assertIn("dropped", report["queue"])
+        self.assertEqual(report["queue"]["capacity"], SensorsSimulator.data_queue.capacity)
+
+
+class TestReplaySource(unittest.TestCase):
+    def _write(self, directory, name, text):
+        path = os.path.join(directory, name)
+        with open(path, "w") as f:
+            f.write(text)
+        return path
+
+    def test_both_formats_merge_in_time_order(self):
+        """Text files are spaced by the sensor interval, CSV keeps its own timestamps"""
+        with tempfile.TemporaryDirectory() as d:
+            txt = self._write(d, "temp_data.txt", "50.0\n51.0\n52.0\n")
+            csv_path = self._write(d, "incident.csv", "timestamp,sensor,value,status\n"
+                                   "1700000000.5,press,30.0,OK\n1700000001.5,press,99.0,FAULTY\n")
+            records = merge_recordings([load_recording(txt, {"temp": 1.0}), load_recording(csv_path, {})])
+        self.assertEqual([(t, name, value) for t, name, value, _ in records],
+                         [(0.0, "temp", 50.0), (0.0, "press", 30.0), (1.0, "temp", 51.0),
+                          (1.0, "press", 99.0), (2.0, "temp", 52.0)])
+        self.assertEqual(records[3][3], "FAULTY")
+
+    def test_speed_multiplier_scales_timing(self):
+        """2 s of recording at 10x takes 0.2 s; at max speed it is only bounded by the sink"""
+        records = [(k * 0.5, "temp", float(k), "OK") for k in range(5)]
+        received = []
+        start = time.monotonic()
+        report = ReplaySource(records, received.extend, ids={"temp": 100}, speed=10).run()
+        elapsed = time.monotonic() - start
+        self.assertAlmostEqual(elapsed, 0.2, delta=0.05)
+        self.assertEqual([p["value"] for p in received], [0.0, 1.0, 2.0, 3.0, 4.0])
+        self.assertEqual(received[0]["id"], 100)
+        self.assertEqual(report["emitted"], 5)
+        self.assertFalse(report["fell_behind"])
+
+        fast = ReplaySource(records, lambda batch: None, speed=None).run()
+        self.assertEqual(fast["speed"], "max")
+        self.assertLess(fast["elapsed_s"], 0.05)
+
+
+class TestSignalGenerator(unittest.TestCase):
+    def test_blocks_are_continuous_and_faults_keep_probability(self):
+        """Two blocks equal one long block, and each sample is FAULTY with fault_probability"""
+        waveform = [{"type": "sine", "amplitude": 2.0, "frequency": 5.0, "offset": 10.0},
+                    {"type": "step", "amplitude": 1.0, "period": 0.1},
+                    {"type": "drift", "slope": 0.5}]
+        split, whole = SignalGenerator(waveform, 1000), SignalGenerator(waveform, 1000)
+        a, _ = split.block(300, 0.0)
+        b, _ = split.block(700, 0.0)
+        np.testing.assert_allclose(np.concatenate([a, b]), whole.block(1000, 0.0)[0])
+
+        _, faulty = SignalGenerator({"type": "noise"}, 1000, seed=7).block(200000, 0.02)
+        self.assertAlmostEqual(faulty.mean(), 0.02, delta=0.002)
+        with self.assertRaises(ValueError):
+            SignalGenerator({"type": "square"}, 1000)
+
+    def test_engine_emits_exactly_the_due_samples(self):
+        """Sample k is due at start + k / rate, however the ticks fall"""
+        sensor = SensorsSimulator(998, "gen_sensor", 1.0)
+        sensor.generator = SignalGenerator({"type": "drift", "slope": 1.0}, 1000)
+        out = BoundedPacketQueue(capacity=1000)
+        engine = GeneratorEngine([sensor], out, threading.Event(), threading.Event(), fault_probability=0.0)
+        engine.started_at, engine._wall_origin = 50.0, 1000.0
+        with patch.object(out, 'put_many', wraps=out.put_many) as put_many, patch.object(out, 'put') as put:
+            engine.emit_due(50.1)
+            engine.emit_due(50.1)
+            engine.emit_due(50.25)
+        self.assertEqual((put_many.call_count, put.call_count), (2, 0), "One queue operation per tick with samples due")
+        packets = [out.get_nowait() for _ in range(out.qsize())]
+        self.assertEqual(len(packets), 251)
+        self.assertAlmostEqual(packets[-1]["value"], 0.25)
+        self.assertAlmostEqual(packets[-1]["timestamp"] - packets[-2]["timestamp"], 0.001)
+        self.assertTrue(all(p["status"] == "OK" for p in packets))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,13 +1,34 @@
 import unittest
 import time
 import os
+import json
 import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from unittest.mock import patch, MagicMock
+from PyQt6.QtCore import Qt
 from PyQt6.QtGui import QColor
 from PyQt6.QtWidgets import QApplication, QMessageBox
 
 from GUI.user_interface import SensorDashboard
+from GUI.ring_buffer import RingBuffer
+from GUI.lod_pyramid import MinMaxPyramid
+from GUI.history_store import HistoryStore
+from GUI.alarm_engine import AlarmEngine
+from GUI.log_writer import LogWriter
+from GUI.status_table_model import StatusTableModel, StatusFilterProxy
+from GUI.alarm_store import AlarmStore
+from GUI.alarm_table_model import AlarmPageModel
+from GUI.notifier import NotificationDispatcher, WebhookChannel, pooled_session
+from GUI.stream_stats import StreamStats
+from GUI.alarm_engine import PROCESS_STATUS
+from GUI.anomaly_detectors import DetectorPipeline, RateOfChangeDetector, ZScoreDetector, StuckValueDetector
+import numpy as np
+from common import wire_protocol
+from common.config_watcher import ConfigWatcher
+from common.latency_trace import LatencyHistogram, make_trace, STAGES
 from sensors.sensors_simulator import SensorsSimulator
+from sensors_simulator.data_files import load_values
 
 class TestIndustrialSystem(unittest.TestCase):
     
@@ -20,20 +41,37 @@ class TestIndustrialSystem(unittest.TestCase):
         """Fresh GUI for every test to ensure state isolation"""
         self.app = QApplication.instance() or QApplication([])
         
-        # 1. Create the GUI instance
-        self.gui = SensorDashboard()
+        # 1. Create the GUI instance (its sample history and alarm database go to a scratch directory)
+        self.tmp = tempfile.TemporaryDirectory()
+        load_config = SensorDashboard.load_config
+
+        def scratch_config(gui):
+            load_config(gui)
+            gui.storage = dict(gui.storage, path=os.path.join(self.tmp.name, "history"))
+            gui.alarm_conf = dict(gui.alarm_conf, path=os.path.join(self.tmp.name, "alarm_history.db"))
+
+        with patch.object(SensorDashboard, 'load_config', scratch_config):
+            self.gui = SensorDashboard()
         
         # 2. STOP the network thread immediately if it started
         # This prevents the "Destroyed while thread is still running" error
         if self.gui.receiver.isRunning():
-            self.gui.receiver.terminate()
+            self.gui.receiver.stop()
             self.gui.receiver.wait() 
 
     def tearDown(self):
         """Clean up after each test"""
         if hasattr(self, 'gui'):
-            self.gui.receiver.terminate()
+            self.gui.receiver.stop()
             self.gui.receiver.wait()
+            self.gui.pipeline.stop()
+            # timers of this dashboard would keep firing (and flushing the closed stores) in later tests
+            for timer in (self.gui.watchdog_timer, self.gui.render_timer, self.gui.rate_timer, self.gui.config_timer):
+                timer.stop()
+            if self.gui.history is not None:
+                self.gui.history.close()
+            self.gui.alarm_store._db.close()
+        self.tmp.cleanup()
 
     # --- CATEGORY 1: SENSOR PARSING & API ---
     def test_parsing_and_packet_integrity(self):
@@ -54,6 +92,41 @@ class TestIndustrialSystem(unittest.TestCase):
         self.assertIsInstance(packet['value'], float)
         self.assertEqual(len(packet), 5) # Ensure no extra/missing keys
 
+    def test_bulk_batch_decoding(self):
+        """Requirement: a batch of newline-delimited packets is decoded in one pass, noise skipped"""
+        lines = [
+            b'{"id": 100, "sensor": "temp", "value": 50.0, "timestamp": 1.0, "status": "OK"}',
+            b'',
+            b'{"id": 200, "sensor": "optical", "value": 7.5, "timestamp": 2.0, "status": "FAULTY"}',
+        ]
+        batch = wire_protocol.decode_json_lines(lines)
+        self.assertEqual([p['sensor'] for p in batch], ["temp", "optical"])
+
+        # a corrupted line must not take the rest of the batch down with it
+        batch = wire_protocol.decode_json_lines(lines + [b'{"id": 3'])
+        self.assertEqual(len(batch), 2)
+
+    def test_binary_protocol_switch(self):
+        """Requirement: JSON until the hello reply, binary frames after it, same packets out"""
+        packets = [
+            {"id": 100, "sensor": "temp", "value": 50.5, "timestamp": 1.25, "status": "OK"},
+            {"id": 500, "sensor": "vib", "value": 0.3, "timestamp": 1.5, "status": "FAULTY"},
+        ]
+        hello = {"type": "hello", "protocol": "binary", "sensors": {"100": "temp", "500": "vib"}}
+        stream = (wire_protocol.encode_batch(packets[:1], "json")
+                  + wire_protocol.encode_control(hello, "json")
+                  + wire_protocol.encode_batch(packets, "binary"))
+
+        decoder = wire_protocol.StreamDecoder()
+        received = []
+        # feed in awkward slices to make sure partial frames are carried over
+        for i in range(0, len(stream), 7):
+            batch, _ = decoder.feed(stream[i:i + 7])
+            received.extend(batch)
+
+        self.assertEqual(decoder.protocol, "binary")
+        self.assertEqual(received, packets[:1] + packets)
+
     # --- CATEGORY 2: ALARM LOGIC (BOUNDARY TESTING) ---
     def test_alarm_thresholds(self):
         """Requirement: Alarm logic at boundaries (Low, OK, High)"""
@@ -87,7 +160,7 @@ class TestIndustrialSystem(unittest.TestCase):
     # --- CATEGORY 3: UI STATE MANAGEMENT ---
     def test_alarm_history_logging(self):
         """Test if the Alarm Table actually grows when an alarm occurs"""
-        initial_count = self.gui.alarm_table.rowCount()
+        initial_count = self.gui.alarm_model.total()
         
         # Simulate a packet that triggers an alarm
         test_packet = {
@@ -98,21 +171,355 @@ class TestIndustrialSystem(unittest.TestCase):
         }
         self.gui.process_packet(test_packet)
         
-        new_count = self.gui.alarm_table.rowCount()
+        new_count = self.gui.alarm_model.total()
         self.assertEqual(new_count, initial_count + 1, "Alarm table should have 1 new row")
 
     def test_master_reset_logic(self):
         """Test if Master Reset wipes the memory and UI correctly"""
         # 1. Fill it with junk
         self.gui.plot_data["temp"].append(50.0)
-        self.gui.alarm_table.insertRow(0)
+        self.gui.add_to_alarm_log("temp", 99.9, "HW:OK/PR:High Limit")
         
         # 2. Reset
         self.gui.request_restart()
         
         # 3. Verify
         self.assertEqual(len(self.gui.plot_data["temp"]), 0)
-        self.assertEqual(self.gui.alarm_table.rowCount(), 0)
+        self.assertEqual(self.gui.alarm_model.total(), 0)
+
+    def test_render_coalescing(self):
+        """Packets only update state; one render pass paints the latest value per row"""
+        for v in (30.0, 40.0, 50.0):
+            self.gui.process_packet({"sensor": "temp", "value": v, "status": "OK", "timestamp": time.time()})
+        row = self.gui.sensor_to_row["temp"]
+        model = self.gui.status_model
+        self.assertIsNone(model.data(model.index(row, 1)), "Table must not be touched per packet")
+        self.assertIn("temp", self.gui.dirty_rows)
+
+        self.gui.render_frame()
+        self.assertEqual(model.data(model.index(row, 1)), "50.0")
+        self.assertFalse(self.gui.dirty_rows or self.gui.dirty_plots)
+        self.assertEqual(self.gui.status_label.text(), "SYSTEM OPERATIONAL (GREEN)")
+
+    def test_status_counters_follow_rows(self):
+        """The overall status comes from running level counts and is repainted only when it changes"""
+        states = self.gui.sensor_states
+        self.gui.process_packet({"sensor": "temp", "value": 1000.0, "status": "OK", "timestamp": time.time()})
+        self.assertEqual(states.counts["PROCESS"], 1)
+        self.gui.render_frame()
+        self.assertEqual(self.gui.status_label.text(), "!!! PROCESS ALARM (RED) !!!")
+
+        self.gui.process_packet({"sensor": "temp", "value": 1000.0, "status": "FAULTY", "timestamp": time.time()})
+        self.assertEqual((states.counts["PROCESS"], states.counts["HARDWARE"]), (0, 1))
+        self.gui.render_frame()
+        self.assertEqual(self.gui.status_label.text(), "!!! HARDWARE FAULT (YELLOW) !!!")
+
+        # same level again: nothing to repaint
+        self.gui.process_packet({"sensor": "temp", "value": 2000.0, "status": "FAULTY", "timestamp": time.time()})
+        self.assertFalse(self.gui.status_dirty)
+
+        self.gui.handle_connection_loss()
+        self.gui.render_frame()
+        self.assertIn("OFFLINE", self.gui.status_label.text(), "Only new data may replace the offline banner")
+        low = self.gui.limits["temp"]["low"]
+        self.gui.process_packet({"sensor": "temp", "value": low, "status": "OK", "timestamp": time.time()})
+        self.gui.render_frame()
+        self.assertEqual(self.gui.status_label.text(), "SYSTEM OPERATIONAL (GREEN)")
+        self.assertEqual(states.counts["OK"], len(self.gui.limits))
+
+    def test_status_model_signals_changed_cells_and_filters(self):
+        """Only changed cells are signalled (adjacent rows merged); the proxy sorts and filters by level"""
+        names = [f"s{i}" for i in range(5000)]
+        model = StatusTableModel(names)
+        proxy = StatusFilterProxy()
+        proxy.setSourceModel(model)
+        proxy.set_level_filter("OK")
+        self.assertEqual(proxy.rowCount(), 5000, "Sensors without data yet are not in alarm")
+        proxy.set_level_filter(None)
+        changes = []
+        model.dataChanged.connect(lambda tl, br, roles: changes.append((tl.row(), tl.column(), br.row(), br.column())))
+
+        model.update_rows({f"s{i}": (1.0, 100.0, "OK", "OK") for i in range(5000)})
+        self.assertEqual(changes, [(0, 0, 4999, 4)], "First data recolours every row, in one signal")
+
+        changes.clear()
+        model.update_rows({"s10": (2.0, 100.0, "OK", "OK"), "s11": (3.0, 100.0, "OK", "OK"),
+                           "s20": (1.0, 100.0, "FAULTY", "OK"), "s30": (1.0, 100.0, "OK", "OK")})
+        self.assertEqual(changes, [(10, 1, 11, 1), (20, 0, 20, 4)], "Unchanged s30 must not be signalled")
+
+        proxy.set_level_filter("HARDWARE")
+        self.assertEqual(proxy.rowCount(), 1)
+        self.assertEqual(proxy.data(proxy.index(0, 0)), "s20")
+        proxy.set_level_filter(None)
+        proxy.sort(1, Qt.SortOrder.DescendingOrder)
+        self.assertEqual(proxy.data(proxy.index(0, 0)), "s11", "Value column sorts numerically")
+        proxy.setFilterFixedString("s49")
+        self.assertEqual(proxy.rowCount(), 111)
+
+    def test_alarm_store_pages_and_filters(self):
+        """Alarms page newest first from the ring or the indexed database, with the same results"""
+        with tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, "alarms.db")
+            store = AlarmStore(path, ring_size=50, flush_rows=100)
+            for i in range(1000):
+                store.add("temp" if i % 2 else "press", float(i), "HW:FAULTY/PR:OK" if i % 10 == 0 else "HW:OK/PR:High Limit",
+                          ts=1000.0 + i)
+            model = AlarmPageModel(store, page_size=20)
+            model.set_filter()
+            self.assertEqual((model.total(), model.page_count(), model.rowCount()), (1000, 50, 20))
+            self.assertEqual(model.data(model.index(0, 2)), "999.0", "Newest alarm first")
+            model.set_page(30)
+            self.assertEqual(model.data(model.index(0, 2)), "399.0", "Old pages come from the database")
+
+            model.set_filter(sensor="press", alarm_type="HW:FAULTY/PR:OK", since=1500.0)
+            self.assertEqual(model.total(), 50)
+            self.assertEqual([row[3] for row in model.iter_filtered()][:2], [500.0, 510.0], "Export streams oldest first")
+            store.close()
+
+            # reopened: the history is all on disk, the ring starts empty
+            store = AlarmStore(path)
+            self.assertEqual(store.count(since=1990.0), 10)
+            self.assertEqual(store.query(limit=1)[0][3], 999.0)
+            store.close()
+
+    def test_alarm_store_sees_alarms_of_another_dashboard(self):
+        """Two dashboards sharing the alarm file both count and page every alarm"""
+        with tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, "alarms.db")
+            mine, theirs = AlarmStore(path, ring_size=50), AlarmStore(path, ring_size=50)
+            model = AlarmPageModel(mine, page_size=20)
+            model.set_filter()
+            for i in range(3):
+                model.mark_stale(mine.add("temp", float(i), "HW:OK/PR:High Limit", ts=1000.0 + i))
+            mine.flush()
+            theirs.add("press", 7.0, "HW:FAULTY/PR:OK", ts=1010.0)
+            theirs.flush()
+
+            self.assertEqual(mine.count(), 4)
+            self.assertEqual(mine.count(sensor="press"), 1)
+            self.assertEqual(mine.query(limit=1)[0][3], 7.0, "Their newer alarm comes first")
+            self.assertEqual(model.total(), 4)
+            theirs.close()
+            mine.close()
+
+    def test_alarm_burst_does_not_count_per_frame(self):
+        """The alarm total is counted once per filter and kept up to date from new alarms"""
+        gui = self.gui
+        gui.alarm_range.setCurrentIndex(gui.alarm_range.findData(0))     # "All history"
+        before = gui.alarm_model.total()
+        with patch.object(gui.alarm_store, 'count', wraps=gui.alarm_store.count) as count:
+            for i in range(300):
+                gui.add_to_alarm_log("temp" if i % 2 else "press", float(i), "HW:OK/PR:High Limit")
+                gui.render_frame()
+            self.assertEqual(count.call_count, 0)
+        self.assertEqual(gui.alarm_model.total(), before + 300)
+        gui.alarm_sensor.setCurrentIndex(gui.alarm_sensor.findData("temp"))
+        self.assertEqual(gui.alarm_model.total(), gui.alarm_store.count("temp"))
+
+    def test_worker_pipeline_coalesces_bursts(self):
+        """Batches submitted by the network thread reach the GUI as one aggregated delta"""
+        deltas = []
+        self.gui.pipeline.delta_ready.connect(lambda d: deltas.append(d.packets))
+        self.gui.pipeline._applied.clear()     # GUI "busy" with a previous delta: the worker must coalesce
+        for _ in range(50):
+            self.gui.pipeline.submit([{"sensor": "temp", "value": 99.0, "status": "OK", "timestamp": time.time()}])
+        time.sleep(0.2)
+        self.app.processEvents()
+        self.assertEqual(deltas, [], "No delta may be sent before the previous one is applied")
+
+        self.gui.pipeline.delta_applied()
+        deadline = time.time() + 2
+        while not deltas and time.time() < deadline:
+            self.app.processEvents()
+            time.sleep(0.01)
+        self.assertEqual(deltas, [50])
+        self.assertEqual(len(self.gui.plot_data["temp"]), min(50, self.gui.plot_window))
+        self.assertTrue(self.gui.proc_notified["temp"], "Alarm evaluation ran in the worker")
+        self.assertEqual(self.gui.alarm_model.total(), 1)
+
+    def test_pipeline_persists_only_configured_sensors(self):
+        """Packets of unknown or removed sensors still feed the watchdog but never reach the history store"""
+        now = time.time()
+        self.gui.pipeline.submit([{"sensor": "temp", "value": 50.0, "status": "OK", "timestamp": now},
+                                  {"sensor": "ghost", "value": 1.0, "status": "OK", "timestamp": now}])
+        self.gui.pipeline.stop()
+        self.gui.history.close()
+        self.assertEqual(self.gui.history.sensors(), ["temp"])
+        self.assertFalse(os.path.exists(os.path.join(self.gui.history.root, "ghost")))
+
+    def test_ring_buffer_window(self):
+        """Plot history keeps the newest samples in order and hands out contiguous views"""
+        ring = RingBuffer(4)
+        for v in range(6):
+            ring.append(float(v), 100.0 + v)
+        self.assertEqual(ring.values().tolist(), [2.0, 3.0, 4.0, 5.0])
+        self.assertEqual(ring.timestamps().tolist(), [102.0, 103.0, 104.0, 105.0])
+        self.assertTrue(ring.values().base is not None, "values() must be a view, not a copy")
+
+        ring.extend([6.0, 7.0, 8.0])
+        self.assertEqual(ring.values().tolist(), [5.0, 6.0, 7.0, 8.0])
+        self.assertEqual(ring.total, 9)
+
+    def test_lod_pyramid_keeps_spikes(self):
+        """A single-sample spike survives decimation, and block updates match per-sample ones"""
+        data = np.zeros(100000)
+        data[54321] = 99.0
+        one_by_one, block = MinMaxPyramid(100000), MinMaxPyramid(100000)
+        for v in data[:5000]:
+            one_by_one.append(v)
+        block.extend(data[:1234])
+        block.extend(data[1234:5000])
+        for level in range(1, block.levels + 1):
+            np.testing.assert_array_equal(block.query(0, 5000, level)[1], one_by_one.query(0, 5000, level)[1])
+
+        block.extend(data[5000:])
+        level = block.choose_level(100000, 800)
+        x, y = block.query(0, 100000, level)
+        self.assertLessEqual(len(x), 2 * 800 + 4, "Draw cost must follow the pixel width, not the history")
+        self.assertEqual(y.max(), 99.0, "Spike must stay visible at the coarse level")
+
+    def test_history_store_range_query(self):
+        """Samples survive a close/reopen across chunk files and come back by time range"""
+        with tempfile.TemporaryDirectory() as root:
+            store = HistoryStore(root, chunk_size=100, fsync_interval=0.05)
+            store.append_batch([{"sensor": "temp", "value": float(i), "timestamp": 1000.0 + i,
+                                 "status": "FAULTY" if i % 50 == 0 else "OK"} for i in range(250)])
+            store.append({"sensor": "press", "value": 1.5, "timestamp": 1000.0, "status": "OK"})
+            store.close()
+            self.assertEqual(len(os.listdir(os.path.join(root, "temp"))), 9, "250 samples -> 3 chunks x 3 columns")
+
+            reopened = HistoryStore(root, chunk_size=100)
+            ts, values, statuses = reopened.query("temp", 1095.0, 1205.0)
+            np.testing.assert_array_equal(values, np.arange(95, 206, dtype=float))
+            self.assertEqual(int(statuses.sum()), 3)    # 100, 150 and 200 were FAULTY
+            self.assertEqual(len(reopened.query("press")[0]), 1)
+            self.assertEqual(len(reopened.query("unknown")[0]), 0)
+            reopened.close()
+
+    def test_history_store_realigns_columns_after_a_crash(self):
+        """A row torn by a crash is dropped from every column, new rows line up again"""
+        with tempfile.TemporaryDirectory() as root:
+            store = HistoryStore(root, chunk_size=100)
+            store.append_batch([{"sensor": "temp", "value": float(i), "timestamp": 1000.0 + i, "status": "OK"}
+                                for i in range(10)])
+            store.close()
+            # crash in the middle of a row: the timestamp got written, the value and status did not
+            with open(os.path.join(root, "temp", "00000000.ts"), "ab") as f:
+                f.write(np.float64(1010.0).tobytes())
+
+            store = HistoryStore(root, chunk_size=100)
+            store.append_batch([{"sensor": "temp", "value": float(i), "timestamp": 1000.0 + i, "status": "OK"}
+                                for i in range(10, 15)])
+            store.close()
+            ts, values, _ = HistoryStore(root, chunk_size=100).query("temp")
+            np.testing.assert_array_equal(ts, 1000.0 + np.arange(15))
+            np.testing.assert_array_equal(values, np.arange(15, dtype=float))
+
+    def test_history_store_keeps_sensor_names_inside_its_root(self):
+        """Sensor names from the network never become paths outside the store (or the store itself)"""
+        with tempfile.TemporaryDirectory() as parent:
+            root = os.path.join(parent, "history")
+            names = ["temp", "../escaped", "..", ".", "/abs", "a/b", "50% load"]
+            store = HistoryStore(root)
+            store.append_batch([{"sensor": name, "value": float(i), "timestamp": 1000.0, "status": "OK"}
+                                for i, name in enumerate(names + [""])])
+            store.close()
+            self.assertEqual(os.listdir(parent), ["history"])
+            self.assertEqual(len(os.listdir(root)), len(names), "One directory per sensor, right under the root")
+            self.assertEqual(store.errors, 1, "The empty name is refused")
+
+            reopened = HistoryStore(root)
+            self.assertEqual(reopened.sensors(), sorted(names))
+            for i, name in enumerate(names):
+                np.testing.assert_array_equal(reopened.query(name)[1], [float(i)])
+            reopened.close()
+
+    def test_history_store_survives_write_errors(self):
+        """A sensor that cannot be written is reported; the writer keeps going and the queue stays bounded"""
+        with tempfile.TemporaryDirectory() as root:
+            reported = []
+            store = HistoryStore(root, chunk_size=100, on_error=reported.append)
+            # a plain file where the sensor's directory should go: makedirs fails for every temp batch
+            open(os.path.join(root, "temp"), "w").close()
+            for i in range(3):
+                store.append_batch([{"sensor": "temp", "value": 1.0, "timestamp": 1000.0 + i, "status": "OK"},
+                                    {"sensor": "press", "value": 2.0, "timestamp": 1000.0 + i, "status": "OK"}])
+            store.close()
+            self.assertGreaterEqual(store.errors, 1)
+            self.assertEqual(len(reported), 1, "Errors are rate limited in the maintenance log")
+            self.assertIn("temp", reported[0])
+            np.testing.assert_array_equal(HistoryStore(root).query("press")[0], [1000.0, 1001.0, 1002.0])
+
+            # the writer is gone: batches are refused and counted, not queued forever
+            self.assertFalse(store.append_batch([{"sensor": "press", "value": 2.0, "timestamp": 0.0, "status": "OK"}]))
+            self.assertEqual(store.dropped, 1)
+
+    def test_alarm_engine_paths_agree(self):
+        """Vectorised rounds and the scalar fallback raise the same events in the same order"""
+        limits = {f"s{i}": {"low": 10.0, "high": 90.0} for i in range(40)}
+        rng = np.random.default_rng(3)
+        vectorised = AlarmEngine(limits, 5, 15, min_round=1)
+        scalar = AlarmEngine(limits, 5, 15, use_numpy=False)
+        for _ in range(30):
+            # skewed sensor choice: several packets of the same sensor per batch
+            names = [f"s{i}" for i in rng.integers(0, 40, 200) % rng.integers(1, 41)]
+            batch = [{"sensor": n, "value": float(v), "status": "FAULTY" if f else "OK"}
+                     for n, v, f in zip(names, rng.uniform(0, 100, 200), rng.random(200) < 0.1)]
+            self.assertEqual(vectorised.evaluate(batch), scalar.evaluate(batch))
+        for view in ("alarmed", "proc_counters", "proc_notified", "hw_counters", "hw_notified"):
+            self.assertEqual(vectorised.view(view).items(), scalar.view(view).items())
+
+    def test_anomaly_detectors_feed_the_alarm_tracks(self):
+        """Rate/stuck detection is the same batched or per sample, and flagged samples raise process alarms"""
+        def pipeline(n):
+            return DetectorPipeline([RateOfChangeDetector([5.0] * n, [1.0] * n, [0.0] * n, [100.0] * n),
+                                     StuckValueDetector(n, samples=4)], PROCESS_STATUS)
+        rng = np.random.default_rng(5)
+        idx = rng.integers(0, 3, 300)
+        values = np.where(rng.random(300) < 0.5, 50.0, rng.uniform(40, 60, 300)).round(0)
+        timestamps = np.arange(300, dtype=float)
+        batched, single = pipeline(3), pipeline(3)
+        codes = np.concatenate([batched.evaluate(idx[k:k + 37], values[k:k + 37], timestamps[k:k + 37])
+                                for k in range(0, 300, 37)])
+        one_by_one = np.concatenate([single.evaluate(idx[k:k + 1], values[k:k + 1], timestamps[k:k + 1])
+                                     for k in range(300)])
+        np.testing.assert_array_equal(codes, one_by_one)
+        self.assertTrue(set(codes.tolist()) >= {0, 3, 5}, "Both detectors must have fired somewhere")
+
+        # a sensor stuck at a value inside its limits: alarm log entry, then the leaky bucket notifies
+        limits = {"temp": {"low": -10.0, "high": 90.0}}
+        detectors = DetectorPipeline([StuckValueDetector(1, samples=20), ZScoreDetector([0.5], threshold=5.0, warmup=20)],
+                                     PROCESS_STATUS)
+        engine = AlarmEngine(limits, 5, 15, detectors=detectors)
+        noise = [{"sensor": "temp", "value": 50.0 + v, "status": "OK", "timestamp": float(t)}
+                 for t, v in enumerate(rng.normal(0, 1, 100))]
+        self.assertEqual(engine.evaluate(noise)[0], [])
+        events, statuses = engine.evaluate([{"sensor": "temp", "value": 0.0, "status": "OK", "timestamp": 100.0 + t}
+                                            for t in range(25)])
+        self.assertEqual(statuses[0], "Z-Score", "A jump far outside the baseline is flagged inside the limits")
+        self.assertEqual(events[0][3], "HW:OK/PR:Z-Score")
+        self.assertEqual(statuses[19:], ["Stuck Value"] * 6, "The more specific diagnosis wins")
+        self.assertIn(("process", "temp", 0.0, "Anomaly: z-score on temp"), events)
+        self.assertFalse(any("CRITICAL" in e[3] for e in events), "No limit was crossed")
+
+    def test_shipped_data_raises_no_anomalies(self):
+        """Replaying the sensors_data files through the configured detectors flags nothing but limit violations"""
+        def replay(gui):
+            statuses = []
+            for s_conf in gui.config['sensors']:
+                values = load_values(f"sensors_data/{s_conf['name']}_data.txt")
+                statuses += gui.alarms.evaluate([{"sensor": s_conf['name'], "value": float(v), "status": "OK",
+                                                  "timestamp": 1000.0 + k * s_conf['interval']}
+                                                 for k, v in enumerate(values)])[1]
+            return statuses
+
+        statuses = replay(self.gui)
+        self.assertTrue({"High Limit", "Low Limit"} <= set(statuses), "The data does cross its limits")
+        self.assertEqual(set(statuses) - {"OK", "High Limit", "Low Limit"}, set())
+        # the stuck detector, when turned on, must not mistake the flat stretches for a stuck sensor
+        self.gui.detector_conf = dict(self.gui.detector_conf, stuck={"enabled": True})
+        self.gui.alarms = AlarmEngine(self.gui.limits, 5, 15, detectors=self.gui.create_detectors())
+        self.assertEqual(set(replay(self.gui)) - {"OK", "High Limit", "Low Limit"}, set())
 
     # --- CATEGORY 4: NOTIFICATION THROTTLING (NEW) ---
 
@@ -134,6 +541,19 @@ class TestIndustrialSystem(unittest.TestCase):
         self.gui.process_packet(packet)
         self.assertTrue(self.gui.proc_notified[sensor], "Should notify at 5 strikes")
 
+    def test_clear_alarms_rearms_notifications(self):
+        """'Clear Alarms' re-arms the notification flags through the worker's lock, counters keep running"""
+        packet = {"sensor": "temp", "value": 99.9, "status": "OK", "timestamp": time.time()}
+        for _ in range(5):
+            self.gui.process_packet(packet)
+        self.assertTrue(self.gui.proc_notified["temp"])
+        self.assertFalse(self.gui.pipeline.lock.locked())
+        with patch.object(self.gui.pipeline, 'lock', wraps=self.gui.pipeline.lock) as lock:
+            self.gui.clear_alarm_log()
+        lock.__enter__.assert_called()
+        self.assertFalse(self.gui.proc_notified["temp"])
+        self.assertEqual(self.gui.proc_counters["temp"], 5)
+
     def test_process_leak_recovery(self):
         """Test if the 'Leak' works (counter decrements on healthy data)"""
         sensor = "press"
@@ -174,6 +594,83 @@ class TestIndustrialSystem(unittest.TestCase):
         self.assertTrue(self.gui.hw_notified[sensor], "Should notify after 15th cumulative HW fault")
         self.assertEqual(self.gui.hw_counters[sensor], 0, "HW counter should reset to 0 after notification")
 
+    def test_notification_digests_rate_limit_and_retry(self):
+        """An alert storm becomes a few digest posts over one pooled session; a 500 is retried"""
+        received, connections, failures = [], set(), [1]
+
+        class Webhook(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"      # keep-alive, so connection reuse is visible
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                connections.add(self.client_address)
+                status = 204
+                if failures[0]:
+                    failures[0] -= 1
+                    status = 500
+                else:
+                    received.append(body)
+                self.send_response(status)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), Webhook)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        results = []
+        channel = WebhookChannel(f"http://127.0.0.1:{server.server_port}/hook", pooled_session(2), rate=2, per=60)
+        dispatcher = NotificationDispatcher([channel], digest_window=0.05, retries=2, backoff=0.05,
+                                            on_result=lambda name, alerts, error: results.append((len(alerts), error)))
+        try:
+            for i in range(200):
+                dispatcher.notify(f"s{i % 40}", float(i), "CRITICAL: Process Limit Exceeded")
+            deadline = time.time() + 5
+            while not results and time.time() < deadline:
+                time.sleep(0.01)
+            time.sleep(0.2)     # a second digest would have gone out by now
+        finally:
+            dispatcher.close()
+            server.shutdown()
+            server.server_close()
+
+        self.assertEqual(results, [(200, None)], "The first post failed, its retry carries the whole storm")
+        self.assertEqual(len(received), 1)
+        self.assertIn("200 SENSOR ALERTS (40 sensors)", received[0]["embeds"][0]["title"])
+        self.assertEqual(len(connections), 1, "Retries reuse the pooled keep-alive connection")
+        self.assertEqual(dispatcher.stats()["discord"], {"sent": 1, "pending": 0, "dropped": 0})
+
+    def test_notification_retry_never_evicts_newer_alerts(self):
+        """A failed digest goes back without pushing newer alerts out: its oldest alerts are dropped and counted"""
+        release, sent = threading.Event(), []
+
+        class Flaky:
+            name, rate, per = "flaky", 100, 1.0
+
+            def send(self, alerts):
+                release.wait(2)
+                if not sent:
+                    sent.append(None)
+                    raise ConnectionError("down")
+                sent.append([a.sensor for a in alerts])
+
+        dispatcher = NotificationDispatcher([Flaky()], digest_window=0.0, retries=1, backoff=0.0, max_pending=4)
+        try:
+            for i in range(3):
+                dispatcher.notify(f"old{i}", 0.0, "CRITICAL")
+            time.sleep(0.1)     # the first digest is in flight
+            for i in range(3):
+                dispatcher.notify(f"new{i}", 0.0, "CRITICAL")
+            release.set()
+            deadline = time.time() + 2
+            while len(sent) < 2 and time.time() < deadline:
+                time.sleep(0.01)
+        finally:
+            dispatcher.close()
+        self.assertEqual(sent[1], ["old2", "new0", "new1", "new2"])
+        self.assertEqual(dispatcher.stats()["flaky"]["dropped"], 2)
+
     # --- CATEGORY 5: PROFFESSIONAL FEATURES TESTS ---
 
     def test_watchdog_trigger(self):
@@ -217,8 +714,9 @@ class TestIndustrialSystem(unittest.TestCase):
         if os.path.exists("industrial_monitor.log"):
             os.remove("industrial_monitor.log")
             
-        # Trigger log
+        # Trigger log (written by the background log writer)
         self.gui.update_maintenance_log(test_msg)
+        self.assertTrue(self.gui.log_writer.flush())
         
         # Verify file content
         self.assertTrue(os.path.exists("industrial_monitor.log"))
@@ -226,6 +724,142 @@ class TestIndustrialSystem(unittest.TestCase):
             log_content = f.read()
             self.assertIn(test_msg, log_content)
 
+    def test_log_writer_rotates_and_reopens(self):
+        """Log lines are batched to disk, rotated by size, and a deleted log file is recreated"""
+        with tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, "monitor.log")
+            writer = LogWriter(path, max_bytes=100, backups=2, flush_interval=10)
+            for i in range(3):
+                writer.write(f"line {i} " + "x" * 40)
+            self.assertTrue(writer.flush())
+            self.assertTrue(os.path.exists(path + ".1"), "Over max_bytes the log must rotate")
+            self.assertFalse(os.path.exists(path + ".3"), "Only 'backups' old files are kept")
+
+            os.remove(path)
+            writer.write("after delete")
+            writer.close()
+            with open(path) as f:
+                self.assertIn("after delete", f.read())
+
+    def test_rolling_stats_follow_the_window(self):
+        """Incremental window statistics match the exact ones and reach the Statistics tab"""
+        stats = StreamStats({"temp": {"low": 0, "high": 100}}, windows=(50, 500), alpha=0.5, bins=200)
+        rng = np.random.default_rng(7)
+        data = rng.normal(50, 10, 2000)
+        for block in np.array_split(data, 37):     # uneven blocks, like batches from the network
+            stats.extend("temp", block)
+        for w, size in enumerate((50, 500)):
+            snap = stats.snapshot(w)["temp"]
+            window = data[-size:]
+            self.assertEqual(snap["count"], size)
+            self.assertAlmostEqual(snap["mean"], window.mean(), places=6)
+            self.assertAlmostEqual(snap["std"], window.std(ddof=1), places=6)
+            self.assertEqual((snap["min"], snap["max"]), (window.min(), window.max()))
+            # quantiles come from the histogram: within one bin (1.0 here) of the order statistics around them
+            for q, key in ((0.5, "p50"), (0.95, "p95"), (0.99, "p99")):
+                self.assertGreaterEqual(snap[key], np.quantile(window, q, method="lower") - 1.0)
+                self.assertLessEqual(snap[key], np.quantile(window, q, method="higher") + 1.0)
+        ewma = data[0]
+        for x in data[1:]:
+            ewma = 0.5 * ewma + 0.5 * x
+        self.assertAlmostEqual(stats.snapshot()["temp"]["ewma"], ewma, places=9)
+
+        # dashboard: packets feed the statistics through the processing stage
+        name = next(iter(self.gui.limits))
+        for v in (10.0, 20.0, 30.0):
+            self.gui.process_packet({"sensor": name, "value": v, "timestamp": time.time(), "status": "OK"})
+        self.gui.tabs.setCurrentWidget(self.gui.stats_tab)
+        self.gui.refresh_stats()
+        row = list(self.gui.limits).index(name)
+        model = self.gui.stats_model
+        self.assertEqual(model.data(model.index(row, 1)), "3")
+        self.assertEqual(model.data(model.index(row, 2)), "20.00")
+        self.assertEqual(model.data(model.index(row, 3)), "10.00")
+
+    def test_config_reload_rebuilds_only_changed_sensors(self):
+        """A config.json change applies live: limits, added and removed sensors; a broken file is rejected"""
+        gui = self.gui
+        config = json.loads(json.dumps(gui.config))
+        kept, dropped = config['sensors'][0]['name'], config['sensors'][1]['name']
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "config.json")
+            with open(path, "w") as f:
+                json.dump(config, f)
+            gui.config_watcher = ConfigWatcher(path, gui.config)
+            # an alarm counter that must survive the reload
+            high = gui.limits[kept]['high']
+            gui.process_packet({"sensor": kept, "value": high + 1, "timestamp": time.time(), "status": "OK"})
+            kept_plot = gui.plots[kept]
+
+            config['sensors'][0]['max'] = high + 10
+            config['sensors'] = [s for s in config['sensors'] if s['name'] != dropped]
+            config['sensors'].append({"id": 9900, "name": "flow", "min": 0, "max": 5, "interval": 0.5})
+            with open(path, "w") as f:
+                json.dump(config, f)
+            os.utime(path, ns=(time.time_ns(), time.time_ns() + 10**9))
+            gui.check_config()
+
+            names = [s['name'] for s in config['sensors'] if s['name'] != "flow"] + ["flow"]
+            self.assertEqual(list(gui.limits), names)
+            self.assertEqual(gui.limits[kept]['high'], high + 10)
+            self.assertEqual(gui.status_model.names, names)
+            self.assertEqual(gui.stats_model.names, names)
+            self.assertEqual(set(gui.plots), set(names))
+            self.assertIs(gui.plots[kept], kept_plot, "Unchanged plots are kept, not rebuilt")
+            self.assertEqual(gui.proc_counters[kept], 1)
+            self.assertEqual(gui.alarms.names, names)
+            self.assertNotIn(dropped, gui.pipeline.known)
+            self.assertGreaterEqual(gui.alarm_sensor.findData("flow"), 0)
+            self.assertLess(gui.alarm_sensor.findData(dropped), 0)
+
+            # the new sensor is live, the removed one is ignored
+            gui.process_packet({"sensor": "flow", "value": 9.0, "timestamp": time.time(), "status": "OK"})
+            gui.process_packet({"sensor": dropped, "value": 1.0, "timestamp": time.time(), "status": "OK"})
+            gui.render_frame()
+            row = names.index("flow")
+            self.assertEqual(gui.status_model.data(gui.status_model.index(row, 4)), "High Limit")
+
+            # invalid edit: logged and rejected, the running config stays
+            with open(path, "w") as f:
+                f.write('{"sensors": [')
+            os.utime(path, ns=(time.time_ns(), time.time_ns() + 2 * 10**9))
+            with patch.object(gui, 'update_maintenance_log') as log:
+                gui.check_config()
+            self.assertIn("CONFIG REJECTED", log.call_args[0][0])
+            self.assertEqual(list(gui.limits), names)
+
+    def test_latency_trace_reaches_the_render_frame(self):
+        """A traced batch is stamped at every stage and lands in the per-stage histograms"""
+        hist = LatencyHistogram()
+        for ms in range(1, 101):
+            hist.add(ms / 1000)
+        # log bins: within one bin (about 12 %) above the exact quantile, never above the max
+        self.assertTrue(0.050 <= hist.quantile(0.5) <= 0.050 * 1.13)
+        self.assertTrue(0.099 <= hist.quantile(0.99) <= 0.100)
+        self.assertEqual(hist.max, 0.1)
+
+        gui = self.gui
+        now = time.monotonic()
+        packet = {"sensor": "temp", "value": 50.0, "status": "OK", "timestamp": time.time() - 0.01}
+        trace = make_trace(packet, now - 0.005, now)
+        trace["received"] = trace["parsed"] = time.monotonic()
+        gui.pipeline.submit([packet], trace)
+        deadline = time.time() + 2
+        while gui.latency.histograms["total"].count == 0 and time.time() < deadline:
+            self.app.processEvents()
+            gui.render_frame()
+            time.sleep(0.01)
+        for stage, start, end in STAGES:
+            self.assertEqual(gui.latency.histograms[stage].count, 1, stage)
+            self.assertGreaterEqual(trace[end], trace[start], stage)
+        self.assertGreaterEqual(gui.latency.histograms["total"].max, 0.01)
+
+        with patch.object(gui, 'update_maintenance_log') as log:
+            gui.show_latency_report()
+        lines = [call[0][0] for call in log.call_args_list]
+        self.assertEqual(len(lines), 2 + len(STAGES))
+        self.assertTrue(lines[-1].startswith("total"))
+
     def test_shutdown_command_sent(self):
         """Verify that the shutdown command is dispatched to the network manager"""
         # Mock the send_command method